@@ -15,54 +15,148 @@ from graphql_relay import (
     to_global_id,
 )
 
-from .base import set_default_connection_factory
+from .base import set_default_connection_factory, set_default_page_size_policy
+from .cache import NodeCache, NodeCacheStats
 from .connection import (
     BaseConnection,
+    CappedCount,
+    CompactCursorCodec,
     ConnectionArguments,
+    ConnectionData,
     ConnectionProxy,
+    ConnectionSelection,
+    ConnectionSlice,
+    CountCache,
+    CountedConnection,
+    CountStrategy,
+    CursorCodec,
+    EstimatedCount,
+    ExactCount,
+    KeysetConnection,
+    KeysetConnectionArguments,
+    PageSizePolicy,
     ReferenceConnection,
+    set_default_cursor_codec,
+    SliceWindow,
     SnakeCaseBaseConnection,
     SnakeCaseConnection,
     SnakeCaseConnectionType,
     SnakeCasePageInfoType,
+    StreamingConnection,
+    SyncStreamingConnection,
+)
+from .cost import QueryCostAnalysis, QueryCostExtension
+from .global_id import (
+    CompactGlobalIdCodec,
+    GlobalIdCodec,
+    set_default_global_id_codec,
 )
 from .interfaces import RelayInterfaceType
+from .loader import NodeLoader, set_node_loader_context_key
+from .metrics import (
+    ConnectionFieldStats,
+    NodeResolverStats,
+    RelayMetrics,
+    RelayMetricsExtension,
+    set_default_connection_hook,
+    set_default_node_hook,
+)
 from .node import (
     NodeInterfaceType,
     NodeObjectType,
     resolve_node_query,
     resolve_node_query_sync,
+    resolve_nodes_query,
+    resolve_nodes_query_sync,
 )
+from .node_connection import NodeConnection, SyncNodeConnection
 from .objects import RelayMutationType, RelayObjectType, RelayQueryType
+from .offload import (
+    set_default_offload,
+    set_default_thread_offloader,
+    ThreadOffloader,
+    ThreadOffloaderStats,
+)
+from .registry import build_node_registry, NodeDispatcher, NodeRegistry
+from .tracing import FinishedSpan, InMemoryTracer, set_default_tracer, Tracer
 
 __all__ = [
     "BaseConnection",
+    "build_node_registry",
+    "CappedCount",
+    "CompactCursorCodec",
+    "CompactGlobalIdCodec",
     "ConnectionArguments",
     "ConnectionCursor",
+    "ConnectionData",
+    "ConnectionFieldStats",
     "ConnectionProxy",
+    "ConnectionSelection",
+    "ConnectionSlice",
     "ConnectionType",
+    "CountCache",
+    "CountedConnection",
+    "CountStrategy",
+    "CursorCodec",
     "Edge",
     "EdgeConstructor",
     "EdgeType",
+    "EstimatedCount",
+    "ExactCount",
+    "FinishedSpan",
     "from_global_id",
+    "GlobalIdCodec",
+    "InMemoryTracer",
+    "KeysetConnection",
+    "KeysetConnectionArguments",
+    "NodeCache",
+    "NodeCacheStats",
+    "NodeConnection",
+    "NodeDispatcher",
     "NodeInterfaceType",
+    "NodeLoader",
     "NodeObjectType",
+    "NodeRegistry",
+    "NodeResolverStats",
     "PageInfo",
     "PageInfoConstructor",
     "PageInfoType",
+    "PageSizePolicy",
+    "QueryCostAnalysis",
+    "QueryCostExtension",
     "ReferenceConnection",
     "RelayInterfaceType",
+    "RelayMetrics",
+    "RelayMetricsExtension",
     "RelayMutationType",
     "RelayObjectType",
     "RelayQueryType",
-    "ResolvedGlobalId",
     "resolve_node_query",
     "resolve_node_query_sync",
+    "resolve_nodes_query",
+    "resolve_nodes_query_sync",
+    "ResolvedGlobalId",
     "set_default_connection_factory",
+    "set_default_connection_hook",
+    "set_default_cursor_codec",
+    "set_default_global_id_codec",
+    "set_default_node_hook",
+    "set_default_offload",
+    "set_default_page_size_policy",
+    "set_default_thread_offloader",
+    "set_default_tracer",
+    "set_node_loader_context_key",
     "SizedSliceable",
+    "SliceWindow",
     "SnakeCaseBaseConnection",
     "SnakeCaseConnection",
     "SnakeCaseConnectionType",
     "SnakeCasePageInfoType",
+    "StreamingConnection",
+    "SyncNodeConnection",
+    "SyncStreamingConnection",
+    "ThreadOffloader",
+    "ThreadOffloaderStats",
     "to_global_id",
+    "Tracer",
 ]
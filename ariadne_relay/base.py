@@ -1,28 +1,60 @@
-from dataclasses import dataclass
+import asyncio
+from dataclasses import dataclass, replace
 from inspect import isawaitable
-from typing import Any, Callable, cast, Dict, Optional
+from typing import Any, Callable, cast, Dict, Generator, Optional
 
 from ariadne.types import Resolver
 from graphql import GraphQLObjectType, GraphQLResolveInfo
 
 from .connection import (
+    BaseConnection,
     ConnectionArguments,
     ConnectionAwaitable,
     ConnectionCallable,
+    ConnectionData,
     ConnectionFactory,
     ConnectionFactoryOrConstructor,
+    ConnectionSelection,
+    ConnectionSlice,
+    PageSizePolicy,
     ReferenceConnection,
 )
-from .utils import is_coroutine_callable
+from .loader import ConnectionBatchLoader
+from .metrics import (
+    ConnectionHook,
+    get_connection_hook,
+    observe_connection_resolver,
+    observe_factory,
+    observe_resolver,
+)
+from .offload import get_thread_offloader, Offload
+from .tracing import (
+    CONNECTION_RESOLVER_SPAN,
+    FIELD,
+    get_default_tracer,
+    trace_call,
+    trace_connection_resolver,
+    trace_factory,
+    Tracer,
+)
+from .utils import accepts_keyword, is_coroutine_callable
+
+CONNECTION_EXTENSION = "ariadne_relay_connection"
+PAGINATION_ARGUMENTS = frozenset(("after", "before", "first", "last"))
 
 
 @dataclass
 class RelayConnectionConfig:
     factory: ConnectionFactory
     resolver: Resolver
+    page_size: Optional[PageSizePolicy] = None
+    batch: bool = False
+    offload: Offload = None
+    skip_resolver: bool = False
 
 
 DefaultConnectionFactory: ConnectionFactoryOrConstructor = ReferenceConnection
+DefaultPageSizePolicy: Optional[PageSizePolicy] = None
 
 
 def set_default_connection_factory(factory: ConnectionFactoryOrConstructor) -> None:
@@ -30,8 +62,14 @@ def set_default_connection_factory(factory: ConnectionFactoryOrConstructor) -> N
     DefaultConnectionFactory = factory
 
 
+def set_default_page_size_policy(policy: Optional[PageSizePolicy]) -> None:
+    global DefaultPageSizePolicy
+    DefaultPageSizePolicy = policy
+
+
 class RelayConnectionType:
     __connection_config: Optional[Dict[str, RelayConnectionConfig]] = None
+    _connection_hook: Optional[ConnectionHook] = None
 
     @property
     def _connection_configs(self) -> Dict[str, RelayConnectionConfig]:
@@ -44,33 +82,126 @@ class RelayConnectionType:
         name: str,
         *,
         factory: Optional[ConnectionFactoryOrConstructor] = None,
+        page_size: Optional[PageSizePolicy] = None,
+        offload: Offload = None,
+        skip_resolver: bool = False,
     ) -> Callable[[Resolver], Resolver]:
         if not isinstance(name, str):
             raise ValueError(
                 "connection decorator should be passed "
                 'a field name: @foo.connection("name")'
             )
-        return self.create_register_connection_resolver(name, factory=factory)
+        return self.create_register_connection_resolver(
+            name,
+            factory=factory,
+            page_size=page_size,
+            offload=offload,
+            skip_resolver=skip_resolver,
+        )
 
     def create_register_connection_resolver(
         self,
         name: str,
         *,
         factory: Optional[ConnectionFactoryOrConstructor] = None,
+        page_size: Optional[PageSizePolicy] = None,
+        offload: Offload = None,
+        skip_resolver: bool = False,
     ) -> Callable[[Resolver], Resolver]:
         def register_connection_resolver(f: Resolver) -> Resolver:
-            self.set_connection(name, f, factory=factory)
+            self.set_connection(
+                name,
+                f,
+                factory=factory,
+                page_size=page_size,
+                offload=offload,
+                skip_resolver=skip_resolver,
+            )
             return f
 
         return register_connection_resolver
 
+    def batch_connection(
+        self,
+        name: str,
+        *,
+        factory: Optional[ConnectionFactoryOrConstructor] = None,
+        page_size: Optional[PageSizePolicy] = None,
+        offload: Offload = None,
+        skip_resolver: bool = False,
+    ) -> Callable[[Resolver], Resolver]:
+        if not isinstance(name, str):
+            raise ValueError(
+                "batch_connection decorator should be passed "
+                'a field name: @foo.batch_connection("name")'
+            )
+
+        def register_batch_connection_resolver(f: Resolver) -> Resolver:
+            self.set_batch_connection(
+                name,
+                f,
+                factory=factory,
+                page_size=page_size,
+                offload=offload,
+                skip_resolver=skip_resolver,
+            )
+            return f
+
+        return register_batch_connection_resolver
+
     def set_connection(
         self,
         name: str,
         resolver: Resolver,
         *,
         factory: Optional[ConnectionFactoryOrConstructor] = None,
+        page_size: Optional[PageSizePolicy] = None,
+        offload: Offload = None,
+        skip_resolver: bool = False,
     ) -> Resolver:
+        self._set_connection_config(
+            name,
+            resolver,
+            factory,
+            page_size,
+            offload,
+            batch=False,
+            skip_resolver=skip_resolver,
+        )
+        return resolver
+
+    def set_batch_connection(
+        self,
+        name: str,
+        resolver: Resolver,
+        *,
+        factory: Optional[ConnectionFactoryOrConstructor] = None,
+        page_size: Optional[PageSizePolicy] = None,
+        offload: Offload = None,
+        skip_resolver: bool = False,
+    ) -> Resolver:
+        self._set_connection_config(
+            name,
+            resolver,
+            factory,
+            page_size,
+            offload,
+            batch=True,
+            skip_resolver=skip_resolver,
+        )
+        return resolver
+
+    def _set_connection_config(
+        self,
+        name: str,
+        resolver: Resolver,
+        factory: Optional[ConnectionFactoryOrConstructor],
+        page_size: Optional[PageSizePolicy],
+        offload: Offload,
+        *,
+        batch: bool,
+        skip_resolver: bool = False,
+    ) -> None:
         factory = factory or DefaultConnectionFactory
         factory_instance: ConnectionFactory = (
             factory() if isinstance(factory, type) else factory
@@ -78,14 +209,22 @@ class RelayConnectionType:
         self._connection_configs[name] = RelayConnectionConfig(
             factory=factory_instance,
             resolver=resolver,
+            page_size=page_size or DefaultPageSizePolicy,
+            batch=batch,
+            offload=offload,
+            skip_resolver=skip_resolver,
         )
-        return resolver
+
+    def set_connection_hook(self, hook: Optional[ConnectionHook]) -> None:
+        self._connection_hook = hook
 
     def bind_connection_resolvers_to_graphql_type(
         self,
         graphql_type: GraphQLObjectType,
         replace_existing: bool = True,
     ) -> None:
+        hook = get_connection_hook(self._connection_hook)
+        tracer = get_default_tracer()
         for field_name, config in self._connection_configs.items():
             if field_name not in graphql_type.fields:
                 raise ValueError(
@@ -94,22 +233,105 @@ class RelayConnectionType:
                 )
             if graphql_type.fields[field_name].resolve is None or replace_existing:
                 connection_field = graphql_type.fields[field_name]
-                if is_coroutine_callable(config.resolver) or is_coroutine_callable(
-                    config.factory
-                ):
-                    connection_field.resolve = create_connection_resolver(
-                        config.resolver, config.factory
+                # so that the connection field can be recognized without its type
+                connection_field.extensions = {
+                    **(connection_field.extensions or {}),
+                    CONNECTION_EXTENSION: config,
+                }
+                paginated = not PAGINATION_ARGUMENTS.isdisjoint(connection_field.args)
+                if hook is None and tracer is None:
+                    connection_field.resolve = create_configured_connection_resolver(
+                        config, paginated=paginated
                     )
                 else:
-                    connection_field.resolve = create_connection_resolver_sync(
-                        config.resolver,
-                        cast(ConnectionCallable, config.factory),
+                    connection_field.resolve = create_instrumented_connection_resolver(
+                        config,
+                        f"{graphql_type.name}.{field_name}",
+                        hook=hook,
+                        tracer=tracer,
+                        paginated=paginated,
                     )
 
 
+def create_configured_connection_resolver(
+    config: RelayConnectionConfig, *, paginated: bool = True
+) -> Resolver:
+    resolver, factory = config.resolver, config.factory
+    # resolved when the schema is bound, as for node types, so that the
+    # default offload can be set after the types are declared
+    offloader = get_thread_offloader(config.offload)
+    options: Dict[str, Any] = dict(
+        page_size=config.page_size,
+        paginated=paginated,
+        skip_resolver=config.skip_resolver,
+    )
+    if offloader is not None and not is_coroutine_callable(resolver):
+        if config.batch or is_coroutine_callable(factory):
+            resolver = offloader.wrap(resolver)
+        else:
+            # the factory may evaluate lazy data, so both run in the pool
+            return offloader.wrap(
+                create_connection_resolver_sync(
+                    resolver, cast(ConnectionCallable, factory), **options
+                )
+            )
+    if config.batch:
+        return create_batch_connection_resolver(resolver, factory, **options)
+    if is_coroutine_callable(resolver) or is_coroutine_callable(factory):
+        return create_connection_resolver(resolver, factory, **options)
+    return create_connection_resolver_sync(
+        resolver, cast(ConnectionCallable, factory), **options
+    )
+
+
+def create_instrumented_connection_resolver(
+    config: RelayConnectionConfig,
+    field: str,
+    *,
+    hook: Optional[ConnectionHook] = None,
+    tracer: Optional[Tracer] = None,
+    paginated: bool = True,
+) -> Resolver:
+    resolver, factory = config.resolver, config.factory
+    if hook is not None:
+        resolver = observe_resolver(resolver)
+        factory = cast(ConnectionFactory, observe_factory(factory))
+    if tracer is not None:
+        resolver = trace_call(
+            resolver, tracer, CONNECTION_RESOLVER_SPAN, {FIELD: field}
+        )
+        factory = cast(ConnectionFactory, trace_factory(factory, tracer, field))
+    resolve = create_configured_connection_resolver(
+        replace(config, resolver=resolver, factory=factory), paginated=paginated
+    )
+    if hook is not None:
+        resolve = observe_connection_resolver(resolve, field, hook)
+    if tracer is not None:
+        get_connection_args = create_connection_arguments_getter(
+            config.factory, page_size=config.page_size, paginated=paginated
+        )
+        resolve = trace_connection_resolver(resolve, tracer, field, get_connection_args)
+    return resolve
+
+
 def create_connection_resolver(
-    resolver: Resolver, factory: ConnectionFactory
+    resolver: Resolver,
+    factory: ConnectionFactory,
+    *,
+    page_size: Optional[PageSizePolicy] = None,
+    paginated: bool = True,
+    skip_resolver: bool = False,
 ) -> ConnectionAwaitable:
+    get_connection_args = create_connection_arguments_getter(
+        factory, page_size=page_size, paginated=paginated
+    )
+    pass_selection = accepts_keyword(factory, "selection")
+    # the resolver is only skipped on request, as it may have side effects
+    create_empty_connection = None
+    if skip_resolver:
+        create_empty_connection = getattr(factory, "create_empty_connection", None)
+    call_factory = create_factory_caller(factory)
+
     async def resolve_connection(
         obj: Any,
         info: GraphQLResolveInfo,
@@ -120,13 +342,20 @@ def create_connection_resolver(
         last: Optional[int] = None,
         **kwargs: Any,
     ) -> Any:
-        connection_args = ConnectionArguments(
-            after=after, before=before, first=first, last=last
-        )
+        connection_args = get_connection_args(after, before, first, last)
+        selection = None
+        if pass_selection:
+            selection = ConnectionSelection.from_info(info)
+            if create_empty_connection is not None and not selection.needs_data(
+                connection_args.first, connection_args.last
+            ):
+                return create_empty_connection(connection_args)
         data = resolver(obj, info, connection_args, **kwargs)
         if isawaitable(data):
             data = await data
-        connection = factory(data, connection_args)
+        if isinstance(data, ConnectionData):
+            data = await gather_connection_data(data)
+        connection = call_factory(obj, info, data, connection_args, selection, kwargs)
         if isawaitable(connection):
             connection = await connection
         return connection
@@ -135,8 +364,22 @@ def create_connection_resolver(
 
 
 def create_connection_resolver_sync(
-    resolver: Resolver, factory: ConnectionCallable
+    resolver: Resolver,
+    factory: ConnectionCallable,
+    *,
+    page_size: Optional[PageSizePolicy] = None,
+    paginated: bool = True,
+    skip_resolver: bool = False,
 ) -> ConnectionCallable:
+    get_connection_args = create_connection_arguments_getter(
+        factory, page_size=page_size, paginated=paginated
+    )
+    pass_selection = accepts_keyword(factory, "selection")
+    create_empty_connection = None
+    if skip_resolver:
+        create_empty_connection = getattr(factory, "create_empty_connection", None)
+    call_factory = create_factory_caller(factory)
+
     def resolve_connection(
         obj: Any,
         info: GraphQLResolveInfo,
@@ -147,10 +390,213 @@ def create_connection_resolver_sync(
         last: Optional[int] = None,
         **kwargs: Any,
     ) -> Any:
-        connection_args = ConnectionArguments(
-            after=after, before=before, first=first, last=last
-        )
+        connection_args = get_connection_args(after, before, first, last)
+        selection = None
+        if pass_selection:
+            selection = ConnectionSelection.from_info(info)
+            if create_empty_connection is not None and not selection.needs_data(
+                connection_args.first, connection_args.last
+            ):
+                return create_empty_connection(connection_args)
         data = resolver(obj, info, connection_args, **kwargs)
-        return factory(data, connection_args)
+        if isinstance(data, ConnectionData) and (
+            isawaitable(data.items) or isawaitable(data.total)
+        ):
+            return resolve_connection_data(
+                obj, info, data, connection_args, selection, kwargs
+            )
+        return call_factory(obj, info, data, connection_args, selection, kwargs)
+
+    async def resolve_connection_data(
+        obj: Any,
+        info: GraphQLResolveInfo,
+        data: ConnectionData,
+        connection_args: ConnectionArguments,
+        selection: Optional[ConnectionSelection],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        data = await gather_connection_data(data)
+        return call_factory(obj, info, data, connection_args, selection, kwargs)
 
     return resolve_connection
+
+
+def create_batch_connection_resolver(
+    batch_resolver: Resolver,
+    factory: ConnectionFactory,
+    *,
+    page_size: Optional[PageSizePolicy] = None,
+    paginated: bool = True,
+    skip_resolver: bool = False,
+) -> ConnectionCallable:
+    loader = ConnectionBatchLoader(batch_resolver)
+    is_async = is_coroutine_callable(batch_resolver)
+    get_connection_args = create_connection_arguments_getter(
+        factory, page_size=page_size, paginated=paginated
+    )
+    pass_selection = accepts_keyword(factory, "selection")
+    create_empty_connection = None
+    if skip_resolver:
+        create_empty_connection = getattr(factory, "create_empty_connection", None)
+    call_factory = create_factory_caller(factory)
+
+    async def resolve_batched_connection(
+        obj: Any,
+        info: GraphQLResolveInfo,
+        connection_args: ConnectionArguments,
+        selection: Optional[ConnectionSelection],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        data = await loader.load(obj, info, connection_args, kwargs)
+        if isinstance(data, ConnectionData):
+            data = await gather_connection_data(data)
+        connection = call_factory(obj, info, data, connection_args, selection, kwargs)
+        if isawaitable(connection):
+            connection = await connection
+        return connection
+
+    def resolve_connection(
+        obj: Any,
+        info: GraphQLResolveInfo,
+        *,
+        after: Optional[str] = None,
+        before: Optional[str] = None,
+        first: Optional[int] = None,
+        last: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Any:
+        connection_args = get_connection_args(after, before, first, last)
+        selection = None
+        if pass_selection:
+            selection = ConnectionSelection.from_info(info)
+            if create_empty_connection is not None and not selection.needs_data(
+                connection_args.first, connection_args.last
+            ):
+                return create_empty_connection(connection_args)
+        if _awaits_results(info):
+            return resolve_batched_connection(
+                obj, info, connection_args, selection, kwargs
+            )
+        if is_async:
+            raise RuntimeError(
+                "Async batch connection resolvers can only be used by an async "
+                "executor"
+            )
+        # sibling parents can only be gathered when the result is awaited
+        data = loader.load_sync(obj, info, connection_args, kwargs)
+        return call_factory(obj, info, data, connection_args, selection, kwargs)
+
+    return resolve_connection
+
+
+def create_connection_arguments_getter(
+    factory: ConnectionFactory,
+    *,
+    page_size: Optional[PageSizePolicy] = None,
+    paginated: bool = True,
+) -> Callable[
+    [Optional[str], Optional[str], Optional[int], Optional[int]], ConnectionArguments
+]:
+    prepare_arguments = getattr(factory, "prepare_arguments", None)
+    # the window of the arguments decodes the cursors with the codec of the
+    # factory, which is only needed when it is not the default codec
+    cursor_codec = None
+    if isinstance(factory, BaseConnection):
+        cursor_codec = factory._cursor_codec
+
+    def get_connection_args(
+        after: Optional[str],
+        before: Optional[str],
+        first: Optional[int],
+        last: Optional[int],
+    ) -> ConnectionArguments:
+        connection_args = ConnectionArguments(after, before, first, last)
+        if cursor_codec is not None:
+            connection_args = connection_args.with_cursor_codec(cursor_codec)
+        if page_size is not None:
+            connection_args = page_size.apply(connection_args)
+        if prepare_arguments is not None:
+            connection_args = prepare_arguments(connection_args)
+        return connection_args
+
+    if not paginated:
+        # the field has no pagination arguments, so they are always the same
+        connection_args = get_connection_args(None, None, None, None)
+        return lambda *_: connection_args
+    if page_size is None and prepare_arguments is None and cursor_codec is None:
+        return ConnectionArguments
+    return get_connection_args
+
+
+def create_factory_caller(factory: ConnectionFactory) -> Callable[..., Any]:
+    pass_context = accepts_keyword(factory, "info")
+    pass_data_length = accepts_keyword(factory, "data_length")
+
+    def call_factory(
+        obj: Any,
+        info: GraphQLResolveInfo,
+        data: Any,
+        connection_args: ConnectionArguments,
+        selection: Optional[ConnectionSelection],
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        factory_kwargs: Dict[str, Any] = {}
+        if isinstance(data, ConnectionData):
+            data, data_length = data
+            if data_length is not None:
+                if isinstance(data, ConnectionSlice) and data.total is None:
+                    data = data._replace(total=data_length)
+                elif pass_data_length:
+                    factory_kwargs["data_length"] = data_length
+        if selection is not None:
+            factory_kwargs["selection"] = selection
+            if pass_context:
+                factory_kwargs.update(parent=obj, info=info, arguments=kwargs)
+        return factory(data, connection_args, **factory_kwargs)
+
+    return call_factory
+
+
+async def gather_connection_data(data: ConnectionData) -> ConnectionData:
+    items, total = data
+    if not isawaitable(items) or not isawaitable(total):
+        if isawaitable(items):
+            items = await items
+        if isawaitable(total):
+            total = await total
+        return ConnectionData(items, total)
+    tasks = [asyncio.ensure_future(items), asyncio.ensure_future(total)]
+    try:
+        items, total = await asyncio.gather(*tasks)
+    except BaseException:
+        # a failure of either fetch makes the other one pointless
+        for task in tasks:
+            task.cancel()
+        await asyncio.wait(tasks)
+        raise
+    return ConnectionData(items, total)
+
+
+def _is_loop_running() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class _Awaitable:
+    def __await__(self) -> Generator[Any, None, None]:
+        yield
+
+
+_AWAITABLE = _Awaitable()
+
+
+def _awaits_results(info: GraphQLResolveInfo) -> bool:
+    # graphql_sync() may run while a loop is running, but its executor does
+    # not await the results of resolvers
+    is_awaitable = getattr(info, "is_awaitable", None)
+    if is_awaitable is not None and not is_awaitable(_AWAITABLE):
+        return False
+    return _is_loop_running()
@@ -0,0 +1,316 @@
+import asyncio
+from collections import OrderedDict
+from inspect import isawaitable
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .global_id import get_default_global_id_codec, NodeIdParser
+
+CacheKey = Tuple[str, Hashable]
+FetchInstances = Callable[[List[Any]], Awaitable[Sequence[Any]]]
+FetchInstancesSync = Callable[[List[Any]], Sequence[Any]]
+
+_MISSING = object()
+
+
+class NodeCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class _Flight:
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class NodeCache:
+    """Cross-request cache of node instances, keyed by typename and node id.
+
+    Entries expire after `ttl` seconds, and the least recently used entries
+    are evicted beyond `max_entries`.  Lookups that resolve to `None` are
+    only cached when a `negative_ttl` is given.  With `single_flight`,
+    concurrent misses for the same node share a single fetch.  A fetch that
+    was started before its node was invalidated does not store its result.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 60.0,
+        negative_ttl: Optional[float] = None,
+        single_flight: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.single_flight = single_flight
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[Any, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._flights: Dict[CacheKey, Any] = {}
+        self._lock = threading.Lock()
+        self._types: Dict[str, Tuple[str, Optional[NodeIdParser]]] = {}
+        # invalidations are numbered while fetches are in progress, so that
+        # the fetches can tell whether their results are still current
+        self._fetches = 0
+        self._generation = 0
+        self._cleared_generation = 0
+        self._key_generations: Dict[CacheKey, int] = {}
+        self._type_generations: Dict[str, int] = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def register_type(
+        self,
+        typename: str,
+        node_typename: str,
+        id_type: Optional[NodeIdParser] = None,
+    ) -> None:
+        self._types[typename] = (node_typename, id_type)
+
+    def get(self, typename: str, node_id: Hashable) -> Any:
+        key = (typename, node_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return _MISSING
+
+    def put(self, typename: str, node_id: Hashable, value: Any) -> None:
+        self._put(typename, node_id, value)
+
+    def _put(
+        self,
+        typename: str,
+        node_id: Hashable,
+        value: Any,
+        generation: Optional[int] = None,
+    ) -> None:
+        ttl = self.ttl if value is not None else self.negative_ttl
+        if value is None and ttl is None:
+            return
+        expires = None if ttl is None else self._clock() + ttl
+        key = (typename, node_id)
+        with self._lock:
+            if generation is not None and self._is_invalidated(key, generation):
+                return
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, global_id: str) -> None:
+        typename, node_id = get_default_global_id_codec().decode(global_id)
+        node_typename, id_type = self._types.get(typename, (typename, None))
+        if id_type is not None:
+            try:
+                node_id = id_type(node_id)
+            except (TypeError, ValueError):
+                return
+        key = (node_typename, node_id)
+        with self._lock:
+            self._entries.pop(key, None)
+            # later loads fetch the node again rather than share a fetch
+            # that may return the invalidated instance
+            self._flights.pop(key, None)
+            if self._fetches:
+                self._generation += 1
+                self._key_generations[key] = self._generation
+
+    def invalidate_type(self, typename: str) -> None:
+        node_typename = self._types.get(typename, (typename, None))[0]
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == node_typename]:
+                del self._entries[key]
+            for key in [key for key in self._flights if key[0] == node_typename]:
+                del self._flights[key]
+            if self._fetches:
+                self._generation += 1
+                self._type_generations[node_typename] = self._generation
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._flights.clear()
+            if self._fetches:
+                self._generation += 1
+                self._cleared_generation = self._generation
+
+    def stats(self) -> NodeCacheStats:
+        with self._lock:
+            return NodeCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._entries),
+            )
+
+    async def load_many(
+        self,
+        typename: str,
+        node_ids: List[Any],
+        fetch: FetchInstances,
+    ) -> List[Any]:
+        results = [self.get(typename, node_id) for node_id in node_ids]
+        owned: List[int] = []
+        waiting: List[Tuple[int, "asyncio.Future[Any]"]] = []
+        futures: Dict[int, "asyncio.Future[Any]"] = {}
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for index, node_id in enumerate(node_ids):
+                if results[index] is not _MISSING:
+                    continue
+                key = (typename, node_id)
+                flight = self._flights.get(key) if self.single_flight else None
+                if isinstance(flight, asyncio.Future) and flight.get_loop() is loop:
+                    waiting.append((index, flight))
+                    continue
+                owned.append(index)
+                if self.single_flight:
+                    futures[index] = self._flights[key] = loop.create_future()
+            generation = self._start_fetch() if owned else 0
+        if owned:
+            owned_ids = [node_ids[index] for index in owned]
+            try:
+                instances = await fetch(owned_ids)
+            except BaseException as error:
+                for index in owned:
+                    self._land(typename, node_ids[index], futures.get(index), error)
+                raise
+            else:
+                for index, instance in zip(owned, instances):
+                    results[index] = instance
+                    self._put(typename, node_ids[index], instance, generation)
+                    self._land(
+                        typename, node_ids[index], futures.get(index), None, instance
+                    )
+            finally:
+                self._finish_fetch()
+        for index, flight in waiting:
+            results[index] = await asyncio.shield(flight)
+        return results
+
+    def load_many_sync(
+        self,
+        typename: str,
+        node_ids: List[Any],
+        fetch: FetchInstancesSync,
+    ) -> List[Any]:
+        results = [self.get(typename, node_id) for node_id in node_ids]
+        owned: List[int] = []
+        waiting: List[Tuple[int, _Flight]] = []
+        flights: Dict[int, _Flight] = {}
+        with self._lock:
+            for index, node_id in enumerate(node_ids):
+                if results[index] is not _MISSING:
+                    continue
+                key = (typename, node_id)
+                flight = self._flights.get(key) if self.single_flight else None
+                if isinstance(flight, _Flight):
+                    waiting.append((index, flight))
+                    continue
+                owned.append(index)
+                if self.single_flight:
+                    flights[index] = self._flights[key] = _Flight()
+            generation = self._start_fetch() if owned else 0
+        if owned:
+            owned_ids = [node_ids[index] for index in owned]
+            try:
+                instances = fetch(owned_ids)
+            except BaseException as error:
+                for index in owned:
+                    self._land(typename, node_ids[index], flights.get(index), error)
+                raise
+            else:
+                for index, instance in zip(owned, instances):
+                    results[index] = instance
+                    if not isawaitable(instance):
+                        self._put(typename, node_ids[index], instance, generation)
+                    self._land(
+                        typename, node_ids[index], flights.get(index), None, instance
+                    )
+            finally:
+                self._finish_fetch()
+        for index, flight in waiting:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            results[index] = flight.value
+        return results
+
+    def _start_fetch(self) -> int:
+        self._fetches += 1
+        return self._generation
+
+    def _finish_fetch(self) -> None:
+        with self._lock:
+            self._fetches -= 1
+            if not self._fetches:
+                self._key_generations.clear()
+                self._type_generations.clear()
+
+    def _is_invalidated(self, key: CacheKey, generation: int) -> bool:
+        return (
+            max(
+                self._cleared_generation,
+                self._type_generations.get(key[0], 0),
+                self._key_generations.get(key, 0),
+            )
+            > generation
+        )
+
+    def _land(
+        self,
+        typename: str,
+        node_id: Any,
+        flight: Any,
+        error: Optional[BaseException],
+        value: Any = None,
+    ) -> None:
+        if flight is None:
+            return
+        key = (typename, node_id)
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        if isinstance(flight, _Flight):
+            flight.value = value
+            flight.error = error
+            flight.event.set()
+        elif not flight.done():
+            if error is not None:
+                flight.set_exception(error)
+                # the error is raised by the fetching caller, so waiters
+                # that were cancelled must not log it as unretrieved
+                flight.exception()
+            else:
+                flight.set_result(value)
@@ -3,31 +3,78 @@ from .base import (
     ConnectionArguments,
     ConnectionAwaitable,
     ConnectionCallable,
+    ConnectionData,
     ConnectionFactory,
     ConnectionFactoryConstructor,
     ConnectionFactoryOrConstructor,
+    ConnectionSlice,
+    CountedConnection,
+    CountListener,
+    SliceWindow,
 )
+from .count import (
+    CappedCount,
+    CountCache,
+    CountStrategy,
+    EstimatedCount,
+    ExactCount,
+    TotalCount,
+)
+from .cursor import (
+    CompactCursorCodec,
+    CursorCodec,
+    set_default_cursor_codec,
+)
+from .keyset import KeysetConnection, KeysetConnectionArguments
+from .page_size import PageSizePolicy
 from .proxy import ConnectionProxy
 from .reference import ReferenceConnection
+from .selection import ConnectionSelection
 from .snake_case import (
     SnakeCaseBaseConnection,
     SnakeCaseConnection,
     SnakeCaseConnectionType,
     SnakeCasePageInfoType,
 )
+from .streaming import (
+    BaseStreamingConnection,
+    StreamingConnection,
+    SyncStreamingConnection,
+)
 
 __all__ = [
     "BaseConnection",
+    "BaseStreamingConnection",
+    "CappedCount",
+    "CompactCursorCodec",
     "ConnectionArguments",
     "ConnectionAwaitable",
     "ConnectionCallable",
+    "ConnectionData",
     "ConnectionFactory",
     "ConnectionFactoryConstructor",
     "ConnectionFactoryOrConstructor",
     "ConnectionProxy",
+    "ConnectionSelection",
+    "ConnectionSlice",
+    "CountCache",
+    "CountedConnection",
+    "CountListener",
+    "CountStrategy",
+    "CursorCodec",
+    "EstimatedCount",
+    "ExactCount",
+    "KeysetConnection",
+    "KeysetConnectionArguments",
+    "PageSizePolicy",
     "ReferenceConnection",
+    "set_default_cursor_codec",
+    "SliceWindow",
     "SnakeCaseBaseConnection",
     "SnakeCaseConnection",
     "SnakeCaseConnectionType",
     "SnakeCasePageInfoType",
+    "StreamingConnection",
+    "SyncStreamingConnection",
+    "TotalCount",
 ]
@@ -8,6 +8,7 @@ from typing import (
     List,
     NamedTuple,
     Optional,
+    Tuple,
     TypeVar,
     Union,
 )
@@ -17,15 +18,24 @@ try:
 except ImportError:  # Python < 3.8
     from typing_extensions import Protocol  # type: ignore
 
+from graphql import GraphQLResolveInfo
 from graphql_relay import (
-    connection_from_array_slice,
+    Connection,
+    ConnectionCursor,
+    Edge,
     EdgeConstructor,
     EdgeType,
+    PageInfo,
     PageInfoConstructor,
     PageInfoType,
     SizedSliceable,
 )
 
+from .count import CountStrategy
+from .cursor import CursorCodec, get_default_cursor_codec
+from .selection import ConnectionSelection
+from ..metrics import record_count, record_fetch
+
 ConnectionType_T = TypeVar("ConnectionType_T", covariant=True)
 
 
@@ -35,16 +45,156 @@ class ConnectionConstructor(Protocol[ConnectionType_T]):
         *,
         edges: List[EdgeType],
         pageInfo: PageInfoType,
-    ) -> ConnectionType_T:
-        ...
+    ) -> ConnectionType_T: ...
+
+
+class CountedConnection(NamedTuple):
+    edges: List[EdgeType]
+    pageInfo: PageInfoType
+    totalCount: Any = None
+
+
+class SliceWindow(NamedTuple):
+    """Range of the data that is needed to produce a connection page.
+
+    `limit` is `None` when the range extends to the end of the data.  When
+    `needs_total` is set, the range is the final `limit` items starting no
+    earlier than `offset` and ending no later than `before`, and
+    `with_total()` must be used to resolve it.  A `before` offset past the
+    end of the data is then ignored, as in `connection_from_array_slice()`.
+    """
+
+    offset: int
+    limit: Optional[int]
+    needs_total: bool = False
+    before: Optional[int] = None
+
+    def with_total(self, total: int) -> "SliceWindow":
+        if not self.needs_total:
+            return self
+        end = total if self.before is None else min(self.before, total)
+        offset = max(self.offset, end - cast(int, self.limit))
+        return SliceWindow(offset=offset, limit=max(end - offset, 0))
 
 
 class ConnectionArguments(NamedTuple):
+    """Pagination arguments of a connection field.
+
+    The cursors are decoded for `window` with the default codec, or with
+    the codec given to `with_cursor_codec()`.
+    """
+
     after: Optional[str] = None
     before: Optional[str] = None
     first: Optional[int] = None
     last: Optional[int] = None
 
+    @property
+    def cursor_codec(self) -> Optional[CursorCodec]:
+        return None
+
+    @property
+    def window(self) -> SliceWindow:
+        return get_slice_window(self)
+
+    def with_cursor_codec(self, cursor_codec: CursorCodec) -> "ConnectionArguments":
+        return CodecConnectionArguments._make(self)._bind(cursor_codec)
+
+
+class CodecConnectionArguments(ConnectionArguments):
+    """Pagination arguments whose cursors are decoded with a given codec.
+
+    The codec is not one of the fields, so the arguments still unpack and
+    compare like those of `ConnectionArguments`.
+    """
+
+    _cursor_codec: Optional[CursorCodec] = None
+
+    @property
+    def cursor_codec(self) -> Optional[CursorCodec]:
+        return self._cursor_codec
+
+    def _bind(self, cursor_codec: Optional[CursorCodec]) -> "CodecConnectionArguments":
+        self._cursor_codec = cursor_codec
+        return self
+
+    def _replace(self, **kwargs: Any) -> "CodecConnectionArguments":
+        return super()._replace(**kwargs)._bind(self._cursor_codec)
+
+
+class ConnectionSlice(NamedTuple):
+    items: SizedSliceable
+    offset: int = 0
+    total: Optional[int] = None
+
+
+class ConnectionData(NamedTuple):
+    """Data of a connection along with its total length.
+
+    When resolved asynchronously, either value can be an awaitable, and
+    the awaitables are awaited concurrently.
+    """
+
+    items: Any
+    total: Any = None
+
+
+def get_slice_window(
+    connection_args: ConnectionArguments,
+    cursor_codec: Optional[CursorCodec] = None,
+) -> SliceWindow:
+    lower_bound, upper_bound = get_offset_bounds(connection_args, cursor_codec)
+    first, last = connection_args.first, connection_args.last
+    if isinstance(first, int):
+        limit: Optional[int] = first + 1
+        if upper_bound is not None:
+            limit = max(min(cast(int, limit), upper_bound - lower_bound), 0)
+        return SliceWindow(offset=lower_bound, limit=limit)
+    if isinstance(last, int):
+        # the before cursor can be stale, so the end of the range is only
+        # known once it is clamped to the total
+        return SliceWindow(
+            offset=lower_bound, limit=last, needs_total=True, before=upper_bound
+        )
+    if upper_bound is None:
+        return SliceWindow(offset=lower_bound, limit=None)
+    return SliceWindow(offset=lower_bound, limit=max(upper_bound - lower_bound, 0))
+
+
+def get_offset_bounds(
+    connection_args: ConnectionArguments,
+    cursor_codec: Optional[CursorCodec] = None,
+) -> Tuple[int, Optional[int]]:
+    after, before, first, last = connection_args
+    if isinstance(first, int) and first < 0:
+        raise ValueError("Argument 'first' must be a non-negative integer.")
+    if isinstance(last, int) and last < 0:
+        raise ValueError("Argument 'last' must be a non-negative integer.")
+    codec = cursor_codec or connection_args.cursor_codec
+    decode = (codec or get_default_cursor_codec()).decode
+    lower_bound = max(_decode_offset(decode, after, -1) + 1, 0)
+    upper_bound = _decode_offset(decode, before, -1)
+    return lower_bound, upper_bound if upper_bound >= 0 else None
+
+
+def get_page_bounds(
+    connection_args: ConnectionArguments,
+    cursor_codec: Optional[CursorCodec] = None,
+) -> Tuple[int, Optional[int]]:
+    """Offsets that `hasPreviousPage` and `hasNextPage` are computed against.
+
+    As in `connection_from_array_slice()`, these are the offsets of the
+    cursors even when they are negative.  The upper bound is `None` without
+    a `before` cursor that can be decoded.
+    """
+    after, before = connection_args.after, connection_args.before
+    codec = cursor_codec or connection_args.cursor_codec
+    decode = (codec or get_default_cursor_codec()).decode
+    lower_bound = _decode_offset(decode, after, -1) + 1 if after else 0
+    return lower_bound, decode(before) if before else None
+
+
+CountListener = Callable[[int], None]
 
 ConnectionAwaitable = Callable[..., Awaitable[Any]]
 ConnectionCallable = Callable[..., Any]
@@ -52,8 +202,7 @@ ConnectionFactory = Union[ConnectionAwaitable, ConnectionCallable]
 
 
 class AsyncConnectionFactoryConstructor(Protocol):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        ...
+    def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     async def __call__(
         self,
@@ -61,13 +210,11 @@ class AsyncConnectionFactoryConstructor(Protocol):
         connection_args: ConnectionArguments,
         *args: Any,
         **kwargs: Any,
-    ) -> Any:
-        ...
+    ) -> Any: ...
 
 
 class SyncConnectionFactoryConstructor(Protocol):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        ...
+    def __init__(self, *args: Any, **kwargs: Any) -> None: ...
 
     def __call__(
         self,
@@ -75,8 +222,7 @@ class SyncConnectionFactoryConstructor(Protocol):
         connection_args: ConnectionArguments,
         *args: Any,
         **kwargs: Any,
-    ) -> Any:
-        ...
+    ) -> Any: ...
 
 
 ConnectionFactoryConstructor = Union[
@@ -92,10 +238,22 @@ class BaseConnection(Generic[ConnectionType_T]):
         connection_type: Optional[ConnectionConstructor[ConnectionType_T]] = None,
         edge_type: Optional[EdgeConstructor] = None,
         page_info_type: Optional[PageInfoConstructor] = None,
+        count_free: bool = False,
+        on_count: Optional[CountListener] = None,
+        cursor_codec: Optional[CursorCodec] = None,
+        total_count: Optional[CountStrategy] = None,
     ) -> None:
         self._connection_type = connection_type
         self._edge_type = edge_type
         self._page_info_type = page_info_type
+        self._cursor_codec = cursor_codec
+        self.count_free = count_free
+        self.on_count = on_count
+        self.total_count = total_count
+
+    @property
+    def cursor_codec(self) -> CursorCodec:
+        return self._cursor_codec or get_default_cursor_codec()
 
     def create_connection(
         self,
@@ -103,20 +261,400 @@ class BaseConnection(Generic[ConnectionType_T]):
         connection_args: ConnectionArguments,
         *,
         data_length: Optional[int] = None,
+        selection: Optional[ConnectionSelection] = None,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> ConnectionType_T:
+        if isinstance(data, ConnectionSlice):
+            connection_slice = cast(ConnectionSlice, data)
+            total_count = self.get_total_count(
+                connection_slice.items,
+                connection_slice.total,
+                selection=selection,
+                parent=parent,
+                info=info,
+                arguments=arguments,
+            )
+            return self.create_connection_from_slice(
+                connection_slice,
+                connection_args,
+                selection=selection,
+                total_count=total_count,
+            )
+        if data_length is None and not self.count_free:
+            data_length = self.count(data)
+        total_count = self.get_total_count(
+            data,
+            data_length,
+            selection=selection,
+            parent=parent,
+            info=info,
+            arguments=arguments,
+        )
+        if data_length is None:
+            return self.create_count_free_connection(
+                data, connection_args, selection=selection, total_count=total_count
+            )
+        return self.create_sliced_connection(
+            data,
+            connection_args,
+            0,
+            data_length,
+            data_length,
+            selection=selection,
+            total_count=total_count,
+        )
+
+    def get_total_count(
+        self,
+        data: SizedSliceable,
+        total: Optional[int],
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        if self.total_count is None:
+            return None
+        if selection is not None and "totalCount" not in selection.fields:
+            return None
+        return self.total_count.get_count(
+            data, total, self.count, parent=parent, info=info, arguments=arguments
+        )
+
+    def create_empty_connection(
+        self, connection_args: ConnectionArguments
     ) -> ConnectionType_T:
-        data_length = len(data) if data_length is None else data_length
-        kwargs: Dict[str, Any] = dict(array_slice_length=data_length)
-        if self._connection_type is not None:
-            kwargs["connection_type"] = self._connection_type
-        if self._edge_type is not None:
-            kwargs["edge_type"] = self._edge_type
-        if self._page_info_type is not None:
-            kwargs["page_info_type"] = self._page_info_type
-        return cast(
-            ConnectionType_T,
-            connection_from_array_slice(
+        first, last = connection_args.first, connection_args.last
+        if isinstance(first, int) and first < 0:
+            raise ValueError("Argument 'first' must be a non-negative integer.")
+        if isinstance(last, int) and last < 0:
+            raise ValueError("Argument 'last' must be a non-negative integer.")
+        return self.build_page(None, 0, 0, False, False)
+
+    def create_connection_from_slice(
+        self,
+        connection_slice: ConnectionSlice,
+        connection_args: ConnectionArguments,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        total_count: Any = None,
+    ) -> ConnectionType_T:
+        items, offset, total = connection_slice
+        if total is None:
+            return self.create_count_free_connection(
+                items,
+                connection_args,
+                slice_start=offset,
+                selection=selection,
+                total_count=total_count,
+            )
+        return self.create_sliced_connection(
+            items,
+            connection_args,
+            offset,
+            len(items),
+            total,
+            selection=selection,
+            total_count=total_count,
+        )
+
+    def create_sliced_connection(
+        self,
+        data: SizedSliceable,
+        connection_args: ConnectionArguments,
+        slice_start: int,
+        slice_length: int,
+        array_length: int,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        total_count: Any = None,
+    ) -> ConnectionType_T:
+        start_offset, end_offset, has_previous_page, has_next_page = get_page_range(
+            connection_args,
+            slice_start,
+            slice_start + slice_length,
+            array_length,
+            self.cursor_codec,
+        )
+        nodes = None
+        if selection is None or selection.needs_edges:
+            nodes = _slice(data, slice_start, start_offset, end_offset)
+        return self.build_page(
+            nodes,
+            start_offset,
+            end_offset,
+            has_previous_page,
+            has_next_page,
+            selection=selection,
+            total_count=total_count,
+        )
+
+    def create_count_free_connection(
+        self,
+        data: SizedSliceable,
+        connection_args: ConnectionArguments,
+        *,
+        slice_start: int = 0,
+        selection: Optional[ConnectionSelection] = None,
+        total_count: Any = None,
+    ) -> ConnectionType_T:
+        codec = self.cursor_codec
+        lower_bound, upper_bound = get_offset_bounds(connection_args, codec)
+        page_lower, page_upper = get_page_bounds(connection_args, codec)
+        first, last = connection_args.first, connection_args.last
+        has_cursors = bool(connection_args.after or connection_args.before)
+        has_previous_page = has_next_page = False
+        start_offset = max(lower_bound, slice_start)
+        if isinstance(last, int) and not isinstance(first, int) and upper_bound is None:
+            # the page ends at the end of the data
+            return self.create_counted_connection(
                 data,
-                connection_args._asdict(),
-                **kwargs,
-            ),
+                connection_args,
+                slice_start,
+                selection=selection,
+                total_count=total_count,
+            )
+        if (
+            isinstance(first, int)
+            and last is None
+            and selection is not None
+            and not selection.needs_cursors
+        ):
+            # only the page booleans are selected, so probe for the item
+            # that follows the page instead of fetching the page itself
+            probe_start = start_offset + first
+            probe: List[Any] = []
+            if upper_bound is None or probe_start < upper_bound:
+                probe = _slice(data, slice_start, probe_start, probe_start + 1)
+            if not probe and has_cursors:
+                # the cursors may point past the end of the data
+                return self.create_counted_connection(
+                    data,
+                    connection_args,
+                    slice_start,
+                    selection=selection,
+                    total_count=total_count,
+                )
+            has_next_page = bool(probe) and (page_upper is None or page_upper >= 0)
+            return self.build_page(
+                None,
+                start_offset,
+                start_offset,
+                has_previous_page,
+                has_next_page,
+                total_count=total_count,
+            )
+        stop = upper_bound
+        if isinstance(first, int):
+            stop = start_offset + first + 1
+            if upper_bound is not None:
+                stop = min(stop, upper_bound)
+        elif isinstance(last, int):
+            start_offset = max(start_offset, cast(int, upper_bound) - last)
+        nodes = _slice(data, slice_start, start_offset, stop)
+        if not nodes and has_cursors:
+            # the cursors may point past the end of the data
+            return self.create_counted_connection(
+                data,
+                connection_args,
+                slice_start,
+                selection=selection,
+                total_count=total_count,
+            )
+        if upper_bound is not None and len(nodes) < cast(int, stop) - start_offset:
+            # the data ends before the before cursor, which tells its length
+            return self.create_counted_connection(
+                data,
+                connection_args,
+                slice_start,
+                start_offset + len(nodes) - slice_start,
+                selection=selection,
+                total_count=total_count,
+            )
+        if isinstance(first, int):
+            has_next_page = len(nodes) > first and (
+                page_upper is None or page_upper >= 0
+            )
+            del nodes[first:]
+            if isinstance(last, int) and len(nodes) > last:
+                start_offset += len(nodes) - last
+                del nodes[: len(nodes) - last]
+        if isinstance(last, int):
+            has_previous_page = start_offset > page_lower
+        return self.build_page(
+            nodes if selection is None or selection.needs_edges else None,
+            start_offset,
+            start_offset + len(nodes),
+            has_previous_page,
+            has_next_page,
+            selection=selection,
+            total_count=total_count,
         )
+
+    def create_counted_connection(
+        self,
+        data: SizedSliceable,
+        connection_args: ConnectionArguments,
+        slice_start: int = 0,
+        data_length: Optional[int] = None,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        total_count: Any = None,
+    ) -> ConnectionType_T:
+        if data_length is None:
+            data_length = self.count(data)
+        return self.create_sliced_connection(
+            data,
+            connection_args,
+            slice_start,
+            data_length,
+            slice_start + data_length,
+            selection=selection,
+            total_count=total_count,
+        )
+
+    def count(self, data: SizedSliceable) -> int:
+        data_length = len(data)
+        record_count()
+        if self.on_count is not None:
+            self.on_count(data_length)
+        return data_length
+
+    def build_edge(self, node: Any, cursor: ConnectionCursor) -> EdgeType:
+        edge_type = self._edge_type or cast(EdgeConstructor, Edge)
+        return edge_type(node=node, cursor=cursor)
+
+    def build_page(
+        self,
+        nodes: Optional[List[Any]],
+        start_offset: int,
+        end_offset: int,
+        has_previous_page: bool,
+        has_next_page: bool,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        total_count: Any = None,
+    ) -> ConnectionType_T:
+        codec = self.cursor_codec
+        edges: List[EdgeType] = []
+        edge_cursors = selection is None or selection.needs_edge_cursors
+        if nodes is not None:
+            end_offset = start_offset + len(nodes)
+            if edge_cursors:
+                cursors = codec.encode_range(start_offset, end_offset)
+                edges = [
+                    self.build_edge(node, cursor)
+                    for node, cursor in zip(nodes, cursors)
+                ]
+            else:
+                # cursors are not selected, so the edges are left without one
+                edges = [self.build_edge(node, cast(str, None)) for node in nodes]
+        start_cursor = end_cursor = None
+        if end_offset > start_offset and (
+            selection is None or selection.needs_page_cursors
+        ):
+            if edges and edge_cursors:
+                start_cursor, end_cursor = edges[0].cursor, edges[-1].cursor
+            else:
+                start_cursor = codec.encode(start_offset)
+                end_cursor = codec.encode(end_offset - 1)
+        return self.build_connection(
+            edges,
+            has_previous_page=has_previous_page,
+            has_next_page=has_next_page,
+            start_cursor=start_cursor,
+            end_cursor=end_cursor,
+            total_count=total_count,
+        )
+
+    def build_connection(
+        self,
+        edges: List[EdgeType],
+        *,
+        has_previous_page: bool,
+        has_next_page: bool,
+        start_cursor: Optional[ConnectionCursor] = None,
+        end_cursor: Optional[ConnectionCursor] = None,
+        total_count: Any = None,
+    ) -> ConnectionType_T:
+        page_info_type = self._page_info_type or cast(PageInfoConstructor, PageInfo)
+        if edges and start_cursor is None:
+            start_cursor, end_cursor = edges[0].cursor, edges[-1].cursor
+        page_info = page_info_type(
+            startCursor=start_cursor,
+            endCursor=end_cursor,
+            hasPreviousPage=has_previous_page,
+            hasNextPage=has_next_page,
+        )
+        if total_count is None:
+            connection_type = self._connection_type or cast(
+                ConnectionConstructor[ConnectionType_T], Connection
+            )
+            return connection_type(edges=edges, pageInfo=page_info)
+        counted_connection_type = self._connection_type or CountedConnection
+        return cast(Callable[..., ConnectionType_T], counted_connection_type)(
+            edges=edges, pageInfo=page_info, totalCount=total_count
+        )
+
+
+def get_page_range(
+    connection_args: ConnectionArguments,
+    slice_start: int,
+    slice_end: int,
+    array_length: int,
+    cursor_codec: Optional[CursorCodec] = None,
+) -> Tuple[int, int, bool, bool]:
+    # mirrors the offset arithmetic of connection_from_array_slice()
+    decode = (cursor_codec or get_default_cursor_codec()).decode
+    after, before, first, last = connection_args
+    start_offset = max(slice_start, 0)
+    end_offset = min(slice_end, array_length)
+    after_offset = _decode_offset(decode, after, -1)
+    if 0 <= after_offset < array_length:
+        start_offset = max(start_offset, after_offset + 1)
+    before_offset = _decode_offset(decode, before, end_offset)
+    if 0 <= before_offset < array_length:
+        end_offset = min(end_offset, before_offset)
+    if isinstance(first, int):
+        if first < 0:
+            raise ValueError("Argument 'first' must be a non-negative integer.")
+        end_offset = min(end_offset, start_offset + first)
+    if isinstance(last, int):
+        if last < 0:
+            raise ValueError("Argument 'last' must be a non-negative integer.")
+        start_offset = max(start_offset, end_offset - last)
+    lower_bound = after_offset + 1 if after else 0
+    upper_bound = before_offset if before else array_length
+    return (
+        start_offset,
+        max(end_offset, start_offset),
+        isinstance(last, int) and start_offset > lower_bound,
+        isinstance(first, int) and end_offset < upper_bound,
+    )
+
+
+def _decode_offset(
+    decode: Callable[[ConnectionCursor], Optional[int]],
+    cursor: Optional[ConnectionCursor],
+    default: int,
+) -> int:
+    if not cursor:
+        return default
+    offset = decode(cursor)
+    return default if offset is None else offset
+
+
+def _slice(
+    data: SizedSliceable, slice_start: int, start: int, end: Optional[int]
+) -> List[Any]:
+    start -= slice_start
+    if end is None:
+        nodes = list(data[start:])
+    else:
+        end -= slice_start
+        nodes = list(data[start:end])
+    record_fetch(len(nodes))
+    return nodes
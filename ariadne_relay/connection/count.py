@@ -0,0 +1,220 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from inspect import isawaitable
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from graphql import GraphQLResolveInfo
+from graphql_relay import SizedSliceable
+
+from ..utils import freeze
+
+TotalCount = Union[int, str]
+CountEstimator = Callable[[Any], Union[int, Awaitable[int]]]
+CountKey = Callable[[Any, GraphQLResolveInfo, Dict[str, Any]], Optional[Hashable]]
+
+_MISSING = object()
+
+
+class CountCache:
+    """Cache of connection counts, keyed by parent, field and filter arguments.
+
+    Entries expire after `ttl` seconds, and the least recently used entries
+    are evicted beyond `max_entries`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl: Optional[float] = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be a positive integer")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires is not None and expires <= self._clock():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        expires = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class CountStrategy(ABC):
+    """Computes the `totalCount` of a connection.
+
+    With a `cache`, counts are shared between requests for the same parent,
+    field and filter arguments.  The parent is identified by its `id`, and
+    a custom `key` callable can be given to identify it otherwise.  Counts
+    are not cached when no key can be derived.  Factories that paginate by
+    the length of the data still take it, unless they are count-free.
+    """
+
+    def __init__(
+        self,
+        *,
+        cache: Optional[CountCache] = None,
+        key: Optional[CountKey] = None,
+    ) -> None:
+        self.cache = cache
+        self._key = key
+
+    @abstractmethod
+    def count(
+        self,
+        data: SizedSliceable,
+        total: Optional[int],
+        count: Callable[[SizedSliceable], int],
+    ) -> Union[TotalCount, Awaitable[TotalCount]]:
+        pass
+
+    def get_count(
+        self,
+        data: SizedSliceable,
+        total: Optional[int],
+        count: Callable[[SizedSliceable], int],
+        *,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> Union[TotalCount, Awaitable[TotalCount]]:
+        key = None
+        if self.cache is not None and info is not None:
+            key = self.get_cache_key(parent, info, arguments or {})
+        if key is None:
+            return self.count(data, total, count)
+        cache = self.cache
+        assert cache is not None
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value  # type: ignore[no-any-return]
+        value = self.count(data, total, count)
+        if isawaitable(value):
+            return _put_awaited(cache, key, value)
+        cache.put(key, value)
+        return value  # type: ignore[no-any-return]
+
+    def get_cache_key(
+        self, parent: Any, info: GraphQLResolveInfo, arguments: Dict[str, Any]
+    ) -> Optional[Hashable]:
+        if self._key is not None:
+            parent_key = self._key(parent, info, arguments)
+        elif isinstance(parent, Mapping):
+            parent_key = parent.get("id")
+        else:
+            parent_key = getattr(parent, "id", None)
+        if parent_key is None and parent is not None:
+            return None
+        try:
+            key = (
+                info.parent_type.name,
+                info.field_name,
+                parent_key,
+                freeze(arguments),
+            )
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+
+class ExactCount(CountStrategy):
+    def count(
+        self,
+        data: SizedSliceable,
+        total: Optional[int],
+        count: Callable[[SizedSliceable], int],
+    ) -> TotalCount:
+        return count(data) if total is None else total
+
+
+class EstimatedCount(CountStrategy):
+    """Reports the count returned by `estimate`, which is called with the data."""
+
+    def __init__(
+        self,
+        estimate: CountEstimator,
+        *,
+        cache: Optional[CountCache] = None,
+        key: Optional[CountKey] = None,
+    ) -> None:
+        super().__init__(cache=cache, key=key)
+        self.estimate = estimate
+
+    def count(
+        self,
+        data: SizedSliceable,
+        total: Optional[int],
+        count: Callable[[SizedSliceable], int],
+    ) -> Union[TotalCount, Awaitable[TotalCount]]:
+        return self.estimate(data)
+
+
+class CappedCount(CountStrategy):
+    """Counts at most `cap` items, and reports larger counts as `"<cap>+"`."""
+
+    def __init__(
+        self,
+        cap: int,
+        *,
+        cache: Optional[CountCache] = None,
+        key: Optional[CountKey] = None,
+    ) -> None:
+        if cap < 0:
+            raise ValueError("cap must be a non-negative integer")
+        super().__init__(cache=cache, key=key)
+        self.cap = cap
+
+    def count(
+        self,
+        data: SizedSliceable,
+        total: Optional[int],
+        count: Callable[[SizedSliceable], int],
+    ) -> TotalCount:
+        if total is None:
+            total = count(data[: self.cap + 1])
+        return f"{self.cap}+" if total > self.cap else total
+
+
+async def _put_awaited(
+    cache: CountCache, key: Hashable, value: Awaitable[TotalCount]
+) -> TotalCount:
+    result = await value
+    cache.put(key, result)
+    return result
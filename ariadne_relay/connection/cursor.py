@@ -0,0 +1,98 @@
+from base64 import b64encode
+from typing import List, Optional
+
+from graphql_relay import ConnectionCursor, cursor_to_offset
+
+from ..global_id import BASE62_ALPHABET
+
+LEGACY_CURSOR_PREFIX = "arrayconnection:"
+
+# "arrayconnection" is 15 bytes long, so its base64 encoding is a fixed
+# prefix of every legacy cursor, and only ":<offset>" needs to be encoded
+_LEGACY_ENCODED_PREFIX = b64encode(LEGACY_CURSOR_PREFIX[:-1].encode()).decode()
+_BASE62_INDEX = {char: index for index, char in enumerate(BASE62_ALPHABET)}
+_BLOCK_SIZE = len(BASE62_ALPHABET) ** 2
+_PADDED_DIGITS = [high + low for high in BASE62_ALPHABET for low in BASE62_ALPHABET]
+_DIGITS = [digits.lstrip("0") or "0" for digits in _PADDED_DIGITS]
+
+
+class CursorCodec:
+    """Encodes and decodes offset cursors in the Relay reference format."""
+
+    def encode(self, offset: int) -> ConnectionCursor:
+        return _encode_legacy(offset)
+
+    def encode_range(self, start: int, stop: int) -> List[ConnectionCursor]:
+        return [_encode_legacy(offset) for offset in range(start, stop)]
+
+    def decode(self, cursor: ConnectionCursor) -> Optional[int]:
+        return cursor_to_offset(cursor)
+
+
+class CompactCursorCodec(CursorCodec):
+    """Encodes offset cursors as short base62 strings.
+
+    Cursors in the reference format are still decoded, so that cursors held
+    by existing clients remain valid.
+    """
+
+    prefix = "~"
+
+    def encode(self, offset: int) -> ConnectionCursor:
+        return self.prefix + _encode_base62(offset)
+
+    def encode_range(self, start: int, stop: int) -> List[ConnectionCursor]:
+        cursors: List[ConnectionCursor] = []
+        while start < stop:
+            # offsets within the same block share all but their last two digits
+            high, low = divmod(start, _BLOCK_SIZE)
+            block_stop = min(stop, (high + 1) * _BLOCK_SIZE) - high * _BLOCK_SIZE
+            if high:
+                prefix = self.prefix + _encode_base62(high)
+                digits = _PADDED_DIGITS
+            else:
+                prefix = self.prefix
+                digits = _DIGITS
+            cursors.extend(prefix + digits[index] for index in range(low, block_stop))
+            start += block_stop - low
+        return cursors
+
+    def decode(self, cursor: ConnectionCursor) -> Optional[int]:
+        if not cursor.startswith(self.prefix):
+            return cursor_to_offset(cursor)
+        prefix_length = len(self.prefix)
+        digits = cursor[prefix_length:]
+        if not digits:
+            return None
+        offset = 0
+        for char in digits:
+            digit = _BASE62_INDEX.get(char)
+            if digit is None:
+                return None
+            offset = offset * 62 + digit
+        return offset
+
+
+DefaultCursorCodec: CursorCodec = CursorCodec()
+
+
+def get_default_cursor_codec() -> CursorCodec:
+    return DefaultCursorCodec
+
+
+def set_default_cursor_codec(codec: CursorCodec) -> None:
+    global DefaultCursorCodec
+    DefaultCursorCodec = codec
+
+
+def _encode_legacy(offset: int) -> ConnectionCursor:
+    return _LEGACY_ENCODED_PREFIX + b64encode(b":%d" % offset).decode()
+
+
+def _encode_base62(value: int) -> str:
+    if value < _BLOCK_SIZE:
+        if value < 0:
+            raise ValueError(f"Cannot encode a negative offset: {value}")
+        return _DIGITS[value]
+    high, low = divmod(value, _BLOCK_SIZE)
+    return _encode_base62(high) + _PADDED_DIGITS[low]
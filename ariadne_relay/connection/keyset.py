@@ -0,0 +1,202 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+import json
+from operator import attrgetter
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from uuid import UUID
+
+from graphql_relay import (
+    ConnectionType,
+    EdgeConstructor,
+    PageInfoConstructor,
+)
+from graphql_relay.utils import base64, unbase64
+
+from .base import (
+    BaseConnection,
+    ConnectionArguments,
+    ConnectionConstructor,
+)
+from .selection import ConnectionSelection
+from ..metrics import record_fetch
+
+KeysetKey = Union[str, Sequence[str], Callable[[Any], Any]]
+
+KEYSET_CURSOR_PREFIX = "keyset:"
+
+# values that JSON cannot represent are encoded as a single-key object
+# tagged with their type, the subclasses before their bases
+KEY_VALUE_TYPES: Dict[str, Tuple[type, Callable[[str], Any]]] = {
+    "datetime": (datetime, datetime.fromisoformat),
+    "date": (date, date.fromisoformat),
+    "time": (time, time.fromisoformat),
+    "uuid": (UUID, UUID),
+    "decimal": (Decimal, Decimal),
+}
+
+
+class KeysetConnectionArguments(NamedTuple):
+    after: Optional[str] = None
+    before: Optional[str] = None
+    first: Optional[int] = None
+    last: Optional[int] = None
+    after_key: Optional[Tuple[Any, ...]] = None
+    before_key: Optional[Tuple[Any, ...]] = None
+    direction: str = "forward"
+    limit: Optional[int] = None
+
+
+class KeysetConnection(BaseConnection[ConnectionType]):
+    """Connection factory that paginates by seeking on a sort key.
+
+    Cursors encode the sort key of their node, and the connection resolver
+    receives `KeysetConnectionArguments` with the decoded `after_key` and
+    `before_key`, the `direction` and the `limit` of rows to fetch.  Rows
+    must be returned in ascending key order when paginating forward, and in
+    descending key order when paginating backward.  The `limit` includes
+    one extra row, which is used to determine whether a further page exists.
+
+    Key values are encoded as JSON, except for datetimes, dates, times,
+    UUIDs and decimals, which are tagged with their type so that they are
+    decoded to the same type.  Other types can be supported by overriding
+    `encode_key_value()` and `decode_key_value()`.
+    """
+
+    def __init__(
+        self,
+        key: KeysetKey,
+        *,
+        connection_type: Optional[ConnectionConstructor[ConnectionType]] = None,
+        edge_type: Optional[EdgeConstructor] = None,
+        page_info_type: Optional[PageInfoConstructor] = None,
+    ) -> None:
+        super().__init__(
+            connection_type=connection_type,
+            edge_type=edge_type,
+            page_info_type=page_info_type,
+        )
+        if callable(key):
+            self._get_key = key
+        elif isinstance(key, str):
+            self._get_key = attrgetter(key)
+        else:
+            self._get_key = attrgetter(*key)
+
+    def prepare_arguments(
+        self, connection_args: ConnectionArguments
+    ) -> KeysetConnectionArguments:
+        after, before, first, last = connection_args
+        if isinstance(first, int) and first < 0:
+            raise ValueError("Argument 'first' must be a non-negative integer.")
+        if isinstance(last, int) and last < 0:
+            raise ValueError("Argument 'last' must be a non-negative integer.")
+        if isinstance(last, int) and not isinstance(first, int):
+            direction = "backward"
+            limit: Optional[int] = last + 1
+        else:
+            direction = "forward"
+            limit = first + 1 if isinstance(first, int) else None
+        return KeysetConnectionArguments(
+            after=after,
+            before=before,
+            first=first,
+            last=last,
+            after_key=self.decode_cursor(after) if after else None,
+            before_key=self.decode_cursor(before) if before else None,
+            direction=direction,
+            limit=limit,
+        )
+
+    def get_key(self, node: Any) -> Tuple[Any, ...]:
+        key = self._get_key(node)
+        return tuple(key) if isinstance(key, (list, tuple)) else (key,)
+
+    def encode_cursor(self, key: Sequence[Any]) -> str:
+        values = [self.encode_key_value(value) for value in key]
+        return base64(KEYSET_CURSOR_PREFIX + json.dumps(values, separators=(",", ":")))
+
+    def decode_cursor(self, cursor: str) -> Tuple[Any, ...]:
+        prefix, _, value = unbase64(cursor).partition(KEYSET_CURSOR_PREFIX)
+        if not prefix and value:
+            try:
+                key = json.loads(value)
+                if isinstance(key, list):
+                    return tuple(self.decode_key_value(value) for value in key)
+            except (TypeError, ValueError, ArithmeticError):
+                pass
+        raise ValueError(f"Invalid keyset cursor: {cursor}")
+
+    def encode_key_value(self, value: Any) -> Any:
+        for tag, (value_type, _) in KEY_VALUE_TYPES.items():
+            if isinstance(value, value_type):
+                if isinstance(value, (date, time)):
+                    return {tag: value.isoformat()}
+                return {tag: str(value)}
+        return value
+
+    def decode_key_value(self, value: Any) -> Any:
+        if isinstance(value, dict) and len(value) == 1:
+            [(tag, encoded)] = value.items()
+            if tag in KEY_VALUE_TYPES and isinstance(encoded, str):
+                return KEY_VALUE_TYPES[tag][1](encoded)
+        return value
+
+    def __call__(
+        self,
+        data: Iterable[Any],
+        connection_args: Union[ConnectionArguments, KeysetConnectionArguments],
+        *,
+        selection: Optional[ConnectionSelection] = None,
+    ) -> ConnectionType:
+        if not isinstance(connection_args, KeysetConnectionArguments):
+            connection_args = self.prepare_arguments(connection_args)
+        rows = list(data)
+        record_fetch(len(rows))
+        first, last = connection_args.first, connection_args.last
+        has_previous_page = has_next_page = False
+        if connection_args.direction == "backward":
+            last = cast(int, last)
+            has_previous_page = len(rows) > last
+            rows = rows[:last]
+            rows.reverse()
+        else:
+            if isinstance(first, int):
+                has_next_page = len(rows) > first
+                rows = rows[:first]
+            if isinstance(last, int) and len(rows) > last:
+                has_previous_page = True
+                start = len(rows) - last
+                rows = rows[start:]
+        if selection is not None and not selection.needs_edges:
+            cursors = [self.encode_cursor(self.get_key(node)) for node in rows[:1]]
+            cursors += [
+                self.encode_cursor(self.get_key(node)) for node in rows[1:][-1:]
+            ]
+            return self.build_connection(
+                [],
+                has_previous_page=has_previous_page,
+                has_next_page=has_next_page,
+                start_cursor=cursors[0] if cursors else None,
+                end_cursor=cursors[-1] if cursors else None,
+            )
+        edges: List[Any] = [
+            self.build_edge(node, self.encode_cursor(self.get_key(node)))
+            for node in rows
+        ]
+        return self.build_connection(
+            edges,
+            has_previous_page=has_previous_page,
+            has_next_page=has_next_page,
+        )
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from .base import ConnectionArguments
+
+PAGE_SIZE_MODES = ("clamp", "reject")
+
+
+@dataclass(frozen=True)
+class PageSizePolicy:
+    """Bounds the page sizes that a connection field can be asked for.
+
+    `default_first` applies when neither `first` nor `last` is given, and
+    falls back to `max_first`.  Page sizes above `max_first` or `max_last`
+    are either clamped to the maximum or rejected, depending on `mode`.
+    """
+
+    default_first: Optional[int] = None
+    max_first: Optional[int] = None
+    max_last: Optional[int] = None
+    mode: str = "clamp"
+
+    def __post_init__(self) -> None:
+        if self.mode not in PAGE_SIZE_MODES:
+            raise ValueError(
+                f"mode must be one of {', '.join(PAGE_SIZE_MODES)}: {self.mode!r}"
+            )
+        for name in ("default_first", "max_first", "max_last"):
+            value = getattr(self, name)
+            if value is not None and value < 0:
+                raise ValueError(f"{name} must be a non-negative integer")
+        if (
+            self.default_first is not None
+            and self.max_first is not None
+            and self.default_first > self.max_first
+        ):
+            raise ValueError("default_first must not exceed max_first")
+
+    def apply(self, connection_args: ConnectionArguments) -> ConnectionArguments:
+        first, last = connection_args.first, connection_args.last
+        if first is None and last is None:
+            first = self.max_first if self.default_first is None else self.default_first
+        first = self._limit("first", first, self.max_first)
+        last = self._limit("last", last, self.max_last)
+        if first == connection_args.first and last == connection_args.last:
+            return connection_args
+        return connection_args._replace(first=first, last=last)
+
+    def _limit(
+        self, name: str, value: Optional[int], maximum: Optional[int]
+    ) -> Optional[int]:
+        if value is None or maximum is None or value <= maximum:
+            return value
+        if self.mode == "reject":
+            raise ValueError(f"Argument '{name}' must not exceed {maximum}.")
+        return maximum
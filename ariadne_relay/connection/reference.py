@@ -1,8 +1,10 @@
-from typing import Optional
+from typing import Any, Dict, Optional
 
+from graphql import GraphQLResolveInfo
 from graphql_relay import ConnectionType, SizedSliceable
 
 from .base import BaseConnection, ConnectionArguments
+from .selection import ConnectionSelection
 
 
 class ReferenceConnection(BaseConnection[ConnectionType]):
@@ -12,5 +14,17 @@ class ReferenceConnection(BaseConnection[ConnectionType]):
         connection_args: ConnectionArguments,
         *,
         data_length: Optional[int] = None,
+        selection: Optional[ConnectionSelection] = None,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
     ) -> ConnectionType:
-        return self.create_connection(data, connection_args, data_length=data_length)
+        return self.create_connection(
+            data,
+            connection_args,
+            data_length=data_length,
+            selection=selection,
+            parent=parent,
+            info=info,
+            arguments=arguments,
+        )
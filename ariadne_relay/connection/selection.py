@@ -0,0 +1,109 @@
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLResolveInfo,
+    InlineFragmentNode,
+    SelectionSetNode,
+)
+
+EDGE_FIELDS = frozenset(("edges", "nodes"))
+PAGE_INFO_CURSOR_FIELDS = frozenset(("startCursor", "endCursor"))
+
+
+class ConnectionSelection(NamedTuple):
+    """Summary of the fields that a query selects on a connection.
+
+    Conditional fields (`@skip` and `@include`) are always counted as
+    selected, so the summary may include more fields than are resolved.
+    """
+
+    fields: FrozenSet[str]
+    page_info_fields: FrozenSet[str]
+    edge_fields: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_info(cls, info: GraphQLResolveInfo) -> "ConnectionSelection":
+        fields: Dict[str, List[FieldNode]] = {}
+        _collect_fields(
+            (field_node.selection_set for field_node in info.field_nodes),
+            info.fragments,
+            fields,
+        )
+        page_info_fields: Dict[str, List[FieldNode]] = {}
+        _collect_fields(
+            (field_node.selection_set for field_node in fields.get("pageInfo", ())),
+            info.fragments,
+            page_info_fields,
+        )
+        edge_fields: Dict[str, List[FieldNode]] = {}
+        _collect_fields(
+            (field_node.selection_set for field_node in fields.get("edges", ())),
+            info.fragments,
+            edge_fields,
+        )
+        return cls(
+            frozenset(fields), frozenset(page_info_fields), frozenset(edge_fields)
+        )
+
+    @property
+    def needs_edges(self) -> bool:
+        return not EDGE_FIELDS.isdisjoint(self.fields)
+
+    @property
+    def needs_edge_cursors(self) -> bool:
+        return "cursor" in self.edge_fields
+
+    @property
+    def needs_page_cursors(self) -> bool:
+        return not PAGE_INFO_CURSOR_FIELDS.isdisjoint(self.page_info_fields)
+
+    @property
+    def needs_cursors(self) -> bool:
+        return self.needs_edges or self.needs_page_cursors
+
+    def needs_data(self, first: Optional[int], last: Optional[int]) -> bool:
+        if self.needs_cursors or not self.fields.issubset(("pageInfo", "__typename")):
+            return True
+        if "hasNextPage" in self.page_info_fields and isinstance(first, int):
+            return True
+        return "hasPreviousPage" in self.page_info_fields and isinstance(last, int)
+
+
+def _collect_fields(
+    selection_sets: Iterable[Optional[SelectionSetNode]],
+    fragments: Dict[str, FragmentDefinitionNode],
+    fields: Dict[str, List[FieldNode]],
+    visited_fragments: Optional[Set[str]] = None,
+) -> None:
+    if visited_fragments is None:
+        visited_fragments = set()
+    for selection_set in selection_sets:
+        if selection_set is None:
+            continue
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                fields.setdefault(selection.name.value, []).append(selection)
+            elif isinstance(selection, InlineFragmentNode):
+                _collect_fields(
+                    (selection.selection_set,), fragments, fields, visited_fragments
+                )
+            elif isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = fragments.get(name)
+                if fragment is None or name in visited_fragments:
+                    continue
+                visited_fragments.add(name)
+                _collect_fields(
+                    (fragment.selection_set,), fragments, fields, visited_fragments
+                )
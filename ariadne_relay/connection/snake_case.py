@@ -1,11 +1,22 @@
-from dataclasses import dataclass
-from typing import List, Optional
+from typing import (
+    Any,
+    Callable,
+    cast,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 try:
     from typing import Protocol
 except ImportError:  # Python < 3.8
     from typing_extensions import Protocol  # type: ignore
 
+from graphql import GraphQLResolveInfo
 from graphql_relay import (
     ConnectionCursor,
     EdgeConstructor,
@@ -20,71 +31,98 @@ from .base import (
     ConnectionArguments,
     ConnectionConstructor,
     ConnectionType_T,
+    CountListener,
 )
+from .count import CountStrategy
+from .cursor import CursorCodec
+from .selection import ConnectionSelection
+
+_T = TypeVar("_T")
+
+_tuple_new = cast(Callable[[Type[_T], Tuple[Any, ...]], _T], tuple.__new__)
 
 
 class SnakeCasePageInfoType(Protocol):
     @property
-    def start_cursor(self) -> Optional[ConnectionCursor]:
-        ...
+    def start_cursor(self) -> Optional[ConnectionCursor]: ...
 
     @property
-    def end_cursor(self) -> Optional[ConnectionCursor]:
-        ...
+    def end_cursor(self) -> Optional[ConnectionCursor]: ...
 
     @property
-    def has_previous_page(self) -> Optional[bool]:
-        ...
+    def has_previous_page(self) -> Optional[bool]: ...
 
     @property
-    def has_next_page(self) -> Optional[bool]:
-        ...
+    def has_next_page(self) -> Optional[bool]: ...
 
 
 class SnakeCaseConnectionType(Protocol):
     @property
-    def edges(self) -> List[EdgeType]:
-        ...
+    def edges(self) -> List[EdgeType]: ...
 
     @property
-    def page_info(self) -> SnakeCasePageInfoType:
-        ...
+    def page_info(self) -> SnakeCasePageInfoType: ...
 
 
-@dataclass(frozen=True, init=False)
-class PageInfo:
+class _PageInfo(NamedTuple):
     start_cursor: Optional[ConnectionCursor]
     end_cursor: Optional[ConnectionCursor]
     has_previous_page: Optional[bool]
     has_next_page: Optional[bool]
 
-    def __init__(
-        self,
+
+class PageInfo(_PageInfo):
+    __slots__ = ()
+
+    def __new__(
+        cls,
         *,
         startCursor: Optional[ConnectionCursor] = None,
         endCursor: Optional[ConnectionCursor] = None,
         hasPreviousPage: Optional[bool] = None,
         hasNextPage: Optional[bool] = None,
-    ) -> None:
-        object.__setattr__(self, "start_cursor", startCursor)
-        object.__setattr__(self, "end_cursor", endCursor)
-        object.__setattr__(self, "has_previous_page", hasPreviousPage)
-        object.__setattr__(self, "has_next_page", hasNextPage)
+    ) -> "PageInfo":
+        return _tuple_new(cls, (startCursor, endCursor, hasPreviousPage, hasNextPage))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _tuple_new, (self.__class__, tuple(self))
+
+
+class _Edge(NamedTuple):
+    node: Any
+    cursor: ConnectionCursor
 
 
-@dataclass(frozen=True, init=False)
-class Connection:
+class Edge(_Edge):
+    __slots__ = ()
+
+    def __new__(cls, *, node: Any, cursor: ConnectionCursor) -> "Edge":
+        return _tuple_new(cls, (node, cursor))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _tuple_new, (self.__class__, tuple(self))
+
+
+class _Connection(NamedTuple):
     edges: List[EdgeType]
     page_info: SnakeCasePageInfoType
+    total_count: Any
 
-    def __init__(
-        self,
+
+class Connection(_Connection):
+    __slots__ = ()
+
+    def __new__(
+        cls,
         *,
         edges: List[EdgeType],
         pageInfo: PageInfoType,
-    ) -> None:
-        object.__setattr__(self, "edges", edges)
-        object.__setattr__(self, "page_info", pageInfo)
+        totalCount: Any = None,
+    ) -> "Connection":
+        return _tuple_new(cls, (edges, pageInfo, totalCount))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _tuple_new, (self.__class__, tuple(self))
 
 
 class SnakeCaseBaseConnection(BaseConnection[ConnectionType_T]):
@@ -94,10 +132,20 @@ class SnakeCaseBaseConnection(BaseConnection[ConnectionType_T]):
         connection_type: Optional[ConnectionConstructor[ConnectionType_T]] = Connection,
         edge_type: Optional[EdgeConstructor] = None,
         page_info_type: Optional[PageInfoConstructor] = None,
+        count_free: bool = False,
+        on_count: Optional[CountListener] = None,
+        cursor_codec: Optional[CursorCodec] = None,
+        total_count: Optional[CountStrategy] = None,
     ) -> None:
-        self._connection_type = connection_type
-        self._edge_type = edge_type
-        self._page_info_type = page_info_type or PageInfo
+        super().__init__(
+            connection_type=connection_type,
+            edge_type=edge_type or Edge,
+            page_info_type=page_info_type or PageInfo,
+            count_free=count_free,
+            on_count=on_count,
+            cursor_codec=cursor_codec,
+            total_count=total_count,
+        )
 
 
 class SnakeCaseConnection(SnakeCaseBaseConnection[Connection]):
@@ -107,5 +155,17 @@ class SnakeCaseConnection(SnakeCaseBaseConnection[Connection]):
         connection_args: ConnectionArguments,
         *,
         data_length: Optional[int] = None,
+        selection: Optional[ConnectionSelection] = None,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
     ) -> SnakeCaseConnectionType:
-        return self.create_connection(data, connection_args, data_length=data_length)
+        return self.create_connection(
+            data,
+            connection_args,
+            data_length=data_length,
+            selection=selection,
+            parent=parent,
+            info=info,
+            arguments=arguments,
+        )
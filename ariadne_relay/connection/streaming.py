@@ -0,0 +1,162 @@
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterable,
+    Deque,
+    Iterable,
+    Optional,
+    Tuple,
+)
+
+from graphql_relay import ConnectionType
+
+from .base import (
+    BaseConnection,
+    ConnectionArguments,
+    get_offset_bounds,
+    get_page_bounds,
+    get_page_range,
+)
+from .selection import ConnectionSelection
+from ..metrics import record_fetch
+
+
+class BaseStreamingConnection(BaseConnection[ConnectionType]):
+    def get_stream_range(
+        self, connection_args: ConnectionArguments
+    ) -> Tuple[int, Optional[int], Optional[int]]:
+        lower_bound, upper_bound = get_offset_bounds(connection_args, self.cursor_codec)
+        first, last = connection_args.first, connection_args.last
+        if isinstance(first, int):
+            stop = lower_bound + first + 1
+            if upper_bound is not None:
+                stop = min(stop, upper_bound)
+            return lower_bound, stop, None
+        if isinstance(last, int):
+            # the before cursor can point past the end of the source, so the
+            # last items before it are kept rather than the items that precede
+            # it by `last`
+            return lower_bound, upper_bound, last
+        return lower_bound, upper_bound, None
+
+    def create_stream_connection(
+        self,
+        nodes: Iterable[Any],
+        position: int,
+        connection_args: ConnectionArguments,
+        selection: Optional[ConnectionSelection] = None,
+        total: Optional[int] = None,
+    ) -> ConnectionType:
+        nodes = list(nodes)
+        record_fetch(len(nodes))
+        start_offset = position - len(nodes)
+        needs_edges = selection is None or selection.needs_edges
+        if total is not None:
+            # the source ran out, so the page is clamped to its length
+            start, end, has_previous_page, has_next_page = get_page_range(
+                connection_args, start_offset, position, total, self.cursor_codec
+            )
+            skip = start - start_offset
+            nodes = nodes[skip:][: end - start]
+            return self.build_page(
+                nodes if needs_edges else None,
+                start,
+                end,
+                has_previous_page,
+                has_next_page,
+                selection=selection,
+            )
+        lower_bound, upper_bound = get_page_bounds(connection_args, self.cursor_codec)
+        first, last = connection_args.first, connection_args.last
+        has_previous_page = has_next_page = False
+        if isinstance(first, int):
+            has_next_page = len(nodes) > first and (
+                upper_bound is None or upper_bound >= 0
+            )
+            del nodes[first:]
+            if isinstance(last, int) and len(nodes) > last:
+                start_offset += len(nodes) - last
+                del nodes[: len(nodes) - last]
+        if isinstance(last, int):
+            has_previous_page = start_offset > lower_bound
+        return self.build_page(
+            nodes if needs_edges else None,
+            start_offset,
+            start_offset + len(nodes),
+            has_previous_page,
+            has_next_page,
+            selection=selection,
+        )
+
+
+class StreamingConnection(BaseStreamingConnection):
+    """Connection factory for asynchronous iterables of nodes.
+
+    Items are pulled from the source only up to the end of the requested
+    page, plus one extra item to determine `hasNextPage`, after which the
+    source is closed.  Only the items of the page are kept in memory.
+    """
+
+    async def __call__(
+        self,
+        data: AsyncIterable[Any],
+        connection_args: ConnectionArguments,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+    ) -> ConnectionType:
+        start, stop, tail = self.get_stream_range(connection_args)
+        nodes: Deque[Any] = deque(maxlen=tail)
+        position = 0
+        total = None
+        iterator = data.__aiter__()
+        try:
+            while stop is None or position < stop:
+                try:
+                    node = await iterator.__anext__()
+                except StopAsyncIteration:
+                    total = position
+                    break
+                if position >= start:
+                    nodes.append(node)
+                position += 1
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        return self.create_stream_connection(
+            nodes, position, connection_args, selection, total
+        )
+
+
+class SyncStreamingConnection(BaseStreamingConnection):
+    """Connection factory for iterables of nodes, see `StreamingConnection`."""
+
+    def __call__(
+        self,
+        data: Iterable[Any],
+        connection_args: ConnectionArguments,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+    ) -> ConnectionType:
+        start, stop, tail = self.get_stream_range(connection_args)
+        nodes: Deque[Any] = deque(maxlen=tail)
+        position = 0
+        total = None
+        iterator = iter(data)
+        try:
+            while stop is None or position < stop:
+                try:
+                    node = next(iterator)
+                except StopIteration:
+                    total = position
+                    break
+                if position >= start:
+                    nodes.append(node)
+                position += 1
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+        return self.create_stream_connection(
+            nodes, position, connection_args, selection, total
+        )
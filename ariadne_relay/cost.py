@@ -0,0 +1,499 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    cast,
+    Collection,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+from ariadne.types import ContextValue, Extension
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    get_named_type,
+    GraphQLAbstractType,
+    GraphQLError,
+    GraphQLField,
+    GraphQLInterfaceType,
+    GraphQLNamedType,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    is_abstract_type,
+    is_leaf_type,
+    OperationDefinitionNode,
+    SelectionSetNode,
+)
+from graphql.execution.values import get_argument_values
+from graphql.validation import ASTValidationRule, ValidationContext, ValidationRule
+
+from .base import CONNECTION_EXTENSION
+from .connection import PageSizePolicy
+from .global_id import get_default_global_id_codec
+
+DEFAULT_PAGE_SIZE = 100
+MULTIPLIED_CONNECTION_FIELDS = frozenset(("edges", "nodes"))
+NODE_INTERFACE = "Node"
+
+
+FragmentCostKey = Tuple[str, str, Optional[int], Optional[str]]
+
+
+class QueryCostRecord:
+    __slots__ = ("cost", "maximum_cost")
+
+    def __init__(self) -> None:
+        self.cost: Optional[int] = None
+        self.maximum_cost: Optional[int] = None
+
+
+_query_cost: ContextVar[Optional[QueryCostRecord]] = ContextVar(
+    "ariadne_relay_query_cost", default=None
+)
+
+
+@dataclass(frozen=True)
+class QueryCostAnalysis:
+    """Estimates the cost of operations before they are executed.
+
+    Each field costs its weight times the product of the page sizes of the
+    connections above it.  Page sizes are taken from `first` and `last`,
+    bounded by the `PageSizePolicy` of the connection field, and fall back
+    to `default_page_size` when the field has no limit.  Leaf fields weigh
+    nothing and other fields weigh `default_weight`, unless `field_weights`
+    has a weight for their `Type.field` coordinate.  Fields that refetch
+    nodes by `id` or `ids` weigh the `node_type_weights` of the node type
+    of each ID.
+
+    Operations that cost more than `maximum_cost` are rejected.
+    """
+
+    maximum_cost: Optional[int] = None
+    default_page_size: int = DEFAULT_PAGE_SIZE
+    default_weight: int = 1
+    field_weights: Mapping[str, int] = field(default_factory=dict)
+    node_type_weights: Mapping[str, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if self.maximum_cost is not None and self.maximum_cost < 0:
+            raise ValueError("maximum_cost must be a non-negative integer")
+        if self.default_page_size < 0:
+            raise ValueError("default_page_size must be a non-negative integer")
+
+    def measure(
+        self,
+        schema: GraphQLSchema,
+        document: DocumentNode,
+        variables: Optional[Dict[str, Any]] = None,
+        operation_name: Optional[str] = None,
+    ) -> int:
+        """The cost of the operation, or of the costliest one without a name."""
+        fragments = _get_fragments(document)
+        return max(
+            (
+                self.measure_operation(schema, operation, fragments, variables)
+                for operation in _get_operations(document, operation_name)
+            ),
+            default=0,
+        )
+
+    def measure_operation(
+        self,
+        schema: GraphQLSchema,
+        operation: OperationDefinitionNode,
+        fragments: Mapping[str, FragmentDefinitionNode],
+        variables: Optional[Dict[str, Any]] = None,
+        *,
+        maximum_cost: Optional[int] = None,
+    ) -> int:
+        """The cost of the operation.  With `maximum_cost`, the operation is
+        only measured until its cost exceeds it.
+        """
+        root_type = schema.get_root_type(operation.operation)
+        if root_type is None:
+            return 0
+        calculator = _CostCalculator(
+            self, schema, fragments, variables, maximum_cost=maximum_cost
+        )
+        try:
+            return calculator.get_cost(operation.selection_set, root_type, 1, set())
+        except _CostLimitExceeded:
+            return calculator.total
+
+    def create_validation_rule(
+        self,
+        variables: Optional[Dict[str, Any]] = None,
+        operation_name: Optional[str] = None,
+    ) -> Type[ASTValidationRule]:
+        analysis = self
+
+        class QueryCostRule(QueryCostValidationRule):
+            def __init__(self, context: ValidationContext) -> None:
+                super().__init__(context, analysis, variables, operation_name)
+
+        return cast(Type[ASTValidationRule], QueryCostRule)
+
+    def validation_rules(
+        self,
+        context_value: ContextValue,
+        document: DocumentNode,
+        data: Dict[str, Any],
+    ) -> Collection[Type[ASTValidationRule]]:
+        """Can be passed as `validation_rules` to Ariadne's apps and `graphql()`."""
+        return [
+            self.create_validation_rule(
+                data.get("variables"), data.get("operationName")
+            )
+        ]
+
+
+class QueryCostValidationRule(ValidationRule):
+    def __init__(
+        self,
+        context: ValidationContext,
+        analysis: QueryCostAnalysis,
+        variables: Optional[Dict[str, Any]],
+        operation_name: Optional[str],
+    ) -> None:
+        super().__init__(context)
+        self.analysis = analysis
+        self.variables = variables
+        self.operation_name = operation_name
+        self.fragments: Optional[Dict[str, FragmentDefinitionNode]] = None
+
+    def enter_operation_definition(
+        self, node: OperationDefinitionNode, *_: Any
+    ) -> None:
+        if self.operation_name is not None and (
+            node.name is None or node.name.value != self.operation_name
+        ):
+            return
+        if self.fragments is None:
+            self.fragments = _get_fragments(self.context.document)
+        maximum_cost = self.analysis.maximum_cost
+        cost = self.analysis.measure_operation(
+            self.context.schema,
+            node,
+            self.fragments,
+            self.variables,
+            maximum_cost=maximum_cost,
+        )
+        record = _query_cost.get()
+        if record is not None:
+            record.cost = max(cost, record.cost or 0)
+            record.maximum_cost = maximum_cost
+        if maximum_cost is not None and cost > maximum_cost:
+            self.report_error(
+                GraphQLError(
+                    f"The query exceeds the maximum cost of {maximum_cost}. "
+                    f"Actual cost is at least {cost}",
+                    node,
+                    extensions={
+                        "cost": {
+                            "requestedQueryCost": cost,
+                            "maximumAvailable": maximum_cost,
+                        }
+                    },
+                )
+            )
+
+
+class QueryCostExtension(Extension):
+    """Adds the cost that `QueryCostAnalysis` estimated for each request to
+    the `extensions` of its response, under `queryCost`.
+    """
+
+    def __init__(self) -> None:
+        self.record = QueryCostRecord()
+        self._token: Any = None
+
+    def request_started(self, context: ContextValue) -> None:
+        self._token = _query_cost.set(self.record)
+
+    def request_finished(self, context: ContextValue) -> None:
+        if self._token is not None:
+            _query_cost.reset(self._token)
+            self._token = None
+
+    def format(self, context: ContextValue) -> Dict[str, Any]:  # noqa: A003
+        if self.record.cost is None:
+            return {}
+        return {
+            "queryCost": {
+                "requestedQueryCost": self.record.cost,
+                "maximumAvailable": self.record.maximum_cost,
+            }
+        }
+
+
+class _CostLimitExceeded(Exception):
+    pass
+
+
+class _CostCalculator:
+    def __init__(
+        self,
+        analysis: QueryCostAnalysis,
+        schema: GraphQLSchema,
+        fragments: Mapping[str, FragmentDefinitionNode],
+        variables: Optional[Dict[str, Any]],
+        *,
+        maximum_cost: Optional[int] = None,
+    ) -> None:
+        self.analysis = analysis
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables or {}
+        self.maximum_cost = maximum_cost
+        self.total = 0
+        # the cost of each fragment for a multiplier of 1, as costs are
+        # proportional to the multiplier
+        self.fragment_costs: Dict[FragmentCostKey, int] = {}
+
+    def add(self, cost: int) -> int:
+        """Adds the cost of a field to the total, which stops the walk once
+        it exceeds `maximum_cost`.
+        """
+        self.total += cost
+        if self.maximum_cost is not None and self.total > self.maximum_cost:
+            raise _CostLimitExceeded
+        return cost
+
+    def get_cost(
+        self,
+        selection_set: SelectionSetNode,
+        parent_type: GraphQLNamedType,
+        multiplier: int,
+        spread_fragments: Set[str],
+        *,
+        page_size: Optional[int] = None,
+        node_type: Optional[GraphQLObjectType] = None,
+    ) -> int:
+        """The cost of a selection set, where `page_size` is given for the
+        selections of connections, and `node_type` for those of refetched
+        nodes.
+        """
+        cost = 0
+        if multiplier == 0:
+            return cost
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                field_def = _get_field(parent_type, selection.name.value)
+                if field_def is None:
+                    continue
+                list_size = 1
+                if (
+                    page_size is not None
+                    and selection.name.value in MULTIPLIED_CONNECTION_FIELDS
+                ):
+                    list_size = page_size
+                cost += self.get_field_cost(
+                    selection,
+                    parent_type,
+                    field_def,
+                    multiplier,
+                    spread_fragments,
+                    list_size,
+                )
+                continue
+            fragment: Union[FragmentDefinitionNode, InlineFragmentNode, None]
+            name: Optional[str] = None
+            if isinstance(selection, FragmentSpreadNode):
+                name = selection.name.value
+                fragment = self.fragments.get(name)
+                # cycles are reported by the NoFragmentCycles rule
+                if fragment is None or name in spread_fragments:
+                    continue
+                fragment_spreads = spread_fragments | {name}
+            elif isinstance(selection, InlineFragmentNode):
+                fragment = selection
+                fragment_spreads = spread_fragments
+            else:
+                continue
+            fragment_type = parent_type
+            if fragment.type_condition is not None:
+                condition_type = self.schema.get_type(
+                    fragment.type_condition.name.value
+                )
+                if condition_type is None:
+                    continue
+                if node_type is not None and not self.is_possible(
+                    condition_type, node_type
+                ):
+                    continue
+                fragment_type = condition_type
+            key: Optional[FragmentCostKey] = None
+            if name is not None:
+                # fragments in cycles may be measured without their cycle,
+                # which does not matter as such documents are invalid
+                key = (
+                    name,
+                    fragment_type.name,
+                    page_size,
+                    None if node_type is None else node_type.name,
+                )
+                fragment_cost = self.fragment_costs.get(key)
+                if fragment_cost is not None:
+                    cost += self.add(fragment_cost * multiplier)
+                    continue
+            fragment_cost = self.get_cost(
+                fragment.selection_set,
+                fragment_type,
+                multiplier,
+                fragment_spreads,
+                page_size=page_size,
+                node_type=node_type,
+            )
+            if key is not None:
+                self.fragment_costs[key] = fragment_cost // multiplier
+            cost += fragment_cost
+        return cost
+
+    def get_field_cost(
+        self,
+        node: FieldNode,
+        parent_type: GraphQLNamedType,
+        field_def: GraphQLField,
+        multiplier: int,
+        spread_fragments: Set[str],
+        list_size: int = 1,
+    ) -> int:
+        """The cost of a field, where `list_size` is the number of items that
+        its selections are made on.
+        """
+        analysis = self.analysis
+        field_type = get_named_type(field_def.type)
+        weight = analysis.field_weights.get(f"{parent_type.name}.{node.name.value}")
+        if weight is None:
+            weight = 0 if is_leaf_type(field_type) else analysis.default_weight
+        if node.selection_set is None:
+            return self.add(weight * multiplier)
+        args = self.get_arguments(field_def, node)
+        node_typenames = self.get_node_typenames(field_def, args)
+        if node_typenames is not None:
+            # each ID costs the weight of its node type instead
+            cost = 0
+            for typename, count in node_typenames.items():
+                node_type = self.schema.get_type(typename) if typename else None
+                node_weight = analysis.node_type_weights.get(typename, weight)
+                cost += self.add(node_weight * multiplier * count) + self.get_cost(
+                    node.selection_set,
+                    field_type,
+                    multiplier * count,
+                    spread_fragments,
+                    node_type=(
+                        node_type if isinstance(node_type, GraphQLObjectType) else None
+                    ),
+                )
+            return cost
+        cost = self.add(weight * multiplier)
+        multiplier *= list_size
+        page_size = None
+        config = (field_def.extensions or {}).get(CONNECTION_EXTENSION)
+        if config is not None:
+            page_size = self.get_page_size(config.page_size, args)
+        return cost + self.get_cost(
+            node.selection_set,
+            field_type,
+            multiplier,
+            spread_fragments,
+            page_size=page_size,
+        )
+
+    def get_arguments(self, field_def: GraphQLField, node: FieldNode) -> Dict[str, Any]:
+        try:
+            return get_argument_values(field_def, node, self.variables)
+        except GraphQLError:
+            # invalid arguments are reported by the other rules, or at execution
+            return {}
+
+    def get_page_size(
+        self, policy: Optional[PageSizePolicy], args: Dict[str, Any]
+    ) -> int:
+        first, last = args.get("first"), args.get("last")
+        if policy is not None:
+            if first is None and last is None:
+                first = (
+                    policy.max_first
+                    if policy.default_first is None
+                    else policy.default_first
+                )
+            if first is not None and policy.max_first is not None:
+                first = min(first, policy.max_first)
+            if last is not None and policy.max_last is not None:
+                last = min(last, policy.max_last)
+        page_sizes = [max(size, 0) for size in (first, last) if size is not None]
+        if not page_sizes:
+            return self.analysis.default_page_size
+        return cast(int, min(page_sizes))
+
+    def get_node_typenames(
+        self, field_def: GraphQLField, args: Dict[str, Any]
+    ) -> Optional[Dict[str, int]]:
+        """Counts the IDs of each node type, for fields that refetch nodes."""
+        if get_named_type(field_def.type).name != NODE_INTERFACE:
+            return None
+        if "id" in field_def.args:
+            ids = [args.get("id")]
+        elif "ids" in field_def.args:
+            ids = list(args.get("ids") or ())
+        else:
+            return None
+        codec = get_default_global_id_codec()
+        typenames: Dict[str, int] = {}
+        for raw_id in ids:
+            typename = ""
+            if isinstance(raw_id, str):
+                try:
+                    typename = codec.decode(raw_id).type
+                except ValueError:
+                    pass
+            typenames[typename] = typenames.get(typename, 0) + 1
+        return typenames
+
+    def is_possible(
+        self, condition_type: GraphQLNamedType, node_type: GraphQLObjectType
+    ) -> bool:
+        if is_abstract_type(condition_type):
+            return self.schema.is_sub_type(
+                cast(GraphQLAbstractType, condition_type), node_type
+            )
+        return condition_type is node_type
+
+
+def _get_field(parent_type: GraphQLNamedType, name: str) -> Optional[GraphQLField]:
+    if isinstance(parent_type, (GraphQLObjectType, GraphQLInterfaceType)):
+        return cast(Optional[GraphQLField], parent_type.fields.get(name))
+    return None
+
+
+def _get_fragments(document: DocumentNode) -> Dict[str, FragmentDefinitionNode]:
+    return {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+
+
+def _get_operations(
+    document: DocumentNode, operation_name: Optional[str]
+) -> List[OperationDefinitionNode]:
+    return [
+        definition
+        for definition in document.definitions
+        if isinstance(definition, OperationDefinitionNode)
+        and (
+            operation_name is None
+            or (definition.name is not None and definition.name.value == operation_name)
+        )
+    ]
@@ -0,0 +1,199 @@
+from functools import lru_cache
+import sys
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from uuid import UUID
+
+from graphql_relay import from_global_id, ResolvedGlobalId, to_global_id
+
+NodeIdParser = Callable[[str], Any]
+
+BASE62_ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+
+DEFAULT_MAX_NODE_ID_SIZE = 256
+
+_BASE62_INDEX = {char: index for index, char in enumerate(BASE62_ALPHABET)}
+_INT_KIND = 0
+_STR_KIND = 1
+_UUID_KIND = 2
+
+
+class GlobalIdCodec:
+    """Encodes and decodes global IDs in the Relay reference format.
+
+    Results are memoized in a bounded LRU cache, so hot IDs skip the
+    base64 work entirely.  Subclasses customize the format by overriding
+    `encode_global_id()` and `decode_global_id()`.
+    """
+
+    def __init__(self, *, cache_size: Optional[int] = 4096) -> None:
+        # typed, so that ids such as True and 1.0 are not served as 1
+        self.encode: Callable[[str, Any], str] = lru_cache(
+            maxsize=cache_size, typed=True
+        )(self.encode_global_id)
+        self.decode: Callable[[str], ResolvedGlobalId] = lru_cache(
+            maxsize=cache_size, typed=True
+        )(self._decode_interned)
+
+    def encode_global_id(self, typename: str, node_id: Any) -> str:
+        return to_global_id(typename, node_id)
+
+    def decode_global_id(self, global_id: str) -> ResolvedGlobalId:
+        return from_global_id(global_id)
+
+    def clear_cache(self) -> None:
+        getattr(self.encode, "cache_clear")()
+        getattr(self.decode, "cache_clear")()
+
+    def _decode_interned(self, global_id: str) -> ResolvedGlobalId:
+        typename, node_id = self.decode_global_id(global_id)
+        return ResolvedGlobalId(sys.intern(typename), node_id)
+
+
+class CompactGlobalIdCodec(GlobalIdCodec):
+    """Encodes global IDs as base62 strings of a numeric type tag and a body.
+
+    Integer ids are stored as varints and UUIDs as their 16 raw bytes, which
+    produces IDs that are considerably shorter than the reference format.
+    Every typename that is exposed as a node must be assigned a tag.  Ids
+    are at most `max_node_id_size` bytes, so that IDs that are longer than
+    the longest valid ID are rejected before they are decoded.
+    """
+
+    def __init__(
+        self,
+        type_tags: Mapping[str, int],
+        *,
+        cache_size: Optional[int] = 4096,
+        max_node_id_size: int = DEFAULT_MAX_NODE_ID_SIZE,
+    ) -> None:
+        super().__init__(cache_size=cache_size)
+        self._type_tags = dict(type_tags)
+        self._typenames: Dict[int, str] = {}
+        for typename, tag in self._type_tags.items():
+            if tag < 0:
+                raise ValueError(f"Type tag for {typename} must be non-negative")
+            if tag in self._typenames:
+                raise ValueError(
+                    f"Type tag {tag} is assigned to both "
+                    f"{self._typenames[tag]} and {typename}"
+                )
+            self._typenames[tag] = typename
+        if max_node_id_size < 0:
+            raise ValueError("max_node_id_size must be a non-negative integer")
+        self.max_node_id_size = max_node_id_size
+        tag_size = len(_encode_varint(max(self._typenames, default=0)))
+        # the payload is the tag, the kind and the id, all bytes set
+        self._max_length = len(
+            _encode_base62(b"\xff" * (tag_size + 1 + max_node_id_size))
+        )
+
+    def encode_global_id(self, typename: str, node_id: Any) -> str:
+        tag = self._type_tags.get(typename)
+        if tag is None:
+            raise ValueError(f"No type tag is defined for {typename}")
+        data = bytearray(_encode_varint(tag))
+        tag_size = len(data)
+        if isinstance(node_id, UUID):
+            data.append(_UUID_KIND)
+            data += node_id.bytes
+        elif isinstance(node_id, int) and not isinstance(node_id, bool):
+            node_id = str(node_id)
+        if isinstance(node_id, str):
+            if _is_canonical_int(node_id):
+                data.append(_INT_KIND)
+                data += _encode_varint(int(node_id))
+            else:
+                data.append(_STR_KIND)
+                data += node_id.encode("utf-8")
+        elif not isinstance(node_id, UUID):
+            raise ValueError(f"Cannot encode node id: {node_id!r}")
+        if len(data) - tag_size - 1 > self.max_node_id_size:
+            raise ValueError(
+                f"Node id is longer than {self.max_node_id_size} bytes: {node_id!r}"
+            )
+        return _encode_base62(bytes(data))
+
+    def decode_global_id(self, global_id: str) -> ResolvedGlobalId:
+        if len(global_id) > self._max_length:
+            # decoding is quadratic in the length of the ID
+            return ResolvedGlobalId("", "")
+        try:
+            data = _decode_base62(global_id)
+            tag, position = _decode_varint(data, 0)
+            kind = data[position]
+            position += 1
+            body = data[position:]
+            if kind == _INT_KIND:
+                value, end = _decode_varint(body, 0)
+                if end != len(body):
+                    raise ValueError("Trailing data in global ID")
+                node_id = str(value)
+            elif kind == _UUID_KIND:
+                node_id = str(UUID(bytes=body))
+            elif kind == _STR_KIND:
+                node_id = body.decode("utf-8")
+            else:
+                raise ValueError("Unknown global ID kind")
+        except (IndexError, KeyError, UnicodeDecodeError, ValueError):
+            return ResolvedGlobalId("", "")
+        return ResolvedGlobalId(self._typenames.get(tag, ""), node_id)
+
+
+DefaultGlobalIdCodec: GlobalIdCodec = GlobalIdCodec()
+
+
+def get_default_global_id_codec() -> GlobalIdCodec:
+    return DefaultGlobalIdCodec
+
+
+def set_default_global_id_codec(codec: GlobalIdCodec) -> None:
+    global DefaultGlobalIdCodec
+    DefaultGlobalIdCodec = codec
+
+
+def _is_canonical_int(value: str) -> bool:
+    return value.isdigit() and value.isascii() and (value == "0" or value[0] != "0")
+
+
+def _encode_varint(value: int) -> bytes:
+    data = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return bytes(data)
+
+
+def _decode_varint(data: bytes, position: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def _encode_base62(data: bytes) -> str:
+    # a leading marker byte preserves any leading zero bytes of the payload
+    number = int.from_bytes(b"\x01" + data, "big")
+    chars = []
+    while number:
+        number, remainder = divmod(number, 62)
+        chars.append(BASE62_ALPHABET[remainder])
+    return "".join(reversed(chars))
+
+
+def _decode_base62(value: str) -> bytes:
+    number = 0
+    for char in value:
+        number = number * 62 + _BASE62_INDEX[char]
+    data = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    if not data or data[0] != 1:
+        raise ValueError("Invalid global ID")
+    return data[1:]
@@ -0,0 +1,329 @@
+import asyncio
+from inspect import isawaitable
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    cast,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from weakref import WeakKeyDictionary
+
+from graphql import GraphQLResolveInfo
+
+from .utils import freeze
+
+NodeBatchLoadAwaitable = Callable[
+    [List[str], GraphQLResolveInfo], Awaitable[Sequence[Any]]
+]
+NodeBatchLoadCallable = Callable[[List[str], GraphQLResolveInfo], Sequence[Any]]
+BatchConnectionResolver = Callable[..., Any]
+
+DEFAULT_NODE_LOADER_CONTEXT_KEY = "ariadne_relay_node_loader"
+
+NodeLoaderContextKey: Optional[str] = DEFAULT_NODE_LOADER_CONTEXT_KEY
+
+
+def set_node_loader_context_key(key: Optional[str]) -> None:
+    global NodeLoaderContextKey
+    NodeLoaderContextKey = key
+
+
+class NodeLoader:
+    """Request-scoped loader that coalesces node lookups by global ID.
+
+    Every global ID is loaded at most once for the lifetime of the loader.
+    Asynchronous loads requested during the same event-loop tick are
+    dispatched together as a single batch.  Loaders kept in the context
+    only serve the execution that created them.
+    """
+
+    def __init__(
+        self,
+        batch_load: NodeBatchLoadAwaitable,
+        batch_load_sync: NodeBatchLoadCallable,
+    ) -> None:
+        self._batch_load = batch_load
+        self._batch_load_sync = batch_load_sync
+        self._futures: Dict[str, "asyncio.Future[Any]"] = {}
+        self._queue: List[Tuple[str, GraphQLResolveInfo]] = []
+        self._results: Dict[str, Any] = {}
+        self._execution: Optional[Tuple[Any, Any]] = None
+
+    def load(self, global_id: str, info: GraphQLResolveInfo) -> Awaitable[Any]:
+        future = self._futures.get(global_id)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[global_id] = loop.create_future()
+            if global_id in self._results:
+                future.set_result(self._results[global_id])
+            else:
+                if not self._queue:
+                    loop.call_soon(self._dispatch)
+                self._queue.append((global_id, info))
+        return future
+
+    def load_many(
+        self, global_ids: Sequence[str], info: GraphQLResolveInfo
+    ) -> Awaitable[List[Any]]:
+        return asyncio.gather(*(self.load(global_id, info) for global_id in global_ids))
+
+    def load_sync(self, global_id: str, info: GraphQLResolveInfo) -> Any:
+        return self.load_many_sync([global_id], info)[0]
+
+    def load_many_sync(
+        self, global_ids: Sequence[str], info: GraphQLResolveInfo
+    ) -> List[Any]:
+        missing = [
+            global_id
+            for global_id in dict.fromkeys(global_ids)
+            if global_id not in self._results and global_id not in self._futures
+        ]
+        if missing:
+            instances = self._batch_load_sync(missing, info)
+            if isawaitable(instances) or any(map(isawaitable, instances)):
+                self._load_pending(missing, instances)
+            else:
+                self._results.update(zip(missing, instances))
+        return [
+            (
+                self._results[global_id]
+                if global_id in self._results
+                else self._futures[global_id]
+            )
+            for global_id in global_ids
+        ]
+
+    def clear(self, global_id: Optional[str] = None) -> None:
+        if global_id is None:
+            self._futures.clear()
+            self._results.clear()
+        else:
+            self._futures.pop(global_id, None)
+            self._results.pop(global_id, None)
+
+    def _load_pending(self, global_ids: List[str], instances: Any) -> None:
+        """Shares instances that are still to be awaited through futures,
+        since an awaitable itself can only be awaited once.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if hasattr(instances, "close"):
+                instances.close()
+            raise RuntimeError(
+                "Nodes with async resolvers can only be loaded by an async executor"
+            ) from None
+        futures = []
+        for global_id in global_ids:
+            future = self._futures[global_id] = loop.create_future()
+            futures.append(future)
+        asyncio.ensure_future(
+            self._resolve(global_ids, futures, gather_instances(instances))
+        )
+
+    def _dispatch(self) -> None:
+        queue, self._queue = self._queue, []
+        asyncio.ensure_future(self._resolve_queue(queue))
+
+    async def _resolve_queue(self, queue: List[Tuple[str, GraphQLResolveInfo]]) -> None:
+        global_ids = [global_id for global_id, _ in queue]
+        futures = [self._futures[global_id] for global_id in global_ids]
+        await self._resolve(
+            global_ids, futures, self._batch_load(global_ids, queue[0][1])
+        )
+
+    async def _resolve(
+        self,
+        global_ids: List[str],
+        futures: List["asyncio.Future[Any]"],
+        instances: Awaitable[Sequence[Any]],
+    ) -> None:
+        try:
+            resolved = await instances
+        except Exception as error:
+            for global_id, future in zip(global_ids, futures):
+                if self._futures.get(global_id) is future:
+                    del self._futures[global_id]
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for global_id, future, instance in zip(global_ids, futures, resolved):
+            self._results[global_id] = instance
+            if not future.done():
+                future.set_result(instance)
+
+
+async def gather_instances(instances: Any) -> Sequence[Any]:
+    if isawaitable(instances):
+        instances = await instances
+    results: List[Any] = list(instances)
+    pending = [
+        (index, instance)
+        for index, instance in enumerate(results)
+        if isawaitable(instance)
+    ]
+    if pending:
+        resolved = await asyncio.gather(*(instance for _, instance in pending))
+        for (index, _), instance in zip(pending, resolved):
+            results[index] = instance
+    return results
+
+
+class ConnectionBatch:
+    def __init__(self, info: GraphQLResolveInfo, kwargs: Dict[str, Any]) -> None:
+        self.info = info
+        self.kwargs = kwargs
+        self.parents: List[Any] = []
+        self.connection_args: List[Any] = []
+        self.futures: List["asyncio.Future[Any]"] = []
+
+
+ContextBatches = Dict[Hashable, ConnectionBatch]
+
+
+class ConnectionBatchLoader:
+    """Gathers the connection data requested by sibling parents.
+
+    Asynchronous loads requested during the same event-loop tick, with the
+    same context and field arguments, are dispatched together as a single
+    call to the batch resolver.
+    """
+
+    def __init__(self, batch_resolver: BatchConnectionResolver) -> None:
+        self._batch_resolver = batch_resolver
+        self._context_batches: "WeakKeyDictionary[Any, ContextBatches]" = (
+            WeakKeyDictionary()
+        )
+        self._batches: Dict[int, ContextBatches] = {}
+
+    def load(
+        self,
+        parent: Any,
+        info: GraphQLResolveInfo,
+        connection_args: Any,
+        kwargs: Dict[str, Any],
+    ) -> Awaitable[Any]:
+        loop = asyncio.get_running_loop()
+        key = self._get_batch_key(kwargs)
+        batches = self._get_context_batches(info.context)
+        batch = batches.get(key)
+        if batch is None:
+            batch = batches[key] = ConnectionBatch(info, kwargs)
+            loop.call_soon(self._dispatch, batches, key)
+        future = loop.create_future()
+        batch.parents.append(parent)
+        batch.connection_args.append(connection_args)
+        batch.futures.append(future)
+        return future
+
+    def load_sync(
+        self,
+        parent: Any,
+        info: GraphQLResolveInfo,
+        connection_args: Any,
+        kwargs: Dict[str, Any],
+    ) -> Any:
+        results = self._batch_resolver([parent], info, [connection_args], **kwargs)
+        return _check_batch_results(results, 1)[0]
+
+    def _get_batch_key(self, kwargs: Dict[str, Any]) -> Hashable:
+        key = freeze(kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            # the arguments cannot be compared, so the load is not batched
+            return object()
+        return key
+
+    def _get_context_batches(self, context: Any) -> ContextBatches:
+        try:
+            batches = self._context_batches.get(context)
+            if batches is None:
+                batches = self._context_batches[context] = {}
+        except TypeError:
+            # contexts such as dicts cannot be weakly referenced, but their
+            # pending batches keep them alive, so that their id is not reused
+            batches = self._batches.setdefault(id(context), {})
+        return batches
+
+    def _dispatch(self, batches: ContextBatches, key: Hashable) -> None:
+        batch = batches.pop(key)
+        context_id = id(batch.info.context)
+        if not batches and self._batches.get(context_id) is batches:
+            del self._batches[context_id]
+        asyncio.ensure_future(self._resolve_batch(batch))
+
+    async def _resolve_batch(self, batch: ConnectionBatch) -> None:
+        try:
+            results = self._batch_resolver(
+                batch.parents, batch.info, batch.connection_args, **batch.kwargs
+            )
+            if isawaitable(results):
+                results = await results
+            results = _check_batch_results(results, len(batch.parents))
+        except Exception as error:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for future, result in zip(batch.futures, results):
+            if not future.done():
+                future.set_result(result)
+
+
+def _check_batch_results(results: Sequence[Any], expected: int) -> Sequence[Any]:
+    if len(results) != expected:
+        raise ValueError(
+            f"Batch connection resolver returned {len(results)} results "
+            f"for {expected} parents"
+        )
+    return results
+
+
+def get_node_loader(
+    info: GraphQLResolveInfo,
+    create_loader: Callable[[], NodeLoader],
+) -> Optional[NodeLoader]:
+    key = NodeLoaderContextKey
+    context = info.context
+    if key is None or context is None:
+        return None
+    if isinstance(context, dict):
+        loader = context.get(key)
+        if not _serves_execution(loader, info):
+            loader = context[key] = _create_execution_loader(info, create_loader)
+        return cast(NodeLoader, loader)
+    loader = getattr(context, key, None)
+    if not _serves_execution(loader, info):
+        loader = _create_execution_loader(info, create_loader)
+        try:
+            setattr(context, key, loader)
+        except AttributeError:
+            return None
+    return cast(NodeLoader, loader)
+
+
+def _serves_execution(loader: Any, info: GraphQLResolveInfo) -> bool:
+    if not isinstance(loader, NodeLoader):
+        return False
+    if loader._execution is None:
+        # the loader was put in the context by the app, which scopes it
+        return True
+    operation, variable_values = loader._execution
+    # the coerced variables are a new dict for each execution, even when the
+    # context and the parsed document are reused
+    return operation is info.operation and variable_values is info.variable_values
+
+
+def _create_execution_loader(
+    info: GraphQLResolveInfo, create_loader: Callable[[], NodeLoader]
+) -> NodeLoader:
+    loader = create_loader()
+    loader._execution = (info.operation, info.variable_values)
+    return loader
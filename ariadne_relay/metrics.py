@@ -0,0 +1,579 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from inspect import isawaitable
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ariadne.types import ContextValue, Extension
+from graphql import GraphQLResolveInfo
+
+from .utils import is_coroutine_callable
+
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class ConnectionFieldStats(NamedTuple):
+    field: str
+    path: List[Union[str, int]]
+    resolver_time: float
+    factory_time: float
+    items_fetched: int
+    edges_returned: Optional[int]
+    count_calls: int
+
+
+class NodeResolverStats(NamedTuple):
+    node_type: str
+    resolver_time: float
+    ids: int
+    batch: bool
+
+
+ConnectionHook = Callable[[ConnectionFieldStats], None]
+NodeHook = Callable[[NodeResolverStats], None]
+
+
+class ConnectionRecorder:
+    """Accumulates the work done while a single connection field resolves."""
+
+    __slots__ = ("resolver_time", "factory_time", "items_fetched", "count_calls")
+
+    def __init__(self) -> None:
+        self.resolver_time = 0.0
+        self.factory_time = 0.0
+        self.items_fetched = 0
+        self.count_calls = 0
+
+
+_connection_recorder: ContextVar[Optional[ConnectionRecorder]] = ContextVar(
+    "ariadne_relay_connection_recorder", default=None
+)
+_request_stats: ContextVar[Optional["RequestStats"]] = ContextVar(
+    "ariadne_relay_request_stats", default=None
+)
+
+DefaultConnectionHook: Optional[ConnectionHook] = None
+DefaultNodeHook: Optional[NodeHook] = None
+
+
+def set_default_connection_hook(hook: Optional[ConnectionHook]) -> None:
+    global DefaultConnectionHook
+    DefaultConnectionHook = hook
+
+
+def set_default_node_hook(hook: Optional[NodeHook]) -> None:
+    global DefaultNodeHook
+    DefaultNodeHook = hook
+
+
+def get_connection_hook(hook: Optional[ConnectionHook]) -> Optional[ConnectionHook]:
+    return hook or DefaultConnectionHook
+
+
+def get_node_hook(hook: Optional[NodeHook]) -> Optional[NodeHook]:
+    return hook or DefaultNodeHook
+
+
+def record_fetch(items: int) -> None:
+    recorder = _connection_recorder.get()
+    if recorder is not None:
+        recorder.items_fetched += items
+
+
+def record_count() -> None:
+    recorder = _connection_recorder.get()
+    if recorder is not None:
+        recorder.count_calls += 1
+
+
+def observe_connection_resolver(
+    resolve: Callable[..., Any], field: str, hook: ConnectionHook
+) -> Callable[..., Any]:
+    """Reports the stats of each resolution of a connection field to `hook`.
+
+    The connection resolver, and the resolver and factory that it calls,
+    should be wrapped with `observe_resolver` and `ObservedFactory`.
+    """
+
+    def report(
+        connection: Any, info: GraphQLResolveInfo, recorder: ConnectionRecorder
+    ) -> None:
+        edges = getattr(connection, "edges", None)
+        stats = ConnectionFieldStats(
+            field=field,
+            path=info.path.as_list(),
+            resolver_time=recorder.resolver_time,
+            factory_time=recorder.factory_time,
+            items_fetched=recorder.items_fetched,
+            edges_returned=None if edges is None else len(edges),
+            count_calls=recorder.count_calls,
+        )
+        hook(stats)
+        request_stats = _request_stats.get()
+        if request_stats is not None:
+            request_stats.connections.append(stats)
+
+    async def resolve_observed_connection(
+        connection: Any, info: GraphQLResolveInfo, recorder: ConnectionRecorder
+    ) -> Any:
+        token = _connection_recorder.set(recorder)
+        try:
+            connection = await connection
+        finally:
+            _connection_recorder.reset(token)
+        report(connection, info, recorder)
+        return connection
+
+    def resolve_observed(obj: Any, info: GraphQLResolveInfo, **kwargs: Any) -> Any:
+        recorder = ConnectionRecorder()
+        token = _connection_recorder.set(recorder)
+        try:
+            connection = resolve(obj, info, **kwargs)
+        finally:
+            _connection_recorder.reset(token)
+        if isawaitable(connection):
+            return resolve_observed_connection(connection, info, recorder)
+        report(connection, info, recorder)
+        return connection
+
+    return resolve_observed
+
+
+def observe_resolver(resolver: Callable[..., Any]) -> Callable[..., Any]:
+    """Adds the time spent in `resolver` to the current connection field."""
+    if is_coroutine_callable(resolver):
+
+        @wraps(resolver)
+        async def resolve_observed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return await resolver(*args, **kwargs)
+            finally:
+                _add_resolver_time(time.perf_counter() - start)
+
+        return resolve_observed
+
+    @wraps(resolver)
+    def resolve_observed_sync(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return resolver(*args, **kwargs)
+        finally:
+            _add_resolver_time(time.perf_counter() - start)
+
+    return resolve_observed_sync
+
+
+class ObservedFactory:
+    """Adds the time spent in a connection factory to the current field.
+
+    Attributes and the call signature are those of the wrapped factory, so
+    the optional factory features are still detected.
+    """
+
+    def __init__(self, factory: Callable[..., Any]) -> None:
+        self.__wrapped__ = factory
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__wrapped__, name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return self.__wrapped__(*args, **kwargs)
+        finally:
+            _add_factory_time(time.perf_counter() - start)
+
+
+class AsyncObservedFactory(ObservedFactory):
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await self.__wrapped__(*args, **kwargs)
+        finally:
+            _add_factory_time(time.perf_counter() - start)
+
+
+def observe_factory(factory: Callable[..., Any]) -> ObservedFactory:
+    if is_coroutine_callable(factory):
+        return AsyncObservedFactory(factory)
+    return ObservedFactory(factory)
+
+
+def observe_node_resolver(
+    resolver: Callable[..., Any], node_type: str, hook: NodeHook, *, batch: bool
+) -> Callable[..., Any]:
+    """Reports the time spent in a node instance resolver to `hook`."""
+
+    def report(node_ids: Any, resolver_time: float) -> None:
+        stats = NodeResolverStats(
+            node_type=node_type,
+            resolver_time=resolver_time,
+            ids=len(node_ids) if batch else 1,
+            batch=batch,
+        )
+        hook(stats)
+        request_stats = _request_stats.get()
+        if request_stats is not None:
+            request_stats.nodes.append(stats)
+
+    if is_coroutine_callable(resolver):
+
+        @wraps(resolver)
+        async def resolve_observed(node_ids: Any, *args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return await resolver(node_ids, *args, **kwargs)
+            finally:
+                report(node_ids, time.perf_counter() - start)
+
+        return resolve_observed
+
+    @wraps(resolver)
+    def resolve_observed_sync(node_ids: Any, *args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return resolver(node_ids, *args, **kwargs)
+        finally:
+            report(node_ids, time.perf_counter() - start)
+
+    return resolve_observed_sync
+
+
+def _add_resolver_time(elapsed: float) -> None:
+    recorder = _connection_recorder.get()
+    if recorder is not None:
+        recorder.resolver_time += elapsed
+
+
+def _add_factory_time(elapsed: float) -> None:
+    recorder = _connection_recorder.get()
+    if recorder is not None:
+        recorder.factory_time += elapsed
+
+
+class Histogram:
+    """Counts observations into cumulative buckets, as Prometheus does."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> List[Tuple[float, int]]:
+        counts = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.bucket_counts):
+            total += count
+            counts.append((bound, total))
+        return counts
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "buckets": {
+                _format_bound(bound): count for bound, count in self.cumulative_counts()
+            },
+            "count": self.count,
+            "sum": self.sum,
+        }
+
+
+class ConnectionFieldMetrics:
+    def __init__(
+        self, latency_buckets: Sequence[float], size_buckets: Sequence[float]
+    ) -> None:
+        self.resolver_seconds = Histogram(latency_buckets)
+        self.factory_seconds = Histogram(latency_buckets)
+        self.items_fetched = Histogram(size_buckets)
+        self.edges_returned = Histogram(size_buckets)
+        self.count_calls = 0
+
+    def observe(self, stats: ConnectionFieldStats) -> None:
+        self.resolver_seconds.observe(stats.resolver_time)
+        self.factory_seconds.observe(stats.factory_time)
+        self.items_fetched.observe(stats.items_fetched)
+        if stats.edges_returned is not None:
+            self.edges_returned.observe(stats.edges_returned)
+        self.count_calls += stats.count_calls
+
+    def as_dict(self) -> Dict[str, Any]:
+        overfetch_ratio = None
+        if self.edges_returned.sum:
+            overfetch_ratio = self.items_fetched.sum / self.edges_returned.sum
+        return {
+            "resolver_seconds": self.resolver_seconds.as_dict(),
+            "factory_seconds": self.factory_seconds.as_dict(),
+            "items_fetched": self.items_fetched.as_dict(),
+            "edges_returned": self.edges_returned.as_dict(),
+            "count_calls": self.count_calls,
+            "overfetch_ratio": overfetch_ratio,
+        }
+
+
+class NodeTypeMetrics:
+    def __init__(
+        self, latency_buckets: Sequence[float], size_buckets: Sequence[float]
+    ) -> None:
+        self.resolver_seconds = Histogram(latency_buckets)
+        self.ids = Histogram(size_buckets)
+
+    def observe(self, stats: NodeResolverStats) -> None:
+        self.resolver_seconds.observe(stats.resolver_time)
+        self.ids.observe(stats.ids)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "resolver_seconds": self.resolver_seconds.as_dict(),
+            "ids": self.ids.as_dict(),
+        }
+
+
+class RelayMetrics:
+    """Aggregates connection field and node resolver stats in process.
+
+    `observe_connection` and `observe_node` are hooks for connection fields
+    and node types, and `observe_queue_wait` is a queue wait listener for
+    thread offloaders.  The histograms can be pulled with `as_dict()`, or
+    exported in the Prometheus text format with `to_prometheus()`.
+    """
+
+    def __init__(
+        self,
+        *,
+        latency_buckets: Sequence[float] = LATENCY_BUCKETS,
+        size_buckets: Sequence[float] = SIZE_BUCKETS,
+        prefix: str = "ariadne_relay",
+    ) -> None:
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._connections: Dict[str, ConnectionFieldMetrics] = {}
+        self._nodes: Dict[str, NodeTypeMetrics] = {}
+        self._queue_wait_seconds = Histogram(self.latency_buckets)
+
+    def observe_connection(self, stats: ConnectionFieldStats) -> None:
+        with self._lock:
+            metrics = self._connections.get(stats.field)
+            if metrics is None:
+                metrics = self._connections[stats.field] = ConnectionFieldMetrics(
+                    self.latency_buckets, self.size_buckets
+                )
+            metrics.observe(stats)
+
+    def observe_node(self, stats: NodeResolverStats) -> None:
+        with self._lock:
+            metrics = self._nodes.get(stats.node_type)
+            if metrics is None:
+                metrics = self._nodes[stats.node_type] = NodeTypeMetrics(
+                    self.latency_buckets, self.size_buckets
+                )
+            metrics.observe(stats)
+
+    def observe_queue_wait(self, queue_wait: float) -> None:
+        with self._lock:
+            self._queue_wait_seconds.observe(queue_wait)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connections": {
+                    field: metrics.as_dict()
+                    for field, metrics in sorted(self._connections.items())
+                },
+                "nodes": {
+                    node_type: metrics.as_dict()
+                    for node_type, metrics in sorted(self._nodes.items())
+                },
+                "offload_queue_wait_seconds": self._queue_wait_seconds.as_dict(),
+            }
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            connections = sorted(self._connections.items())
+            nodes = sorted(self._nodes.items())
+            lines: List[str] = []
+            for name, help_text, attr in (
+                (
+                    "connection_resolver_seconds",
+                    "Time spent in connection resolvers.",
+                    "resolver_seconds",
+                ),
+                (
+                    "connection_factory_seconds",
+                    "Time spent in connection factories.",
+                    "factory_seconds",
+                ),
+                (
+                    "connection_items_fetched",
+                    "Items fetched from the data of connections.",
+                    "items_fetched",
+                ),
+                (
+                    "connection_edges_returned",
+                    "Edges returned by connections.",
+                    "edges_returned",
+                ),
+            ):
+                self._write_histograms(
+                    lines,
+                    name,
+                    help_text,
+                    "field",
+                    [(field, getattr(metrics, attr)) for field, metrics in connections],
+                )
+            name = f"{self.prefix}_connection_count_calls_total"
+            lines.append(f"# HELP {name} Lengths taken of the data of connections.")
+            lines.append(f"# TYPE {name} counter")
+            for field, metrics in connections:
+                lines.append(
+                    f'{name}{{field="{_escape(field)}"}} {metrics.count_calls}'
+                )
+            self._write_histograms(
+                lines,
+                "node_resolver_seconds",
+                "Time spent in node instance resolvers.",
+                "node_type",
+                [(node_type, metrics.resolver_seconds) for node_type, metrics in nodes],
+            )
+            self._write_histograms(
+                lines,
+                "node_resolver_ids",
+                "Node ids passed to node instance resolvers.",
+                "node_type",
+                [(node_type, metrics.ids) for node_type, metrics in nodes],
+            )
+            self._write_histograms(
+                lines,
+                "offload_queue_wait_seconds",
+                "Time that offloaded resolvers waited for a worker thread.",
+                None,
+                [("", self._queue_wait_seconds)],
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._connections.clear()
+            self._nodes.clear()
+            self._queue_wait_seconds = Histogram(self.latency_buckets)
+
+    def _write_histograms(
+        self,
+        lines: List[str],
+        name: str,
+        help_text: str,
+        label: Optional[str],
+        histograms: List[Tuple[str, Histogram]],
+    ) -> None:
+        name = f"{self.prefix}_{name}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for value, histogram in histograms:
+            labels = "" if label is None else f'{label}="{_escape(value)}"'
+            bucket_labels = f"{labels}," if labels else ""
+            for bound, count in histogram.cumulative_counts():
+                lines.append(
+                    f'{name}_bucket{{{bucket_labels}le="{_format_bound(bound)}"}} '
+                    f"{count}"
+                )
+            labels = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+class RequestStats:
+    def __init__(self) -> None:
+        self.connections: List[ConnectionFieldStats] = []
+        self.nodes: List[NodeResolverStats] = []
+
+
+class RelayMetricsExtension(Extension):
+    """Adds the stats of the connection fields and node resolvers of each
+    request to the `extensions` of its response.
+
+    Only connection fields and node types that have a hook are observed.
+    """
+
+    def __init__(self) -> None:
+        self.stats = RequestStats()
+        self._token: Any = None
+
+    def request_started(self, context: ContextValue) -> None:
+        self._token = _request_stats.set(self.stats)
+
+    def request_finished(self, context: ContextValue) -> None:
+        if self._token is not None:
+            _request_stats.reset(self._token)
+            self._token = None
+
+    def format(self, context: ContextValue) -> Dict[str, Any]:  # noqa: A003
+        return {
+            "relayMetrics": {
+                "connections": [
+                    {
+                        "field": stats.field,
+                        "path": stats.path,
+                        "resolverTime": stats.resolver_time,
+                        "factoryTime": stats.factory_time,
+                        "itemsFetched": stats.items_fetched,
+                        "edgesReturned": stats.edges_returned,
+                        "countCalls": stats.count_calls,
+                    }
+                    for stats in self.stats.connections
+                ],
+                "nodes": [
+                    {
+                        "nodeType": stats.node_type,
+                        "resolverTime": stats.resolver_time,
+                        "ids": stats.ids,
+                        "batch": stats.batch,
+                    }
+                    for stats in self.stats.nodes
+                ],
+            }
+        }
+
+
+def _format_bound(bound: float) -> str:
+    if bound == float("inf"):
+        return "+Inf"
+    return repr(float(bound))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -1,5 +1,19 @@
+import asyncio
 from inspect import isawaitable
-from typing import Any, Awaitable, Callable, cast, Optional, Tuple, Union
+from operator import attrgetter
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    cast,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from ariadne.types import Resolver
 from graphql import (
@@ -8,26 +22,55 @@ from graphql import (
     GraphQLObjectType,
     GraphQLResolveInfo,
 )
-from graphql_relay import from_global_id, to_global_id
 
+from .cache import NodeCache
+from .global_id import get_default_global_id_codec, NodeIdParser
 from .interfaces import RelayInterfaceType
+from .loader import get_node_loader, NodeLoader
+from .metrics import get_node_hook, NodeHook, observe_node_resolver
 from .objects import RelayObjectType
-from .utils import is_coroutine_callable
+from .offload import get_thread_offloader, Offload
+from .registry import (  # noqa: F401
+    ALIASES,
+    BATCH_INSTANCE_RESOLVER,
+    CACHE,
+    get_node_registry,
+    ID_TYPE,
+    INSTANCE_RESOLVER,
+    INVALID_NODE_ID,
+    NodeBatchInstanceAwaitable,
+    NodeBatchInstanceCallable,
+    NodeBatchInstanceResolver,
+    NodeDispatcher,
+    NodeInstanceAwaitable,
+    NodeInstanceCallable,
+    NodeInstanceResolver,
+)
+from .tracing import (
+    DECODE_NODE_ID_SPAN,
+    get_default_tracer,
+    ID_COUNT,
+    NODE_ID_SPAN,
+    NODE_QUERY_SPAN,
+    NODES_QUERY_SPAN,
+    trace_call,
+    trace_node_resolver,
+    TYPENAME,
+)
+from .utils import get_extension, is_coroutine_callable, set_extension
 
 NodeIdAwaitable = Callable[..., Awaitable[str]]
 NodeIdCallable = Callable[..., str]
 NodeIdResolver = Union[NodeIdAwaitable, NodeIdCallable]
-NodeInstanceAwaitable = Callable[..., Awaitable[Any]]
-NodeInstanceCallable = Callable[..., Any]
-NodeInstanceResolver = Union[NodeInstanceAwaitable, NodeInstanceCallable]
 NodeTypenameAwaitable = Callable[..., Awaitable[str]]
 NodeTypenameCallable = Callable[..., str]
 NodeTypenameResolver = Union[NodeTypenameAwaitable, NodeTypenameCallable]
 
 ID_RESOLVER = "ariadne_relay_node_id_resolver"
-INSTANCE_RESOLVER = "ariadne_relay_node_instance_resolver"
 TYPENAME_RESOLVER = "ariadne_relay_node_typename_resolver"
 
+NODE_ID_RESOLVER_MARKER = "_ariadne_relay_node_id_resolver"
+
 
 async def resolve_node_query(
     _: None,
@@ -35,14 +78,11 @@ async def resolve_node_query(
     *,
     id: str,  # noqa: A002
 ) -> Any:
-    instance_resolver_and_node_id = _get_instance_resolver_and_node_id(info, id)
-    if instance_resolver_and_node_id:
-        instance_resolver, node_id = instance_resolver_and_node_id
-        node_instance = instance_resolver(node_id, info)
-        if isawaitable(node_instance):
-            node_instance = await node_instance
-        return node_instance
-    return None
+    tracer = get_default_tracer()
+    if tracer is None:
+        return await _resolve_node(id, info)
+    with tracer.start_as_current_span(NODE_QUERY_SPAN, attributes={ID_COUNT: 1}):
+        return await _resolve_node(id, info)
 
 
 def resolve_node_query_sync(
@@ -51,97 +91,260 @@ def resolve_node_query_sync(
     *,
     id: str,  # noqa: A002
 ) -> Any:
-    instance_resolver_and_node_id = _get_instance_resolver_and_node_id(info, id)
-    if instance_resolver_and_node_id:
-        instance_resolver, node_id = instance_resolver_and_node_id
-        return instance_resolver(node_id, info)
+    tracer = get_default_tracer()
+    if tracer is None:
+        return _resolve_node_sync(id, info)
+    with tracer.start_as_current_span(NODE_QUERY_SPAN, attributes={ID_COUNT: 1}):
+        return _resolve_node_sync(id, info)
+
+
+async def resolve_nodes_query(
+    _: None,
+    info: GraphQLResolveInfo,
+    *,
+    ids: List[str],
+) -> List[Any]:
+    tracer = get_default_tracer()
+    if tracer is None:
+        return await _resolve_nodes(ids, info)
+    with tracer.start_as_current_span(
+        NODES_QUERY_SPAN, attributes={ID_COUNT: len(ids)}
+    ):
+        return await _resolve_nodes(ids, info)
+
+
+def resolve_nodes_query_sync(
+    _: None,
+    info: GraphQLResolveInfo,
+    *,
+    ids: List[str],
+) -> Any:
+    tracer = get_default_tracer()
+    if tracer is None:
+        return _resolve_nodes_sync(ids, info)
+    with tracer.start_as_current_span(
+        NODES_QUERY_SPAN, attributes={ID_COUNT: len(ids)}
+    ):
+        return _resolve_nodes_sync(ids, info)
+
+
+async def _resolve_node(raw_id: str, info: GraphQLResolveInfo) -> Any:
+    loader = get_node_loader(info, _create_node_loader)
+    if loader is not None:
+        return await loader.load(raw_id, info)
+    dispatcher_and_node_id = _get_dispatcher_and_node_id(info, raw_id)
+    if dispatcher_and_node_id:
+        dispatcher, node_id = dispatcher_and_node_id
+        node_instance = dispatcher.resolve_instance(node_id, info)
+        if isawaitable(node_instance):
+            node_instance = await node_instance
+        return node_instance
+    return None
+
+
+def _resolve_node_sync(raw_id: str, info: GraphQLResolveInfo) -> Any:
+    loader = get_node_loader(info, _create_node_loader)
+    if loader is not None:
+        return loader.load_sync(raw_id, info)
+    dispatcher_and_node_id = _get_dispatcher_and_node_id(info, raw_id)
+    if dispatcher_and_node_id:
+        dispatcher, node_id = dispatcher_and_node_id
+        return dispatcher.resolve_instance(node_id, info)
     return None
 
 
+async def _resolve_nodes(ids: List[str], info: GraphQLResolveInfo) -> List[Any]:
+    loader = get_node_loader(info, _create_node_loader)
+    if loader is not None:
+        return await loader.load_many(ids, info)
+    return await _load_nodes(ids, info)
+
+
+def _resolve_nodes_sync(ids: List[str], info: GraphQLResolveInfo) -> Any:
+    loader = get_node_loader(info, _create_node_loader)
+    if loader is not None:
+        return loader.load_many_sync(ids, info)
+    return _load_nodes_sync(ids, info)
+
+
+async def _load_nodes(ids: List[str], info: GraphQLResolveInfo) -> List[Any]:
+    nodes: List[Any] = [None] * len(ids)
+    groups = _group_node_ids(info, ids)
+    group_instances = await asyncio.gather(
+        *(group.dispatcher.resolve_instances(group.node_ids, info) for group in groups)
+    )
+    for group, instances in zip(groups, group_instances):
+        group.assign(nodes, instances)
+    return nodes
+
+
+def _load_nodes_sync(ids: List[str], info: GraphQLResolveInfo) -> Any:
+    nodes: List[Any] = [None] * len(ids)
+    pending: List[Tuple[_NodeIdGroup, Awaitable[Sequence[Any]]]] = []
+    for group in _group_node_ids(info, ids):
+        instances = group.dispatcher.resolve_instances_sync(group.node_ids, info)
+        if isawaitable(instances):
+            pending.append((group, instances))
+        else:
+            group.assign(nodes, cast(Sequence[Any], instances))
+    if pending:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            for _, instances in pending:
+                if hasattr(instances, "close"):
+                    instances.close()
+            raise RuntimeError(
+                "Nodes with async resolvers can only be loaded by an async executor"
+            ) from None
+        return _assign_pending_instances(nodes, pending)
+    return nodes
+
+
+async def _assign_pending_instances(
+    nodes: List[Any], pending: List[Tuple["_NodeIdGroup", Awaitable[Sequence[Any]]]]
+) -> List[Any]:
+    group_instances = await asyncio.gather(*(instances for _, instances in pending))
+    for (group, _), instances in zip(pending, group_instances):
+        group.assign(nodes, instances)
+    return nodes
+
+
+def _create_node_loader() -> NodeLoader:
+    return NodeLoader(_load_nodes, _load_nodes_sync)
+
+
 class NodeType:
     name: str
+    _resolve_batch_instance: Optional[NodeBatchInstanceResolver]
     _resolve_id: Optional[NodeIdResolver]
     _resolve_instance: Optional[NodeInstanceResolver]
     _resolve_typename: Optional[NodeTypenameResolver]
+    _aliases: Tuple[str, ...]
+    _cache: Optional[NodeCache]
+    _id_type: Optional[NodeIdParser]
+    _node_hook: Optional[NodeHook]
+    _offload: Offload
 
     def bind_node_resolvers_to_graphql_type(
         self, graphql_type: GraphQLObjectType, replace_existing: bool = True
     ) -> None:
         if "id" not in graphql_type.fields:
             raise ValueError(f"Field id is not defined on type {self.name}")
-        if graphql_type.fields["id"].resolve is None or replace_existing:
-            if is_coroutine_callable(self._resolve_typename) or is_coroutine_callable(
-                self._resolve_id
+        resolve_instance = self._resolve_instance
+        resolve_batch_instance = self._resolve_batch_instance
+        hook = get_node_hook(self._node_hook)
+        if hook is not None:
+            if resolve_instance is not None:
+                resolve_instance = observe_node_resolver(
+                    resolve_instance, self.name, hook, batch=False
+                )
+            if resolve_batch_instance is not None:
+                resolve_batch_instance = observe_node_resolver(
+                    resolve_batch_instance, self.name, hook, batch=True
+                )
+        tracer = get_default_tracer()
+        if tracer is not None:
+            if resolve_instance is not None:
+                resolve_instance = trace_node_resolver(
+                    resolve_instance, self.name, tracer, batch=False
+                )
+            if resolve_batch_instance is not None:
+                resolve_batch_instance = trace_node_resolver(
+                    resolve_batch_instance, self.name, tracer, batch=True
+                )
+        offloader = get_thread_offloader(self._offload)
+        if offloader is not None:
+            if resolve_instance and not is_coroutine_callable(resolve_instance):
+                resolve_instance = offloader.wrap(resolve_instance)
+            if resolve_batch_instance and not is_coroutine_callable(
+                resolve_batch_instance
             ):
-                graphql_type.fields["id"].resolve = self._resolve_node_id_field
-            else:
-                graphql_type.fields["id"].resolve = self._resolve_node_id_field_sync
+                resolve_batch_instance = offloader.wrap(resolve_batch_instance)
         if self._resolve_id is not None:
-            _set_extension(
+            set_extension(
                 graphql_type,
                 ID_RESOLVER,
                 self._resolve_id,
                 replace_existing,
             )
-        if self._resolve_instance is not None and graphql_type.name == self.name:
-            _set_extension(
+        if resolve_instance is not None and graphql_type.name == self.name:
+            set_extension(
                 graphql_type,
                 INSTANCE_RESOLVER,
-                self._resolve_instance,
+                resolve_instance,
+                replace_existing,
+            )
+        if resolve_batch_instance is not None and graphql_type.name == self.name:
+            set_extension(
+                graphql_type,
+                BATCH_INSTANCE_RESOLVER,
+                resolve_batch_instance,
+                replace_existing,
+            )
+        if self._aliases and graphql_type.name == self.name:
+            set_extension(
+                graphql_type,
+                ALIASES,
+                self._aliases,
+                replace_existing,
+            )
+        if self._cache is not None and graphql_type.name == self.name:
+            set_extension(
+                graphql_type,
+                CACHE,
+                self._cache,
+                replace_existing,
+            )
+        if self._id_type is not None and graphql_type.name == self.name:
+            set_extension(
+                graphql_type,
+                ID_TYPE,
+                self._id_type,
                 replace_existing,
             )
         if self._resolve_typename is not None:
-            _set_extension(
+            set_extension(
                 graphql_type,
                 TYPENAME_RESOLVER,
                 self._resolve_typename,
                 replace_existing,
             )
+        # the id resolver is compiled from the extensions of the concrete type,
+        # so it is recompiled whenever an interface contributes new extensions
+        id_field = graphql_type.fields["id"]
+        if (
+            id_field.resolve is None
+            or replace_existing
+            or getattr(id_field.resolve, NODE_ID_RESOLVER_MARKER, False)
+        ):
+            id_field.resolve = create_node_id_resolver(graphql_type)
 
-    async def _resolve_node_id_field(self, obj: Any, info: GraphQLResolveInfo) -> str:
-        node_typename = self._resolve_node_typename(obj, info)
-        if isawaitable(node_typename):
-            node_typename = await cast(Awaitable[str], node_typename)
-        node_id = self._resolve_node_id(obj, info)
-        if isawaitable(node_id):
-            node_id = await cast(Awaitable[str], node_id)
-        return to_global_id(cast(str, node_typename), cast(str, node_id))
-
-    def _resolve_node_id_field_sync(self, obj: Any, info: GraphQLResolveInfo) -> str:
-        node_typename = cast(str, self._resolve_node_typename(obj, info))
-        node_id = cast(str, self._resolve_node_id(obj, info))
-        return to_global_id(node_typename, node_id)
-
-    def _resolve_node_id(
-        self,
-        obj: Any,
-        info: GraphQLResolveInfo,
-    ) -> Union[str, Awaitable[str]]:
-        resolve_id = cast(
-            Optional[NodeIdResolver],
-            _get_extension(info.parent_type, ID_RESOLVER),
-        )
-        if resolve_id:
-            return resolve_id(obj, info)
-        return cast(str, default_field_resolver(obj, info))
+    def set_aliases(self, aliases: Iterable[str]) -> None:
+        self._aliases = tuple(aliases)
 
-    def _resolve_node_typename(
-        self,
-        obj: Any,
-        info: GraphQLResolveInfo,
-    ) -> Union[str, Awaitable[str]]:
-        resolve_typename = cast(
-            Optional[NodeTypenameResolver],
-            _get_extension(info.parent_type, TYPENAME_RESOLVER),
-        )
-        if resolve_typename:
-            return resolve_typename(obj, info)
-        return info.parent_type.name
+    def set_batch_instance_resolver(
+        self, batch_instance_resolver: NodeBatchInstanceResolver
+    ) -> NodeBatchInstanceResolver:
+        self._resolve_batch_instance = batch_instance_resolver
+        return batch_instance_resolver
+
+    def set_cache(self, cache: Optional[NodeCache]) -> None:
+        self._cache = cache
 
     def set_id_resolver(self, id_resolver: NodeIdResolver) -> NodeIdResolver:
         self._resolve_id = id_resolver
         return id_resolver
 
+    def set_id_type(self, id_type: Optional[NodeIdParser]) -> None:
+        self._id_type = id_type
+
+    def set_node_hook(self, hook: Optional[NodeHook]) -> None:
+        self._node_hook = hook
+
+    def set_offload(self, offload: Offload) -> None:
+        self._offload = offload
+
     def set_instance_resolver(
         self, instance_resolver: NodeInstanceResolver
     ) -> NodeInstanceResolver:
@@ -156,54 +359,193 @@ class NodeType:
         return typename_resolver
 
     # Alias resolvers for consistent decorator API
+    batch_instance_resolver = set_batch_instance_resolver
     id_resolver = set_id_resolver
     instance_resolver = set_instance_resolver
     typename_resolver = set_typename_resolver
 
 
-def _get_extension(graphql_type: GraphQLNamedType, name: str) -> Any:
-    if not isinstance(graphql_type.extensions, dict):
-        return None
-    return graphql_type.extensions.get(name)
+def create_node_id_resolver(graphql_type: GraphQLNamedType) -> Resolver:
+    resolve_id = cast(
+        Optional[NodeIdResolver], get_extension(graphql_type, ID_RESOLVER)
+    )
+    resolve_typename = cast(
+        Optional[NodeTypenameResolver],
+        get_extension(graphql_type, TYPENAME_RESOLVER),
+    )
+    typename = graphql_type.name
+    resolver: Resolver
+
+    if is_coroutine_callable(resolve_id) or is_coroutine_callable(resolve_typename):
+
+        async def resolve_node_id_field(obj: Any, info: GraphQLResolveInfo) -> str:
+            node_typename: Any = typename
+            if resolve_typename is not None:
+                node_typename = resolve_typename(obj, info)
+                if isawaitable(node_typename):
+                    node_typename = await node_typename
+            if resolve_id is not None:
+                node_id = resolve_id(obj, info)
+                if isawaitable(node_id):
+                    node_id = await node_id
+            else:
+                node_id = _get_node_id(obj, info)
+            return get_default_global_id_codec().encode(node_typename, node_id)
+
+        resolver = resolve_node_id_field
+    elif resolve_id is None and resolve_typename is None:
+
+        def resolve_node_id_field_sync(obj: Any, info: GraphQLResolveInfo) -> str:
+            return get_default_global_id_codec().encode(
+                typename, _get_node_id(obj, info)
+            )
+
+        resolver = resolve_node_id_field_sync
+    else:
+        get_id = cast(NodeIdCallable, resolve_id or _get_node_id)
+        get_typename = cast(
+            NodeTypenameCallable, resolve_typename or _get_constant(typename)
+        )
+
+        def resolve_custom_node_id_field_sync(
+            obj: Any, info: GraphQLResolveInfo
+        ) -> str:
+            return get_default_global_id_codec().encode(
+                get_typename(obj, info), get_id(obj, info)
+            )
+
+        resolver = resolve_custom_node_id_field_sync
+
+    tracer = get_default_tracer()
+    if tracer is not None:
+        resolver = trace_call(resolver, tracer, NODE_ID_SPAN, {TYPENAME: typename})
+    setattr(resolver, NODE_ID_RESOLVER_MARKER, True)
+    return resolver
+
+
+_get_id_attr = attrgetter("id")
+
+
+def _get_node_id(obj: Any, info: GraphQLResolveInfo) -> Any:
+    try:
+        node_id = _get_id_attr(obj)
+    except AttributeError:
+        return default_field_resolver(obj, info)
+    if callable(node_id):
+        return default_field_resolver(obj, info)
+    return node_id
+
+
+def _get_constant(value: str) -> NodeTypenameCallable:
+    def get_constant(*_: Any) -> str:
+        return value
 
+    return get_constant
 
-def _set_extension(
-    graphql_type: GraphQLNamedType,
-    name: str,
-    value: Any,
-    replace_existing: bool,
-) -> None:
-    graphql_type.extensions = graphql_type.extensions or {}
-    if name not in graphql_type.extensions or replace_existing:
-        graphql_type.extensions[name] = value
+
+def _get_dispatcher_and_node_id(
+    info: GraphQLResolveInfo,
+    raw_id: str,
+) -> Optional[Tuple[NodeDispatcher, Any]]:
+    tracer = get_default_tracer()
+    if tracer is None:
+        return _decode_node_id(info, raw_id)
+    with tracer.start_as_current_span(
+        DECODE_NODE_ID_SPAN, attributes={ID_COUNT: 1}
+    ) as span:
+        dispatcher_and_node_id = _decode_node_id(info, raw_id)
+        if dispatcher_and_node_id is not None:
+            span.set_attribute(TYPENAME, dispatcher_and_node_id[0].typename)
+        return dispatcher_and_node_id
 
 
-def _get_instance_resolver_and_node_id(
+def _decode_node_id(
     info: GraphQLResolveInfo,
     raw_id: str,
-) -> Optional[Tuple[NodeInstanceResolver, str]]:
-    node_type_name, node_id = from_global_id(raw_id)
-    node_type = info.schema.type_map.get(node_type_name)
-    if node_type:
-        instance_resolver = _get_extension(node_type, INSTANCE_RESOLVER)
-        if instance_resolver:
-            return instance_resolver, node_id
+) -> Optional[Tuple[NodeDispatcher, Any]]:
+    node_type_name, raw_node_id = get_default_global_id_codec().decode(raw_id)
+    dispatcher = get_node_registry(info.schema).get(node_type_name)
+    if dispatcher is not None:
+        node_id = dispatcher.parse_id(raw_node_id)
+        if node_id is not INVALID_NODE_ID:
+            return dispatcher, node_id
     return None
 
 
+class _NodeIdGroup:
+    def __init__(self, dispatcher: NodeDispatcher) -> None:
+        self.dispatcher = dispatcher
+        self.node_ids: List[Any] = []
+        self.positions: Dict[Any, List[int]] = {}
+
+    def add(self, node_id: Any, position: int) -> None:
+        positions = self.positions.get(node_id)
+        if positions is None:
+            self.node_ids.append(node_id)
+            self.positions[node_id] = [position]
+        else:
+            positions.append(position)
+
+    def assign(self, nodes: List[Any], instances: Sequence[Any]) -> None:
+        for node_id, instance in zip(self.node_ids, instances):
+            for position in self.positions[node_id]:
+                nodes[position] = instance
+
+
+def _group_node_ids(info: GraphQLResolveInfo, ids: List[str]) -> List[_NodeIdGroup]:
+    tracer = get_default_tracer()
+    if tracer is None:
+        return _decode_node_ids(info, ids)
+    with tracer.start_as_current_span(
+        DECODE_NODE_ID_SPAN, attributes={ID_COUNT: len(ids)}
+    ):
+        return _decode_node_ids(info, ids)
+
+
+def _decode_node_ids(info: GraphQLResolveInfo, ids: List[str]) -> List[_NodeIdGroup]:
+    codec = get_default_global_id_codec()
+    registry = get_node_registry(info.schema)
+    groups: Dict[NodeDispatcher, _NodeIdGroup] = {}
+    for position, raw_id in enumerate(ids):
+        node_type_name, raw_node_id = codec.decode(raw_id)
+        dispatcher = registry.get(node_type_name)
+        if dispatcher is None:
+            continue
+        node_id = dispatcher.parse_id(raw_node_id)
+        if node_id is INVALID_NODE_ID:
+            continue
+        group = groups.get(dispatcher)
+        if group is None:
+            group = groups[dispatcher] = _NodeIdGroup(dispatcher)
+        group.add(node_id, position)
+    return list(groups.values())
+
+
 class NodeObjectType(NodeType, RelayObjectType):
     def __init__(
         self,
         name: str,
         *,
+        aliases: Iterable[str] = (),
+        batch_instance_resolver: Optional[NodeBatchInstanceResolver] = None,
+        cache: Optional[NodeCache] = None,
         id_resolver: Optional[NodeIdResolver] = None,
+        id_type: Optional[NodeIdParser] = None,
         instance_resolver: Optional[NodeInstanceResolver] = None,
+        node_hook: Optional[NodeHook] = None,
+        offload: Offload = None,
         typename_resolver: Optional[NodeTypenameResolver] = None,
         **kwargs: Any,
     ) -> None:
         super().__init__(name)
+        self._aliases = tuple(aliases)
+        self._resolve_batch_instance = batch_instance_resolver
+        self._cache = cache
         self._resolve_id = id_resolver
+        self._id_type = id_type
         self._resolve_instance = instance_resolver
+        self._node_hook = node_hook
+        self._offload = offload
         self._resolve_typename = typename_resolver
 
     def bind_resolvers_to_graphql_type(
@@ -221,14 +563,26 @@ class NodeInterfaceType(NodeType, RelayInterfaceType):
         name: str,
         type_resolver: Optional[Resolver] = None,
         *,
+        aliases: Iterable[str] = (),
+        batch_instance_resolver: Optional[NodeBatchInstanceResolver] = None,
+        cache: Optional[NodeCache] = None,
         id_resolver: Optional[NodeIdResolver] = None,
+        id_type: Optional[NodeIdParser] = None,
         instance_resolver: Optional[NodeInstanceResolver] = None,
+        node_hook: Optional[NodeHook] = None,
+        offload: Offload = None,
         typename_resolver: Optional[NodeTypenameResolver] = None,
         **kwargs: Any,
     ) -> None:
         super().__init__(name, type_resolver)
+        self._aliases = tuple(aliases)
+        self._resolve_batch_instance = batch_instance_resolver
+        self._cache = cache
         self._resolve_id = id_resolver
+        self._id_type = id_type
         self._resolve_instance = instance_resolver
+        self._node_hook = node_hook
+        self._offload = offload
         self._resolve_typename = typename_resolver
 
     def bind_resolvers_to_graphql_type(
@@ -0,0 +1,301 @@
+import asyncio
+from inspect import isawaitable
+from typing import (
+    Any,
+    Awaitable,
+    cast,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from graphql import GraphQLResolveInfo
+from graphql_relay import ConnectionType, EdgeType, SizedSliceable
+
+from .connection import (
+    BaseConnection,
+    ConnectionArguments,
+    ConnectionSelection,
+    CursorCodec,
+)
+from .global_id import get_default_global_id_codec
+from .loader import gather_instances
+from .node import resolve_nodes_query, resolve_nodes_query_sync
+
+MISSING_NODE_MODES = ("null", "drop")
+
+
+class NodeIdPage(NamedTuple):
+    node_ids: Optional[List[Any]]
+    start_offset: int
+    end_offset: int
+    has_previous_page: bool
+    has_next_page: bool
+    selection: Optional[ConnectionSelection]
+    total_count: Any
+
+
+class NodeIdPagination(BaseConnection[NodeIdPage]):
+    """Paginates the ids of a `BaseNodeConnection` into a `NodeIdPage`.
+
+    The pagination settings, the counts and the cursors are those of the
+    node connection.
+    """
+
+    def __init__(self, connection: "BaseNodeConnection") -> None:
+        self.connection = connection
+        super().__init__(
+            count_free=connection.count_free,
+            on_count=connection.on_count,
+            cursor_codec=connection._cursor_codec,
+            total_count=connection.total_count,
+        )
+
+    @property
+    def count_free(self) -> bool:
+        return self.connection.count_free
+
+    @count_free.setter
+    def count_free(self, count_free: bool) -> None:
+        self.connection.count_free = count_free
+
+    @property
+    def cursor_codec(self) -> CursorCodec:
+        return self.connection.cursor_codec
+
+    def count(self, data: SizedSliceable) -> int:
+        return self.connection.count(data)
+
+    def get_total_count(
+        self,
+        data: SizedSliceable,
+        total: Optional[int],
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        return self.connection.get_total_count(
+            data,
+            total,
+            selection=selection,
+            parent=parent,
+            info=info,
+            arguments=arguments,
+        )
+
+    def build_page(
+        self,
+        nodes: Optional[List[Any]],
+        start_offset: int,
+        end_offset: int,
+        has_previous_page: bool,
+        has_next_page: bool,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        total_count: Any = None,
+    ) -> NodeIdPage:
+        # the nodes of the page are loaded before the connection is built
+        return NodeIdPage(
+            nodes,
+            start_offset,
+            end_offset,
+            has_previous_page,
+            has_next_page,
+            selection,
+            total_count,
+        )
+
+
+class BaseNodeConnection(BaseConnection[ConnectionType]):
+    """Connection factory for sequences of node ids.
+
+    The ids are paginated like any other data, and only the nodes of the
+    page are then loaded, through the instance resolvers of their node
+    types.  The ids are global IDs, or the ids of `node_type` when it is
+    given.  Nodes that cannot be loaded are either returned as `null` or
+    dropped from the page, depending on `missing`.
+    """
+
+    def __init__(
+        self,
+        node_type: Optional[str] = None,
+        *,
+        missing: str = "null",
+        **kwargs: Any,
+    ) -> None:
+        if missing not in MISSING_NODE_MODES:
+            raise ValueError(
+                f"missing must be one of {', '.join(MISSING_NODE_MODES)}: "
+                f"{missing!r}"
+            )
+        super().__init__(**kwargs)
+        self.node_type = node_type
+        self.missing = missing
+        self.pagination = NodeIdPagination(self)
+
+    def create_node_id_page(
+        self,
+        data: SizedSliceable,
+        connection_args: ConnectionArguments,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> NodeIdPage:
+        if info is None:
+            raise ValueError(f"{type(self).__name__} must be called with info")
+        return self.pagination.create_connection(
+            data,
+            connection_args,
+            selection=selection,
+            parent=parent,
+            info=info,
+            arguments=arguments,
+        )
+
+    def create_empty_connection(
+        self, connection_args: ConnectionArguments
+    ) -> ConnectionType:
+        page = self.pagination.create_empty_connection(connection_args)
+        return self.build_node_page(page, None)
+
+    def get_global_ids(self, node_ids: List[Any]) -> List[str]:
+        if self.node_type is None:
+            return node_ids
+        encode = get_default_global_id_codec().encode
+        return [encode(self.node_type, node_id) for node_id in node_ids]
+
+    def build_node_page(
+        self, page: NodeIdPage, nodes: Optional[Sequence[Any]]
+    ) -> ConnectionType:
+        (
+            node_ids,
+            start_offset,
+            end_offset,
+            has_previous_page,
+            has_next_page,
+            selection,
+            total_count,
+        ) = page
+        if nodes is None or self.missing == "null":
+            return self.build_page(
+                None if nodes is None else list(nodes),
+                start_offset,
+                end_offset,
+                has_previous_page,
+                has_next_page,
+                selection=selection,
+                total_count=total_count,
+            )
+        codec = self.cursor_codec
+        edge_cursors = selection is None or selection.needs_edge_cursors
+        edges: List[EdgeType] = [
+            self.build_edge(
+                node, codec.encode(offset) if edge_cursors else cast(str, None)
+            )
+            for offset, node in enumerate(nodes, start_offset)
+            if node is not None
+        ]
+        start_cursor = end_cursor = None
+        end_offset = start_offset + len(nodes)
+        if end_offset > start_offset and (
+            selection is None or selection.needs_page_cursors
+        ):
+            # the page cursors span the ids, so that pagination moves past
+            # the nodes that were dropped
+            start_cursor = codec.encode(start_offset)
+            end_cursor = codec.encode(end_offset - 1)
+        return self.build_connection(
+            edges,
+            has_previous_page=has_previous_page,
+            has_next_page=has_next_page,
+            start_cursor=start_cursor,
+            end_cursor=end_cursor,
+            total_count=total_count,
+        )
+
+
+class NodeConnection(BaseNodeConnection):
+    async def __call__(
+        self,
+        data: SizedSliceable,
+        connection_args: ConnectionArguments,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> ConnectionType:
+        page = self.create_node_id_page(
+            data,
+            connection_args,
+            selection=selection,
+            parent=parent,
+            info=info,
+            arguments=arguments,
+        )
+        nodes = None
+        if page.node_ids is not None:
+            nodes = await resolve_nodes_query(
+                None,
+                cast(GraphQLResolveInfo, info),
+                ids=self.get_global_ids(page.node_ids),
+            )
+        return self.build_node_page(page, nodes)
+
+
+class SyncNodeConnection(BaseNodeConnection):
+    """Connection factory for sequences of node ids, see `NodeConnection`."""
+
+    def __call__(
+        self,
+        data: SizedSliceable,
+        connection_args: ConnectionArguments,
+        *,
+        selection: Optional[ConnectionSelection] = None,
+        parent: Any = None,
+        info: Optional[GraphQLResolveInfo] = None,
+        arguments: Optional[Dict[str, Any]] = None,
+    ) -> Union[ConnectionType, Awaitable[ConnectionType]]:
+        page = self.create_node_id_page(
+            data,
+            connection_args,
+            selection=selection,
+            parent=parent,
+            info=info,
+            arguments=arguments,
+        )
+        nodes = None
+        if page.node_ids is not None:
+            nodes = resolve_nodes_query_sync(
+                None,
+                cast(GraphQLResolveInfo, info),
+                ids=self.get_global_ids(page.node_ids),
+            )
+            if isawaitable(nodes) or any(map(isawaitable, nodes)):
+                # some node types have async instance resolvers
+                return self.build_awaited_node_page(page, nodes)
+        return self.build_node_page(page, nodes)
+
+    def build_awaited_node_page(
+        self, page: NodeIdPage, nodes: Any
+    ) -> Awaitable[ConnectionType]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if hasattr(nodes, "close"):
+                nodes.close()
+            raise RuntimeError(
+                "Nodes with async resolvers can only be loaded by an async executor"
+            ) from None
+
+        async def build_node_page() -> ConnectionType:
+            return self.build_node_page(page, await gather_instances(nodes))
+
+        return build_node_page()
@@ -0,0 +1,189 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
+from functools import wraps
+from inspect import isawaitable
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, NamedTuple, Optional, Union
+
+QueueWaitListener = Callable[[float], None]
+
+
+class ThreadOffloaderStats(NamedTuple):
+    submitted: int
+    completed: int
+    failed: int
+    cancelled: int
+    rejected: int
+    pending: int
+    queue_wait_total: float
+    queue_wait_max: float
+
+
+class ThreadOffloader:
+    """Runs blocking resolvers in a bounded thread pool.
+
+    At most `max_workers` calls run at once, and at most `max_queue` calls
+    wait for a worker, beyond which calls are rejected.  Calls run in a copy
+    of the caller's context, so context variables are propagated.  The time
+    that each call waits for a worker is reported to `on_queue_wait`.
+    Calls are pending until their worker is done with them, even when the
+    caller stopped waiting, and are cancelled only before a worker picks
+    them up.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        on_queue_wait: Optional[QueueWaitListener] = None,
+        thread_name_prefix: str = "ariadne-relay",
+    ) -> None:
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be a positive integer")
+        if max_queue is not None and max_queue < 0:
+            raise ValueError("max_queue must be a non-negative integer")
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix
+        )
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.on_queue_wait = on_queue_wait
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._cancelled = 0
+        self._rejected = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if (
+                self.max_queue is not None
+                and self._get_pending() >= self.max_workers + self.max_queue
+            ):
+                self._rejected += 1
+                raise RuntimeError("Thread offload queue is full")
+            self._submitted += 1
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(
+                self._call, context, time.perf_counter(), func, args, kwargs
+            )
+        except RuntimeError:
+            # the pool was shut down
+            with self._lock:
+                self._submitted -= 1
+                self._rejected += 1
+            raise
+        future.add_done_callback(self._count_done)
+        return await asyncio.wrap_future(future)
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Awaitable[Any]]:
+        @wraps(func)
+        async def run_offloaded(*args: Any, **kwargs: Any) -> Any:
+            result = await self.run(func, *args, **kwargs)
+            if isawaitable(result):
+                result = await result
+            return result
+
+        return run_offloaded
+
+    def stats(self) -> ThreadOffloaderStats:
+        with self._lock:
+            return ThreadOffloaderStats(
+                submitted=self._submitted,
+                completed=self._completed,
+                failed=self._failed,
+                cancelled=self._cancelled,
+                rejected=self._rejected,
+                pending=self._get_pending(),
+                queue_wait_total=self._queue_wait_total,
+                queue_wait_max=self._queue_wait_max,
+            )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _get_pending(self) -> int:
+        return self._submitted - self._completed - self._failed - self._cancelled
+
+    def _count_done(self, future: "Future[Any]") -> None:
+        with self._lock:
+            if future.cancelled():
+                self._cancelled += 1
+            elif future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def _call(
+        self,
+        context: contextvars.Context,
+        submitted_at: float,
+        func: Callable[..., Any],
+        args: Any,
+        kwargs: Any,
+    ) -> Any:
+        queue_wait = time.perf_counter() - submitted_at
+        with self._lock:
+            self._queue_wait_total += queue_wait
+            self._queue_wait_max = max(self._queue_wait_max, queue_wait)
+        if self.on_queue_wait is not None:
+            context.run(self.on_queue_wait, queue_wait)
+        return context.run(func, *args, **kwargs)
+
+
+Offload = Union[str, ThreadOffloader, None]
+
+OFFLOAD_MODES = ("thread", "none")
+
+DefaultOffload: Offload = None
+_default_thread_offloader: Optional[ThreadOffloader] = None
+_default_thread_offloader_lock = threading.Lock()
+
+
+def set_default_offload(offload: Offload) -> None:
+    global DefaultOffload
+    _check_offload(offload)
+    DefaultOffload = offload
+
+
+def get_thread_offloader(offload: Offload) -> Optional[ThreadOffloader]:
+    """Returns the offloader for an offload option, or the default one."""
+    _check_offload(offload)
+    if offload is None:
+        offload = DefaultOffload
+    if offload is None or offload == "none":
+        return None
+    if isinstance(offload, ThreadOffloader):
+        return offload
+    return get_default_thread_offloader()
+
+
+def get_default_thread_offloader() -> ThreadOffloader:
+    global _default_thread_offloader
+    with _default_thread_offloader_lock:
+        if _default_thread_offloader is None:
+            _default_thread_offloader = ThreadOffloader()
+        return _default_thread_offloader
+
+
+def set_default_thread_offloader(offloader: Optional[ThreadOffloader]) -> None:
+    global _default_thread_offloader
+    with _default_thread_offloader_lock:
+        _default_thread_offloader = offloader
+
+
+def _check_offload(offload: Offload) -> None:
+    if isinstance(offload, str) and offload not in OFFLOAD_MODES:
+        raise ValueError(
+            f"offload must be one of {', '.join(OFFLOAD_MODES)}: {offload!r}"
+        )
@@ -0,0 +1,294 @@
+import asyncio
+from inspect import isawaitable
+from types import MappingProxyType
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    cast,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from graphql import GraphQLResolveInfo, GraphQLSchema
+
+from .cache import NodeCache
+from .global_id import NodeIdParser
+from .tracing import (
+    CACHE_HIT,
+    CACHE_MISSES,
+    get_default_tracer,
+    ID_COUNT,
+    NODE_CACHE_SPAN,
+    Span,
+    TYPENAME,
+)
+from .utils import get_extension, is_coroutine_callable
+
+NodeBatchInstanceAwaitable = Callable[..., Awaitable[Any]]
+NodeBatchInstanceCallable = Callable[..., Any]
+NodeBatchInstanceResolver = Union[NodeBatchInstanceAwaitable, NodeBatchInstanceCallable]
+NodeInstanceAwaitable = Callable[..., Awaitable[Any]]
+NodeInstanceCallable = Callable[..., Any]
+NodeInstanceResolver = Union[NodeInstanceAwaitable, NodeInstanceCallable]
+
+ALIASES = "ariadne_relay_node_aliases"
+BATCH_INSTANCE_RESOLVER = "ariadne_relay_node_batch_instance_resolver"
+CACHE = "ariadne_relay_node_cache"
+ID_TYPE = "ariadne_relay_node_id_type"
+INSTANCE_RESOLVER = "ariadne_relay_node_instance_resolver"
+NODE_REGISTRY = "ariadne_relay_node_registry"
+
+INVALID_NODE_ID = object()
+
+
+class NodeDispatcher:
+    """Resolves instances of a single node type from decoded node ids."""
+
+    def __init__(
+        self,
+        typename: str,
+        *,
+        instance_resolver: Optional[NodeInstanceResolver] = None,
+        batch_instance_resolver: Optional[NodeBatchInstanceResolver] = None,
+        id_type: Optional[NodeIdParser] = None,
+        cache: Optional[NodeCache] = None,
+    ) -> None:
+        if instance_resolver is None and batch_instance_resolver is None:
+            raise ValueError(f"No instance resolver is defined for {typename}")
+        self.typename = typename
+        self.instance_resolver = instance_resolver
+        self.batch_instance_resolver = batch_instance_resolver
+        self.id_type = id_type
+        self.cache = cache
+        self.is_async = is_coroutine_callable(
+            instance_resolver
+        ) or is_coroutine_callable(batch_instance_resolver)
+        if cache is not None:
+            cache.register_type(typename, typename, id_type)
+
+    def parse_id(self, node_id: str) -> Any:
+        if self.id_type is None:
+            return node_id
+        try:
+            return self.id_type(node_id)
+        except (TypeError, ValueError):
+            return INVALID_NODE_ID
+
+    def resolve_instance(self, node_id: Any, info: GraphQLResolveInfo) -> Any:
+        if self.cache is not None:
+            if self.is_async:
+                return self._first_cached_instance(node_id, info)
+            return self._fetch_cached_instances_sync([node_id], info)[0]
+        if self.instance_resolver is not None:
+            return self.instance_resolver(node_id, info)
+        instances = cast(NodeBatchInstanceResolver, self.batch_instance_resolver)(
+            [node_id], info
+        )
+        if isawaitable(instances):
+            return self._first_instance(node_id, instances)
+        return align_batch_instances([node_id], instances)[0]
+
+    async def resolve_instances(
+        self, node_ids: List[Any], info: GraphQLResolveInfo
+    ) -> Sequence[Any]:
+        if self.cache is None:
+            return await self._fetch_instances(node_ids, info)
+        tracer = get_default_tracer()
+        if tracer is None:
+            return await self.cache.load_many(
+                self.typename,
+                node_ids,
+                lambda missing_ids: self._fetch_instances(missing_ids, info),
+            )
+        misses: List[int] = []
+        with tracer.start_as_current_span(
+            NODE_CACHE_SPAN, attributes=self._get_cache_attributes(node_ids)
+        ) as span:
+
+            def fetch_instances(missing_ids: List[Any]) -> Awaitable[Sequence[Any]]:
+                misses.append(len(missing_ids))
+                return self._fetch_instances(missing_ids, info)
+
+            instances = await self.cache.load_many(
+                self.typename, node_ids, fetch_instances
+            )
+            _set_cache_misses(span, sum(misses))
+            return instances
+
+    def resolve_instances_sync(
+        self, node_ids: List[Any], info: GraphQLResolveInfo
+    ) -> Union[Sequence[Any], Awaitable[Sequence[Any]]]:
+        if self.is_async:
+            # the instances of async resolvers are awaited by the executor
+            return self.resolve_instances(node_ids, info)
+        return self._fetch_cached_instances_sync(node_ids, info)
+
+    def _fetch_cached_instances_sync(
+        self, node_ids: List[Any], info: GraphQLResolveInfo
+    ) -> Sequence[Any]:
+        if self.cache is None:
+            return self._fetch_instances_sync(node_ids, info)
+        tracer = get_default_tracer()
+        if tracer is None:
+            return self.cache.load_many_sync(
+                self.typename,
+                node_ids,
+                lambda missing_ids: self._fetch_instances_sync(missing_ids, info),
+            )
+        misses: List[int] = []
+        with tracer.start_as_current_span(
+            NODE_CACHE_SPAN, attributes=self._get_cache_attributes(node_ids)
+        ) as span:
+
+            def fetch_instances(missing_ids: List[Any]) -> Sequence[Any]:
+                misses.append(len(missing_ids))
+                return self._fetch_instances_sync(missing_ids, info)
+
+            instances = self.cache.load_many_sync(
+                self.typename, node_ids, fetch_instances
+            )
+            _set_cache_misses(span, sum(misses))
+            return instances
+
+    def _get_cache_attributes(self, node_ids: List[Any]) -> Dict[str, Any]:
+        return {TYPENAME: self.typename, ID_COUNT: len(node_ids)}
+
+    async def _fetch_instances(
+        self, node_ids: List[Any], info: GraphQLResolveInfo
+    ) -> Sequence[Any]:
+        if self.batch_instance_resolver is not None:
+            instances = self.batch_instance_resolver(node_ids, info)
+            if isawaitable(instances):
+                instances = await instances
+            return align_batch_instances(node_ids, instances)
+        instance_resolver = cast(NodeInstanceResolver, self.instance_resolver)
+        results = [instance_resolver(node_id, info) for node_id in node_ids]
+        pending = [
+            (index, result)
+            for index, result in enumerate(results)
+            if isawaitable(result)
+        ]
+        if pending:
+            resolved = await asyncio.gather(*(result for _, result in pending))
+            for (index, _), instance in zip(pending, resolved):
+                results[index] = instance
+        return results
+
+    def _fetch_instances_sync(
+        self, node_ids: List[Any], info: GraphQLResolveInfo
+    ) -> Sequence[Any]:
+        if self.batch_instance_resolver is not None:
+            instances = self.batch_instance_resolver(node_ids, info)
+            if isawaitable(instances):
+                raise ValueError(
+                    f"Batch instance resolver for {self.typename} returned an "
+                    "awaitable, so it must be defined with async def"
+                )
+            return align_batch_instances(node_ids, instances)
+        instance_resolver = cast(NodeInstanceCallable, self.instance_resolver)
+        return [instance_resolver(node_id, info) for node_id in node_ids]
+
+    async def _first_instance(self, node_id: Any, instances: Awaitable[Any]) -> Any:
+        return align_batch_instances([node_id], await instances)[0]
+
+    async def _first_cached_instance(
+        self, node_id: Any, info: GraphQLResolveInfo
+    ) -> Any:
+        return (await self.resolve_instances([node_id], info))[0]
+
+
+class NodeRegistry(Mapping[str, NodeDispatcher]):
+    """Frozen mapping of global ID typenames to node dispatchers.
+
+    The registry is built once from the bound schema, and includes the
+    aliases that node types declare in addition to their own names.
+    """
+
+    def __init__(self, dispatchers: Mapping[str, NodeDispatcher]) -> None:
+        self._dispatchers = MappingProxyType(dict(dispatchers))
+
+    @classmethod
+    def from_schema(cls, schema: GraphQLSchema) -> "NodeRegistry":
+        dispatchers: Dict[str, NodeDispatcher] = {}
+        aliases: Dict[str, NodeDispatcher] = {}
+        for name, graphql_type in schema.type_map.items():
+            instance_resolver = get_extension(graphql_type, INSTANCE_RESOLVER)
+            batch_instance_resolver = get_extension(
+                graphql_type, BATCH_INSTANCE_RESOLVER
+            )
+            if instance_resolver is None and batch_instance_resolver is None:
+                continue
+            dispatcher = dispatchers[name] = NodeDispatcher(
+                name,
+                instance_resolver=instance_resolver,
+                batch_instance_resolver=batch_instance_resolver,
+                id_type=get_extension(graphql_type, ID_TYPE),
+                cache=get_extension(graphql_type, CACHE),
+            )
+            for alias in get_extension(graphql_type, ALIASES) or ():
+                if alias in aliases:
+                    raise ValueError(
+                        f"Node alias {alias} is declared by both "
+                        f"{aliases[alias].typename} and {name}"
+                    )
+                aliases[alias] = dispatcher
+                if dispatcher.cache is not None:
+                    dispatcher.cache.register_type(alias, name, dispatcher.id_type)
+        for alias, dispatcher in aliases.items():
+            if alias in dispatchers:
+                raise ValueError(
+                    f"Node alias {alias} of {dispatcher.typename} "
+                    "conflicts with a node type"
+                )
+            dispatchers[alias] = dispatcher
+        return cls(dispatchers)
+
+    def __getitem__(self, typename: str) -> NodeDispatcher:
+        return self._dispatchers[typename]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._dispatchers)
+
+    def __len__(self) -> int:
+        return len(self._dispatchers)
+
+    def get(  # type: ignore[override]
+        self, typename: str, default: Optional[NodeDispatcher] = None
+    ) -> Optional[NodeDispatcher]:
+        return self._dispatchers.get(typename, default)
+
+
+def build_node_registry(schema: GraphQLSchema) -> NodeRegistry:
+    registry = NodeRegistry.from_schema(schema)
+    schema.extensions[NODE_REGISTRY] = registry
+    return registry
+
+
+def get_node_registry(schema: GraphQLSchema) -> NodeRegistry:
+    registry = schema.extensions.get(NODE_REGISTRY)
+    if registry is None:
+        registry = build_node_registry(schema)
+    return cast(NodeRegistry, registry)
+
+
+def _set_cache_misses(span: Span, misses: int) -> None:
+    span.set_attribute(CACHE_MISSES, misses)
+    span.set_attribute(CACHE_HIT, misses == 0)
+
+
+def align_batch_instances(node_ids: List[Any], instances: Any) -> Sequence[Any]:
+    if isinstance(instances, Mapping):
+        return [instances.get(node_id) for node_id in node_ids]
+    aligned = list(instances)
+    if len(aligned) != len(node_ids):
+        raise ValueError(
+            "Batch instance resolver returned %d instances for %d ids"
+            % (len(aligned), len(node_ids))
+        )
+    return aligned
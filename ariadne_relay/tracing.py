@@ -0,0 +1,381 @@
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from functools import wraps
+from inspect import isawaitable
+import itertools
+import sys
+import threading
+import time
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ContextManager,
+    Dict,
+    Generator,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from .connection import ConnectionArguments
+from .utils import is_coroutine_callable
+
+try:
+    from typing import Protocol
+except ImportError:  # Python < 3.8
+    from typing_extensions import Protocol  # type: ignore
+
+CONNECTION_SPAN = "ariadne_relay.connection"
+CONNECTION_FACTORY_SPAN = "ariadne_relay.connection.factory"
+CONNECTION_RESOLVER_SPAN = "ariadne_relay.connection.resolver"
+DECODE_NODE_ID_SPAN = "ariadne_relay.node.decode_id"
+NODE_CACHE_SPAN = "ariadne_relay.node.cache"
+NODE_ID_SPAN = "ariadne_relay.node.id"
+NODE_INSTANCE_RESOLVER_SPAN = "ariadne_relay.node.instance_resolver"
+NODE_QUERY_SPAN = "ariadne_relay.node.query"
+NODES_QUERY_SPAN = "ariadne_relay.nodes.query"
+
+BATCH = "ariadne_relay.batch"
+CACHE_HIT = "ariadne_relay.cache_hit"
+CACHE_MISSES = "ariadne_relay.cache_misses"
+EDGES = "ariadne_relay.edges"
+FIELD = "ariadne_relay.field"
+ID_COUNT = "ariadne_relay.id_count"
+TYPENAME = "ariadne_relay.typename"
+WINDOW_LIMIT = "ariadne_relay.window.limit"
+WINDOW_OFFSET = "ariadne_relay.window.offset"
+
+
+class Span(Protocol):
+    def set_attribute(self, key: str, value: Any) -> None: ...
+
+
+class Tracer(Protocol):
+    """The part of the OpenTelemetry `Tracer` API that spans are made with.
+
+    Tracers from `opentelemetry.trace.get_tracer()` can be used as they are.
+    """
+
+    def start_as_current_span(
+        self, name: str, *, attributes: Optional[Mapping[str, Any]] = None
+    ) -> ContextManager[Span]: ...
+
+
+DefaultTracer: Optional[Tracer] = None
+
+
+def set_default_tracer(tracer: Optional[Tracer]) -> None:
+    global DefaultTracer
+    DefaultTracer = tracer
+
+
+def get_default_tracer() -> Optional[Tracer]:
+    return DefaultTracer
+
+
+class FinishedSpan(NamedTuple):
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    attributes: Dict[str, Any]
+    start_time: float
+    end_time: float
+    error: Optional[str]
+
+    @property
+    def duration(self) -> float:
+        return self.end_time - self.start_time
+
+
+class RecordingSpan:
+    def __init__(
+        self,
+        name: str,
+        span_id: int,
+        parent_id: Optional[int],
+        attributes: Optional[Mapping[str, Any]],
+        start_time: float,
+    ) -> None:
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_time = start_time
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+_current_span: ContextVar[Optional[RecordingSpan]] = ContextVar(
+    "ariadne_relay_current_span", default=None
+)
+
+
+class InMemoryTracer:
+    """Tracer that keeps its finished spans in memory.
+
+    It is meant for tests and offline analysis, without the OpenTelemetry
+    SDK.  Spans are nested through a context variable, so they follow
+    coroutines and offloaded calls.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._span_ids = itertools.count(1)
+        self._spans: List[FinishedSpan] = []
+
+    @contextmanager
+    def start_as_current_span(
+        self,
+        name: str,
+        *,
+        attributes: Optional[Mapping[str, Any]] = None,
+        **kwargs: Any,
+    ) -> Iterator[RecordingSpan]:
+        parent = _current_span.get()
+        with self._lock:
+            span_id = next(self._span_ids)
+        span = RecordingSpan(
+            name,
+            span_id,
+            None if parent is None else parent.span_id,
+            attributes,
+            self._clock(),
+        )
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as exception:
+            error = repr(exception)
+            raise
+        finally:
+            _current_span.reset(token)
+            finished = FinishedSpan(
+                span.name,
+                span.span_id,
+                span.parent_id,
+                span.attributes,
+                span.start_time,
+                self._clock(),
+                error,
+            )
+            with self._lock:
+                self._spans.append(finished)
+
+    def get_finished_spans(self) -> Tuple[FinishedSpan, ...]:
+        with self._lock:
+            return tuple(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+def trace_call(
+    func: Callable[..., Any],
+    tracer: Tracer,
+    name: str,
+    attributes: Mapping[str, Any],
+) -> Callable[..., Any]:
+    """Runs each call of `func` in a span."""
+    if is_coroutine_callable(func):
+
+        @wraps(func)
+        async def call_traced(*args: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(name, attributes=attributes):
+                return await func(*args, **kwargs)
+
+        return call_traced
+
+    @wraps(func)
+    def call_traced_sync(*args: Any, **kwargs: Any) -> Any:
+        with tracer.start_as_current_span(name, attributes=attributes):
+            return func(*args, **kwargs)
+
+    return call_traced_sync
+
+
+def trace_node_resolver(
+    resolver: Callable[..., Any], node_type: str, tracer: Tracer, *, batch: bool
+) -> Callable[..., Any]:
+    def get_attributes(node_ids: Any) -> Dict[str, Any]:
+        return {
+            TYPENAME: node_type,
+            ID_COUNT: len(node_ids) if batch else 1,
+            BATCH: batch,
+        }
+
+    if is_coroutine_callable(resolver):
+
+        @wraps(resolver)
+        async def resolve_traced(node_ids: Any, *args: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(
+                NODE_INSTANCE_RESOLVER_SPAN, attributes=get_attributes(node_ids)
+            ):
+                return await resolver(node_ids, *args, **kwargs)
+
+        return resolve_traced
+
+    @wraps(resolver)
+    def resolve_traced_sync(node_ids: Any, *args: Any, **kwargs: Any) -> Any:
+        with tracer.start_as_current_span(
+            NODE_INSTANCE_RESOLVER_SPAN, attributes=get_attributes(node_ids)
+        ):
+            return resolver(node_ids, *args, **kwargs)
+
+    return resolve_traced_sync
+
+
+class TracedFactory:
+    """Runs each call of a connection factory in a span.
+
+    Attributes and the call signature are those of the wrapped factory, so
+    the optional factory features are still detected.
+    """
+
+    def __init__(self, factory: Callable[..., Any], tracer: Tracer, field: str) -> None:
+        self.__wrapped__ = factory
+        self._tracer = tracer
+        self._attributes = {FIELD: field}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.__wrapped__, name)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        with self._tracer.start_as_current_span(
+            CONNECTION_FACTORY_SPAN, attributes=self._attributes
+        ):
+            return self.__wrapped__(*args, **kwargs)
+
+
+class AsyncTracedFactory(TracedFactory):
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        with self._tracer.start_as_current_span(
+            CONNECTION_FACTORY_SPAN, attributes=self._attributes
+        ):
+            return await self.__wrapped__(*args, **kwargs)
+
+
+def trace_factory(
+    factory: Callable[..., Any], tracer: Tracer, field: str
+) -> TracedFactory:
+    if is_coroutine_callable(factory):
+        return AsyncTracedFactory(factory, tracer, field)
+    return TracedFactory(factory, tracer, field)
+
+
+def trace_connection_resolver(
+    resolve: Callable[..., Any],
+    tracer: Tracer,
+    field: str,
+    get_connection_args: Callable[..., Any] = ConnectionArguments,
+) -> Callable[..., Any]:
+    """Runs each resolution of a connection field in a span.
+
+    The span carries the page window that the arguments ask for, once the
+    page size policy of the field is applied, and the number of edges that
+    were returned.
+    """
+
+    def get_attributes(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        attributes: Dict[str, Any] = {FIELD: field}
+        try:
+            connection_args = get_connection_args(
+                kwargs.get("after"),
+                kwargs.get("before"),
+                kwargs.get("first"),
+                kwargs.get("last"),
+            )
+        except ValueError:
+            # the resolver fails with the same error, within the span
+            return attributes
+        if isinstance(connection_args, ConnectionArguments):
+            window = connection_args.window
+            attributes[WINDOW_OFFSET] = window.offset
+            if window.limit is not None:
+                attributes[WINDOW_LIMIT] = window.limit
+        return attributes
+
+    def set_edges(span: Span, connection: Any) -> None:
+        edges = getattr(connection, "edges", None)
+        if edges is not None:
+            span.set_attribute(EDGES, len(edges))
+
+    if is_coroutine_callable(resolve):
+
+        async def resolve_traced(obj: Any, info: Any, **kwargs: Any) -> Any:
+            with tracer.start_as_current_span(
+                CONNECTION_SPAN, attributes=get_attributes(kwargs)
+            ) as span:
+                connection = await resolve(obj, info, **kwargs)
+                set_edges(span, connection)
+                return connection
+
+        return resolve_traced
+
+    async def finish_traced(
+        connection: Any,
+        span: Span,
+        span_context: ContextManager[Span],
+        context: Context,
+    ) -> Any:
+        try:
+            connection = await _ContextAwaitable(connection, context)
+        except BaseException:
+            context.run(span_context.__exit__, *sys.exc_info())
+            raise
+        set_edges(span, connection)
+        context.run(span_context.__exit__, None, None, None)
+        return connection
+
+    def resolve_traced_sync(obj: Any, info: Any, **kwargs: Any) -> Any:
+        # the span is entered in a context of its own, so that it can stay
+        # open while the executor awaits the connection, without becoming
+        # the parent of the fields that are resolved in the meantime
+        context = copy_context()
+        span_context = tracer.start_as_current_span(
+            CONNECTION_SPAN, attributes=get_attributes(kwargs)
+        )
+        span = context.run(span_context.__enter__)
+        try:
+            connection = context.run(resolve, obj, info, **kwargs)
+        except BaseException:
+            context.run(span_context.__exit__, *sys.exc_info())
+            raise
+        if isawaitable(connection):
+            return finish_traced(connection, span, span_context, context)
+        set_edges(span, connection)
+        context.run(span_context.__exit__, None, None, None)
+        return connection
+
+    return resolve_traced_sync
+
+
+class _ContextAwaitable:
+    """Awaits an awaitable with each of its steps run in `context`."""
+
+    def __init__(self, awaitable: Awaitable[Any], context: Context) -> None:
+        self._awaitable = awaitable
+        self._context = context
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        iterator = self._context.run(self._awaitable.__await__)
+        send: Callable[[Any], Any] = iterator.send
+        value = None
+        while True:
+            try:
+                yielded = self._context.run(send, value)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                value = yield yielded
+            except BaseException as exception:
+                send, value = iterator.throw, exception
+            else:
+                send = iterator.send
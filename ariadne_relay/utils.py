@@ -1,5 +1,8 @@
 import asyncio
-from typing import Any, Callable, Optional
+from inspect import Parameter, signature
+from typing import Any, Callable, Hashable, Mapping, Optional
+
+from graphql import GraphQLNamedType
 
 
 def is_coroutine_callable(obj: Optional[Callable[..., Any]]) -> bool:
@@ -12,3 +15,39 @@ def is_coroutine_callable(obj: Optional[Callable[..., Any]]) -> bool:
     ):
         return True
     return False
+
+
+def accepts_keyword(obj: Callable[..., Any], name: str) -> bool:
+    try:
+        parameter = signature(obj).parameters.get(name)
+    except (TypeError, ValueError):
+        return False
+    return parameter is not None and parameter.kind in (
+        Parameter.POSITIONAL_OR_KEYWORD,
+        Parameter.KEYWORD_ONLY,
+    )
+
+
+def freeze(value: Any) -> Hashable:
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value  # type: ignore[no-any-return]
+
+
+def get_extension(graphql_type: GraphQLNamedType, name: str) -> Any:
+    if not isinstance(graphql_type.extensions, dict):
+        return None
+    return graphql_type.extensions.get(name)
+
+
+def set_extension(
+    graphql_type: GraphQLNamedType,
+    name: str,
+    value: Any,
+    replace_existing: bool,
+) -> None:
+    graphql_type.extensions = graphql_type.extensions or {}
+    if name not in graphql_type.extensions or replace_existing:
+        graphql_type.extensions[name] = value
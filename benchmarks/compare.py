@@ -0,0 +1,72 @@
+"""Compare two runs of the benchmark suite, and flag the regressions.
+
+Runs are recorded with `pytest benchmarks --benchmark-json=<path>`.  The
+median time of each benchmark in the new run is compared to the one in the
+baseline run, and the command fails if any of them is slower by more than
+the threshold.
+
+Run with `python benchmarks/compare.py baseline.json new.json`.
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+
+def load_medians(path: str) -> Dict[str, float]:
+    with open(path) as file:
+        report = json.load(file)
+    return {
+        benchmark["fullname"]: benchmark["stats"]["median"]
+        for benchmark in report["benchmarks"]
+    }
+
+
+def compare(
+    baseline: Dict[str, float], current: Dict[str, float], threshold: float
+) -> List[str]:
+    """Prints the ratio of each benchmark, and returns the regressed ones."""
+    regressions = []
+    width = max(map(len, current), default=0)
+    for name, median in sorted(current.items()):
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<{width}}  {median * 1e6:12.2f} us  (new)")
+            continue
+        ratio = median / base
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<{width}}  {median * 1e6:12.2f} us  {ratio:6.2f}x{flag}")
+    for name in sorted(baseline.keys() - current.keys()):
+        print(f"{name:<{width}}  (missing)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline", help="JSON report of the baseline run")
+    parser.add_argument("current", help="JSON report of the run to check")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="slowdown ratio above which a benchmark regressed (default: 0.1)",
+    )
+    args = parser.parse_args(argv)
+    regressions = compare(
+        load_medians(args.baseline), load_medians(args.current), args.threshold
+    )
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) regressed by more than "
+            f"{args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,15 @@
+from graphql import GraphQLSchema
+import pytest
+from tests import conftest
+
+from .schema import create_nested_schema
+
+# the fixtures of the test suite, which the benchmarks share
+node_query = conftest.node_query
+nodes_query = conftest.nodes_query
+type_defs = conftest.type_defs
+
+
+@pytest.fixture
+def nested_schema(type_defs: str) -> GraphQLSchema:
+    return create_nested_schema(type_defs)
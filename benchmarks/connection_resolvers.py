@@ -0,0 +1,184 @@
+"""Compare the connection resolvers with and without cached arguments.
+
+The resolvers of fields without pagination arguments build the connection
+arguments once, when the schema is bound.  Without the cache they build
+them at each call, as for paginated fields, whose resolvers are the same
+in both runs.  Each query resolves a connection on many parents, and the
+mean and standard deviation over the repeated runs are reported.
+
+Run with `python -m benchmarks.connection_resolvers --parents 5000`.
+"""
+
+import argparse
+import asyncio
+from inspect import isawaitable
+import statistics
+import time
+import timeit
+from typing import Any, List, Optional, Sequence, Tuple
+
+from ariadne import make_executable_schema
+from graphql import graphql, graphql_sync, GraphQLResolveInfo, GraphQLSchema
+
+from ariadne_relay import ReferenceConnection, RelayObjectType, RelayQueryType
+from ariadne_relay.base import (
+    CONNECTION_EXTENSION,
+    create_configured_connection_resolver,
+)
+
+PARENTS = 1000
+ITEMS = 3
+REPEAT = 10
+
+TYPE_DEFS = """
+    type Query {
+        groups: [Group!]!
+    }
+
+    type Group {
+        id: Int!
+        items(after: String, before: String, first: Int, last: Int): ItemConnection!
+        allItems: ItemConnection!
+    }
+
+    type PageInfo {
+        hasNextPage: Boolean!
+        hasPreviousPage: Boolean!
+        startCursor: String
+        endCursor: String
+    }
+
+    type ItemEdge {
+        cursor: String!
+        node: Int!
+    }
+
+    type ItemConnection {
+        edges: [ItemEdge!]!
+        pageInfo: PageInfo!
+    }
+"""
+
+QUERIES = {
+    "paginated": "{ groups { items(first: 2) { edges { node } } } }",
+    "unpaginated": "{ groups { allItems { edges { node } } } }",
+}
+
+
+def create_schema(
+    async_resolver: bool, cache_arguments: bool, parents: int
+) -> GraphQLSchema:
+    items = list(range(ITEMS))
+
+    def resolve_items(*_: Any) -> List[int]:
+        return items
+
+    async def resolve_items_async(*_: Any) -> List[int]:
+        return items
+
+    resolver = resolve_items_async if async_resolver else resolve_items
+    query_type = RelayQueryType()
+    query_type.set_field("groups", lambda *_: list(range(parents)))
+    group_type = RelayObjectType("Group")
+    group_type.set_field("id", lambda obj, *_: obj)
+    for field_name in ("items", "allItems"):
+        group_type.set_connection(field_name, resolver, factory=ReferenceConnection())
+    schema = make_executable_schema(TYPE_DEFS, query_type, group_type)
+    if not cache_arguments:
+        field = schema.get_type("Group").fields["allItems"]  # type: ignore
+        field.resolve = create_configured_connection_resolver(
+            field.extensions[CONNECTION_EXTENSION], paginated=True
+        )
+    return schema
+
+
+def summarize(samples: Sequence[float]) -> Tuple[float, float]:
+    return statistics.mean(samples), statistics.stdev(samples)
+
+
+def measure(
+    schema: GraphQLSchema, query: str, is_async: bool, repeat: int
+) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if is_async:
+            result = asyncio.run(graphql(schema, query))
+        else:
+            result = graphql_sync(schema, query)
+        samples.append(time.perf_counter() - start)
+        assert result.errors is None, result.errors
+    return samples
+
+
+def capture_info(schema: GraphQLSchema, query: str, field_name: str) -> Any:
+    fields = schema.get_type("Group").fields  # type: ignore[union-attr]
+    resolve = fields[field_name].resolve
+    captured: List[GraphQLResolveInfo] = []
+
+    def capture(obj: Any, info: GraphQLResolveInfo, **kwargs: Any) -> Any:
+        captured.append(info)
+        return resolve(obj, info, **kwargs)
+
+    fields[field_name].resolve = capture
+    try:
+        asyncio.run(graphql(schema, query))
+    finally:
+        fields[field_name].resolve = resolve
+    return captured[0]
+
+
+def measure_call(
+    schema: GraphQLSchema, query: str, field_name: str, repeat: int
+) -> List[float]:
+    resolve = schema.get_type("Group").fields[field_name].resolve  # type: ignore
+    info = capture_info(schema, query, field_name)
+    kwargs = {"first": 2} if field_name == "items" else {}
+
+    def call() -> Any:
+        result = resolve(0, info, **kwargs)
+        if isawaitable(result):
+            # drive the coroutine without scheduling it on the loop
+            try:
+                result.send(None)  # type: ignore[attr-defined]
+            except StopIteration as stop:
+                return stop.value
+        return result
+
+    timer = timeit.Timer(call)
+    number, _ = timer.autorange()
+    return [time / number for time in timer.repeat(repeat=repeat, number=number)]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parents", type=int, default=PARENTS)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = parser.parse_args(argv)
+    for async_resolver in (False, True):
+        resolver_kind = "async" if async_resolver else "sync"
+        for query_name, query in QUERIES.items():
+            field_name = "items" if query_name == "paginated" else "allItems"
+            print(
+                f"{resolver_kind} resolver, {query_name} field, "
+                f"{args.parents} parents"
+            )
+            for name, cache_arguments in (("uncached", False), ("cached", True)):
+                schema = create_schema(async_resolver, cache_arguments, args.parents)
+                field_mean, field_stdev = summarize(
+                    measure(schema, query, async_resolver, args.repeat)
+                )
+                call_mean, call_stdev = summarize(
+                    measure_call(schema, query, field_name, args.repeat)
+                )
+                print(
+                    f"  {name:<9} "
+                    f"{field_mean * 1e6 / args.parents:8.2f} "
+                    f"± {field_stdev * 1e6 / args.parents:5.2f} us/field  "
+                    f"{call_mean * 1e6:6.2f} ± {call_stdev * 1e6:4.2f} "
+                    "us/resolver call"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""Drive the Ariadne ASGI app with a mix of Relay queries, and report on it.
+
+The app serves the schema of the benchmarks, either in-process through the
+ASGI interface or under uvicorn on localhost.  Clients send node refetches,
+paginated connections and nested connections with the given concurrency,
+and the report gives the throughput, the latency percentiles, the lag of
+the event loop that runs the app and the peak RSS of the process.
+
+Run with `python -m benchmarks.load --concurrency 32 --requests 5000`.
+"""
+
+import argparse
+import asyncio
+from dataclasses import asdict, dataclass, field
+import json
+import random
+import resource
+import sys
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from ariadne.asgi import GraphQL
+from graphql_relay import offset_to_cursor, to_global_id
+import httpx
+
+from .schema import COLLECTION_SIZE, create_nested_schema
+
+LAG_INTERVAL = 0.01
+PERCENTILES = (50, 90, 99)
+
+
+class LoadQuery(NamedTuple):
+    query: str
+    create_variables: Callable[[random.Random], Dict[str, Any]]
+
+
+QUERIES: Dict[str, LoadQuery] = {
+    "node": LoadQuery(
+        "query($id: ID!) { node(id: $id) { __typename, id } }",
+        lambda rng: {"id": to_global_id("Foo", str(rng.randrange(COLLECTION_SIZE)))},
+    ),
+    "paginated": LoadQuery(
+        """
+        query($first: Int, $after: String) {
+            foos(first: $first, after: $after) {
+                edges { cursor, node { id } }
+                pageInfo { hasNextPage, endCursor }
+            }
+        }
+        """,
+        lambda rng: {
+            "first": 20,
+            "after": offset_to_cursor(rng.randrange(COLLECTION_SIZE)),
+        },
+    ),
+    "nested": LoadQuery(
+        """
+        query($first: Int) {
+            foos(first: $first) {
+                edges {
+                    node {
+                        id
+                        parent { id }
+                        children(first: $first) { edges { node { id } } }
+                    }
+                }
+            }
+        }
+        """,
+        lambda rng: {"first": 10},
+    ),
+}
+DEFAULT_MIX = {"node": 5, "paginated": 3, "nested": 2}
+
+
+@dataclass
+class LoadReport:
+    mode: str
+    concurrency: int
+    requests: int
+    errors: int
+    duration: float
+    throughput: float
+    latency: Dict[str, float]
+    latency_by_query: Dict[str, Dict[str, float]]
+    loop_lag: Dict[str, float]
+    peak_rss_mb: float
+    mix: Dict[str, int] = field(default_factory=dict)
+
+
+def percentile(samples: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of the samples, or 0 without samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, float]:
+    summary = {f"p{p}": percentile(samples, p) for p in PERCENTILES}
+    summary["max"] = max(samples, default=0.0)
+    return summary
+
+
+def get_peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up a sleeping task."""
+
+    def __init__(self, interval: float = LAG_INTERVAL) -> None:
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+
+class UvicornServer:
+    """Runs the app under uvicorn on localhost, with its own event loop."""
+
+    def __init__(self, app: GraphQL, host: str, port: int) -> None:
+        import uvicorn
+
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.monitor = LoopLagMonitor()
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),))
+
+    async def _serve(self) -> None:
+        self.monitor.start()
+        try:
+            await self.server.serve()
+        finally:
+            await self.monitor.stop()
+
+    def __enter__(self) -> "UvicornServer":
+        self._thread.start()
+        while not self.server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.should_exit = True
+        self._thread.join()
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in QUERIES:
+            raise ValueError(f"Unknown query: {name}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    *,
+    concurrency: int,
+    requests: int,
+    mix: Mapping[str, int],
+    seed: int,
+) -> Dict[str, Any]:
+    """Sends the requests from `concurrency` clients, and times each one."""
+    rng = random.Random(seed)
+    names = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+    pending = iter(names)
+    latencies: Dict[str, List[float]] = {name: [] for name in mix}
+    errors = 0
+
+    async def run_client() -> None:
+        nonlocal errors
+        for name in pending:
+            query, create_variables = QUERIES[name]
+            payload = {"query": query, "variables": create_variables(rng)}
+            start = time.perf_counter()
+            response = await client.post("/", json=payload)
+            latencies[name].append(time.perf_counter() - start)
+            if response.status_code != 200 or "errors" in response.json():
+                errors += 1
+            # in-process requests never wait on I/O, so the other clients
+            # would not get a turn otherwise
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client() for _ in range(concurrency)))
+    return {
+        "duration": time.perf_counter() - start,
+        "errors": errors,
+        "latencies": latencies,
+    }
+
+
+def create_report(
+    mode: str,
+    concurrency: int,
+    mix: Mapping[str, int],
+    results: Dict[str, Any],
+    lag_samples: Sequence[float],
+) -> LoadReport:
+    latencies = results["latencies"]
+    all_latencies = [latency for samples in latencies.values() for latency in samples]
+    duration = results["duration"]
+    return LoadReport(
+        mode=mode,
+        concurrency=concurrency,
+        requests=len(all_latencies),
+        errors=results["errors"],
+        duration=duration,
+        throughput=len(all_latencies) / duration if duration else 0.0,
+        latency=summarize(all_latencies),
+        latency_by_query={
+            name: summarize(samples) for name, samples in latencies.items() if samples
+        },
+        loop_lag=summarize(lag_samples),
+        peak_rss_mb=get_peak_rss_mb(),
+        mix=dict(mix),
+    )
+
+
+async def run_in_process(
+    app: GraphQL, *, concurrency: int, requests: int, mix: Mapping[str, int], seed: int
+) -> LoadReport:
+    """Calls the ASGI app directly, so the clients share its event loop."""
+    monitor = LoopLagMonitor()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://app") as client:
+        monitor.start()
+        try:
+            results = await drive(
+                client,
+                concurrency=concurrency,
+                requests=requests,
+                mix=mix,
+                seed=seed,
+            )
+        finally:
+            await monitor.stop()
+    return create_report("in-process", concurrency, mix, results, monitor.samples)
+
+
+def run_uvicorn(
+    app: GraphQL,
+    *,
+    concurrency: int,
+    requests: int,
+    mix: Mapping[str, int],
+    seed: int,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+) -> LoadReport:
+    """Serves the app under uvicorn, and sends the requests over TCP."""
+
+    async def run_clients() -> Dict[str, Any]:
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(
+            base_url=f"http://{host}:{port}", limits=limits
+        ) as client:
+            return await drive(
+                client,
+                concurrency=concurrency,
+                requests=requests,
+                mix=mix,
+                seed=seed,
+            )
+
+    with UvicornServer(app, host, port) as server:
+        results = asyncio.run(run_clients())
+    return create_report("uvicorn", concurrency, mix, results, server.monitor.samples)
+
+
+def format_report(report: LoadReport) -> str:
+    def format_latencies(latencies: Mapping[str, float]) -> str:
+        return "  ".join(
+            f"{name} {value * 1e3:8.2f} ms" for name, value in latencies.items()
+        )
+
+    lines = [
+        f"{report.mode}, concurrency {report.concurrency}, "
+        f"{report.requests} requests, {report.errors} errors",
+        f"throughput  {report.throughput:10.1f} requests/s",
+        f"latency     {format_latencies(report.latency)}",
+    ]
+    for name, latencies in report.latency_by_query.items():
+        lines.append(f"  {name:<9} {format_latencies(latencies)}")
+    lines.append(f"loop lag    {format_latencies(report.loop_lag)}")
+    lines.append(f"peak RSS    {report.peak_rss_mb:10.1f} MB")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--mode", choices=("in-process", "uvicorn"), default="in-process"
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=DEFAULT_MIX,
+        help="weights of the queries, such as node=5,paginated=3,nested=2",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--json", metavar="PATH", help="also write the report here")
+    args = parser.parse_args(argv)
+
+    app = GraphQL(create_nested_schema())
+    if args.mode == "uvicorn":
+        report = run_uvicorn(
+            app,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            mix=args.mix,
+            seed=args.seed,
+            host=args.host,
+            port=args.port,
+        )
+    else:
+        report = asyncio.run(
+            run_in_process(
+                app,
+                concurrency=args.concurrency,
+                requests=args.requests,
+                mix=args.mix,
+                seed=args.seed,
+            )
+        )
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(asdict(report), file, indent=2)
+    return 1 if report.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
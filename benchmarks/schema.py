@@ -0,0 +1,75 @@
+from typing import Any, Iterator, overload, Sequence, Union
+
+from ariadne import InterfaceType, make_executable_schema
+from graphql import GraphQLSchema
+from tests.conftest import Foo, TYPE_DEFS
+
+from ariadne_relay import (
+    NodeObjectType,
+    RelayQueryType,
+    resolve_node_query,
+    resolve_node_query_sync,
+    resolve_nodes_query_sync,
+)
+
+COLLECTION_SIZE = 1000
+
+NESTED_TYPE_DEFS = """
+    extend type Query {
+        asyncNode(id: ID!): Node
+    }
+
+    extend type Foo {
+        parent: Foo
+        children(
+            after: String
+            before: String
+            first: Int
+            last: Int
+        ): FoosConnection!
+    }
+"""
+
+
+class FooRange(Sequence[Foo]):
+    """A lazy collection of `Foo` nodes, so that large ones take no memory."""
+
+    def __init__(self, length: int) -> None:
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    @overload
+    def __getitem__(self, index: int) -> Foo: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[Foo]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [Foo(id=i) for i in range(*index.indices(self.length))]
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        return Foo(id=index)
+
+    def __iter__(self) -> Iterator[Foo]:
+        return (Foo(id=i) for i in range(self.length))
+
+
+def create_nested_schema(type_defs: str = TYPE_DEFS) -> GraphQLSchema:
+    """The test schema, with nested connections and parents on `Foo`."""
+    query_type = RelayQueryType()
+    query_type.set_field("node", resolve_node_query_sync)
+    query_type.set_field("asyncNode", resolve_node_query)
+    query_type.set_field("nodes", resolve_nodes_query_sync)
+    query_type.set_connection("foos", lambda *_: FooRange(COLLECTION_SIZE))
+    foo_type = NodeObjectType("Foo")
+    foo_type.set_instance_resolver(lambda id, *_: Foo(id=int(id)))  # noqa: A006
+    foo_type.set_field("parent", lambda obj, *_: Foo(id=obj.id + 1))
+    foo_type.set_connection("children", lambda *_: FooRange(COLLECTION_SIZE))
+    node_interface_type = InterfaceType("Node")
+    node_interface_type.set_type_resolver(lambda obj, *_: obj.__class__.__name__)
+    return make_executable_schema(
+        [type_defs, NESTED_TYPE_DEFS], query_type, foo_type, node_interface_type
+    )
@@ -0,0 +1,110 @@
+"""Compare the snake-case connection types against frozen dataclasses.
+
+Run with `python benchmarks/snake_case_types.py`.
+"""
+
+from dataclasses import dataclass
+import sys
+import timeit
+from typing import Any, Callable, List, Optional
+
+from graphql_relay import Edge as ReferenceEdge, offset_to_cursor
+
+from ariadne_relay.connection.snake_case import Connection, Edge, PageInfo
+
+PAGE_SIZE = 100
+
+
+@dataclass(frozen=True, init=False)
+class DataclassPageInfo:
+    start_cursor: Optional[str]
+    end_cursor: Optional[str]
+    has_previous_page: Optional[bool]
+    has_next_page: Optional[bool]
+
+    def __init__(
+        self,
+        *,
+        startCursor: Optional[str] = None,
+        endCursor: Optional[str] = None,
+        hasPreviousPage: Optional[bool] = None,
+        hasNextPage: Optional[bool] = None,
+    ) -> None:
+        object.__setattr__(self, "start_cursor", startCursor)
+        object.__setattr__(self, "end_cursor", endCursor)
+        object.__setattr__(self, "has_previous_page", hasPreviousPage)
+        object.__setattr__(self, "has_next_page", hasNextPage)
+
+
+@dataclass(frozen=True, init=False)
+class DataclassConnection:
+    edges: List[Any]
+    page_info: Any
+
+    def __init__(self, *, edges: List[Any], pageInfo: Any) -> None:
+        object.__setattr__(self, "edges", edges)
+        object.__setattr__(self, "page_info", pageInfo)
+
+
+@dataclass(frozen=True)
+class DataclassEdge:
+    node: Any
+    cursor: str
+
+
+def build_page(
+    connection_type: Callable[..., Any],
+    edge_type: Callable[..., Any],
+    page_info_type: Callable[..., Any],
+    cursors: List[str],
+) -> Any:
+    edges = [
+        edge_type(node=index, cursor=cursor) for index, cursor in enumerate(cursors)
+    ]
+    return connection_type(
+        edges=edges,
+        pageInfo=page_info_type(
+            startCursor=cursors[0],
+            endCursor=cursors[-1],
+            hasPreviousPage=False,
+            hasNextPage=True,
+        ),
+    )
+
+
+def deep_sizeof(page: Any) -> int:
+    objects = [page, page.edges, page.page_info, *page.edges]
+    size = 0
+    for obj in objects:
+        size += sys.getsizeof(obj)
+        if hasattr(obj, "__dict__"):
+            size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def main() -> None:
+    cursors = [offset_to_cursor(offset) for offset in range(PAGE_SIZE)]
+    variants = [
+        ("dataclass edges", DataclassConnection, DataclassEdge, DataclassPageInfo),
+        ("previous", DataclassConnection, ReferenceEdge, DataclassPageInfo),
+        ("tuple-backed", Connection, Edge, PageInfo),
+    ]
+    for page_cursors in (cursors[:1], cursors):
+        print(f"{len(page_cursors)}-edge page")
+        for name, connection_type, edge_type, page_info_type in variants:
+            timer = timeit.Timer(
+                lambda: build_page(
+                    connection_type, edge_type, page_info_type, page_cursors
+                )
+            )
+            number, _ = timer.autorange()
+            best = min(timer.repeat(repeat=5, number=number)) / number
+            page = build_page(connection_type, edge_type, page_info_type, page_cursors)
+            print(
+                f"  {name:<16} {best * 1e6:8.2f} us/page  "
+                f"{deep_sizeof(page):7d} bytes/page"
+            )
+
+
+if __name__ == "__main__":
+    main()
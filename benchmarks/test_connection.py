@@ -0,0 +1,72 @@
+from typing import Any, Callable, Dict
+
+from graphql import ExecutionResult, graphql_sync, GraphQLSchema
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from ariadne_relay import (
+    ConnectionArguments,
+    ReferenceConnection,
+    SnakeCaseConnection,
+)
+from .schema import FooRange
+
+FACTORIES: Dict[str, Callable[[], Any]] = {
+    "reference": ReferenceConnection,
+    "snake-case": SnakeCaseConnection,
+}
+PAGE_SIZES = [10, 100, 10_000]
+COLLECTION_SIZES = [1_000, 100_000, 10_000_000]
+
+
+@pytest.mark.parametrize("collection_size", COLLECTION_SIZES)
+@pytest.mark.parametrize("page_size", PAGE_SIZES)
+@pytest.mark.parametrize("factory_name", list(FACTORIES))
+def test_connection_page(
+    benchmark: BenchmarkFixture,
+    factory_name: str,
+    page_size: int,
+    collection_size: int,
+) -> None:
+    if page_size > collection_size:
+        pytest.skip("the page is larger than the collection")
+    factory = FACTORIES[factory_name]()
+    data = FooRange(collection_size)
+    # the page is taken from the middle of the collection
+    cursor = factory.cursor_codec.encode(collection_size // 2)
+    connection_args = ConnectionArguments(after=cursor, first=page_size)
+
+    connection = benchmark(factory, data, connection_args)
+    assert len(connection.edges) == min(page_size, collection_size // 2 - 1)
+
+
+@pytest.mark.parametrize("page_size", [10, 30])
+def test_nested_connections(
+    benchmark: BenchmarkFixture, nested_schema: GraphQLSchema, page_size: int
+) -> None:
+    query = """
+        query($first: Int) {
+            foos(first: $first) {
+                edges {
+                    node {
+                        id
+                        children(first: $first) {
+                            edges { cursor, node { id } }
+                            pageInfo { hasNextPage, endCursor }
+                        }
+                    }
+                }
+            }
+        }
+    """
+    variables = {"first": page_size}
+
+    def execute() -> ExecutionResult:
+        return graphql_sync(nested_schema, query, variable_values=variables)
+
+    result = benchmark(execute)
+    assert result.errors is None
+    assert result.data
+    edges = result.data["foos"]["edges"]
+    assert len(edges) == page_size
+    assert len(edges[-1]["node"]["children"]["edges"]) == page_size
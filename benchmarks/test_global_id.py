@@ -0,0 +1,39 @@
+from typing import Callable, Dict, List
+
+from graphql_relay import to_global_id
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from ariadne_relay import CompactGlobalIdCodec, GlobalIdCodec
+
+ID_COUNT = 1000
+
+CODECS: Dict[str, Callable[[], GlobalIdCodec]] = {
+    "cached": lambda: GlobalIdCodec(),
+    "uncached": lambda: GlobalIdCodec(cache_size=0),
+    "compact-uncached": lambda: CompactGlobalIdCodec({"Foo": 1}, cache_size=0),
+}
+
+
+@pytest.mark.parametrize("codec_name", list(CODECS))
+def test_encode_global_ids(benchmark: BenchmarkFixture, codec_name: str) -> None:
+    codec = CODECS[codec_name]()
+    node_ids = [str(i) for i in range(ID_COUNT)]
+
+    def encode() -> List[str]:
+        return [codec.encode("Foo", node_id) for node_id in node_ids]
+
+    assert len(benchmark(encode)) == ID_COUNT
+
+
+@pytest.mark.parametrize("codec_name", list(CODECS))
+def test_decode_global_ids(benchmark: BenchmarkFixture, codec_name: str) -> None:
+    codec = CODECS[codec_name]()
+    global_ids = [codec.encode("Foo", str(i)) for i in range(ID_COUNT)]
+    if not codec_name.startswith("compact"):
+        assert global_ids[1] == to_global_id("Foo", "1")
+
+    def decode() -> List[str]:
+        return [codec.decode(global_id).id for global_id in global_ids]
+
+    assert benchmark(decode)[-1] == str(ID_COUNT - 1)
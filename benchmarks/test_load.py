@@ -0,0 +1,27 @@
+from ariadne.asgi import GraphQL
+from graphql import GraphQLSchema
+import pytest
+
+from .load import DEFAULT_MIX, parse_mix, percentile, run_in_process
+
+
+@pytest.mark.asyncio
+async def test_load_in_process(nested_schema: GraphQLSchema) -> None:
+    report = await run_in_process(
+        GraphQL(nested_schema), concurrency=4, requests=40, mix=DEFAULT_MIX, seed=1
+    )
+    assert report.requests == 40
+    assert report.errors == 0
+    assert report.throughput > 0
+    assert set(report.latency_by_query) == set(DEFAULT_MIX)
+    assert 0 < report.latency["p50"] <= report.latency["p99"] <= report.latency["max"]
+    assert report.peak_rss_mb > 0
+
+
+def test_load_helpers() -> None:
+    assert percentile([], 50) == 0
+    assert percentile([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+    assert percentile([3.0, 1.0, 2.0, 4.0], 99) == 4.0
+    assert parse_mix("node=2,nested") == {"node": 2, "nested": 1}
+    with pytest.raises(ValueError):
+        parse_mix("unknown=1")
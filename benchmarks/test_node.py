@@ -0,0 +1,75 @@
+import asyncio
+from typing import Any, Dict
+
+from graphql import ExecutionResult, graphql, graphql_sync, GraphQLSchema
+from graphql_relay import to_global_id
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+NODE_COUNT = 100
+GRAPH_DEPTH = 20
+
+
+def test_node_query_sync(
+    benchmark: BenchmarkFixture, nested_schema: GraphQLSchema, node_query: str
+) -> None:
+    variables = {"id": to_global_id("Foo", "1")}
+
+    def execute() -> ExecutionResult:
+        return graphql_sync(nested_schema, node_query, variable_values=variables)
+
+    result = benchmark(execute)
+    assert result.errors is None
+
+
+def test_node_query_async(
+    benchmark: BenchmarkFixture, nested_schema: GraphQLSchema
+) -> None:
+    query = "query($id: ID!) { asyncNode(id: $id) { __typename, id } }"
+    variables = {"id": to_global_id("Foo", "1")}
+    loop = asyncio.new_event_loop()
+
+    def execute() -> ExecutionResult:
+        return loop.run_until_complete(
+            graphql(nested_schema, query, variable_values=variables)
+        )
+
+    try:
+        result = benchmark(execute)
+    finally:
+        loop.close()
+    assert result.errors is None
+
+
+def test_nodes_query(
+    benchmark: BenchmarkFixture, nested_schema: GraphQLSchema, nodes_query: str
+) -> None:
+    variables = {"ids": [to_global_id("Foo", str(i)) for i in range(NODE_COUNT)]}
+
+    def execute() -> ExecutionResult:
+        return graphql_sync(nested_schema, nodes_query, variable_values=variables)
+
+    result = benchmark(execute)
+    assert result.errors is None
+    assert result.data and len(result.data["nodes"]) == NODE_COUNT
+
+
+@pytest.mark.parametrize("depth", [5, GRAPH_DEPTH])
+def test_deep_node_graph(
+    benchmark: BenchmarkFixture, nested_schema: GraphQLSchema, depth: int
+) -> None:
+    selection = "id"
+    for _ in range(depth):
+        selection = f"id parent {{ {selection} }}"
+    query = f"query($id: ID!) {{ node(id: $id) {{ ... on Foo {{ {selection} }} }} }}"
+    variables = {"id": to_global_id("Foo", "1")}
+
+    def execute() -> ExecutionResult:
+        return graphql_sync(nested_schema, query, variable_values=variables)
+
+    result = benchmark(execute)
+    assert result.errors is None
+    node: Dict[str, Any] = result.data["node"] if result.data else {}
+    for _ in range(depth):
+        node = node["parent"]
+    assert node["id"] == to_global_id("Foo", str(depth + 1))
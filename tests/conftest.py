@@ -5,7 +5,11 @@ from ariadne import InterfaceType, make_executable_schema, ObjectType
 from graphql import GraphQLSchema
 import pytest
 
-from ariadne_relay import RelayQueryType, resolve_node_query_sync
+from ariadne_relay import (
+    RelayQueryType,
+    resolve_node_query_sync,
+    resolve_nodes_query_sync,
+)
 from ariadne_relay.node import NodeInterfaceType, NodeObjectType
 
 
@@ -19,72 +23,89 @@ class Qux:
     id: int  # noqa: A003
 
 
-@pytest.fixture
-def type_defs() -> str:
-    return """
-        type Query {
-            node(id: ID!): Node
-            foos(
-                after: String
-                before: String
-                first: Int
-                last: Int
-            ): FoosConnection!
-            quxes(
-                after: String
-                before: String
-                first: Int
-                last: Int
-            ): QuxesConnection!
-        }
-
-        interface Node {
-            id: ID!
-        }
-
-        type PageInfo {
-            hasNextPage: Boolean!
-            hasPreviousPage: Boolean!
-            startCursor: String
-            endCursor: String
-        }
-
-        type Foo implements Node {
-            id: ID!
-        }
+TYPE_DEFS = """
+    type Query {
+        node(id: ID!): Node
+        nodes(ids: [ID!]!): [Node]!
+        foos(
+            after: String
+            before: String
+            first: Int
+            last: Int
+        ): FoosConnection!
+        quxes(
+            after: String
+            before: String
+            first: Int
+            last: Int
+        ): QuxesConnection!
+    }
+
+    interface Node {
+        id: ID!
+    }
+
+    type PageInfo {
+        hasNextPage: Boolean!
+        hasPreviousPage: Boolean!
+        startCursor: String
+        endCursor: String
+    }
+
+    type Foo implements Node {
+        id: ID!
+    }
+
+    type FooEdge {
+        cursor: String!
+        node: Foo
+    }
+
+    type FoosConnection {
+        pageInfo: PageInfo!
+        edges: [FooEdge]!
+    }
+
+    type Bar {
+        id: String!
+    }
+
+    interface Baz {
+        id: ID!
+    }
+
+    type Qux implements Node & Baz {
+        id: ID!
+    }
+
+    type QuxEdge {
+        cursor: String!
+        node: Qux
+    }
+
+    type QuxesConnection {
+        pageInfo: PageInfo!
+        edges: [QuxEdge]!
+    }
+"""
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
 
-        type FooEdge {
-            cursor: String!
-            node: Foo
-        }
 
-        type FoosConnection {
-            pageInfo: PageInfo!
-            edges: [FooEdge]!
-        }
-
-        type Bar {
-            id: String!
-        }
-
-        interface Baz {
-            id: ID!
-        }
-
-        type Qux implements Node & Baz {
-            id: ID!
-        }
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
 
-        type QuxEdge {
-            cursor: String!
-            node: Qux
-        }
 
-        type QuxesConnection {
-            pageInfo: PageInfo!
-            edges: [QuxEdge]!
-        }
-    """
+@pytest.fixture
+def type_defs() -> str:
+    return TYPE_DEFS
 
 
 @pytest.fixture
@@ -101,6 +122,7 @@ def qux_nodes() -> Dict[str, Qux]:
 def query_type(foo_nodes: Dict[str, Foo], qux_nodes: Dict[str, Qux]) -> RelayQueryType:
     query_type = RelayQueryType()
     query_type.set_field("node", resolve_node_query_sync)
+    query_type.set_field("nodes", resolve_nodes_query_sync)
     query_type.set_connection("foos", lambda *_: list(foo_nodes.values()))
     query_type.set_connection("quxes", lambda *_: list(qux_nodes.values()))
     return query_type
@@ -167,6 +189,11 @@ def node_query() -> str:
     return "query($id: ID!) { node(id: $id) { __typename, id } }"
 
 
+@pytest.fixture
+def nodes_query() -> str:
+    return "query($ids: [ID!]!) { nodes(ids: $ids) { __typename, id } }"
+
+
 @pytest.fixture
 def foo_connection_query() -> str:
     return """
@@ -0,0 +1,203 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from ariadne import InterfaceType, make_executable_schema
+from graphql import graphql, graphql_sync, GraphQLSchema
+from graphql_relay import to_global_id
+import pytest
+
+from ariadne_relay import (
+    NodeCache,
+    NodeObjectType,
+    RelayQueryType,
+    resolve_node_query,
+)
+from .conftest import FakeClock, Foo
+
+
+@pytest.fixture
+def fetched() -> List[Any]:
+    return []
+
+
+def create_schema(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    foo_nodes: Dict[str, Foo],
+    fetched: List[Any],
+    cache: NodeCache,
+) -> GraphQLSchema:
+    def resolve_foos(node_ids: List[int], *_: Any) -> List[Optional[Foo]]:
+        fetched.extend(node_ids)
+        return [foo_nodes.get(str(node_id)) for node_id in node_ids]
+
+    foo_type = NodeObjectType(
+        "Foo",
+        aliases=["LegacyFoo"],
+        batch_instance_resolver=resolve_foos,
+        cache=cache,
+        id_type=int,
+    )
+    return make_executable_schema(type_defs, query_type, node_interface_type, foo_type)
+
+
+def test_node_cache_hits(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    foo_nodes: Dict[str, Foo],
+    fetched: List[Any],
+    nodes_query: str,
+    clock: FakeClock,
+) -> None:
+    cache = NodeCache(ttl=10, clock=clock)
+    schema = create_schema(
+        type_defs, query_type, node_interface_type, foo_nodes, fetched, cache
+    )
+    global_ids = [to_global_id("Foo", i) for i in (1, 2, 99)]
+    for _ in range(3):
+        result = graphql_sync(schema, nodes_query, variable_values={"ids": global_ids})
+        assert result.errors is None
+        assert result.data == {
+            "nodes": [
+                {"__typename": "Foo", "id": global_ids[0]},
+                {"__typename": "Foo", "id": global_ids[1]},
+                None,
+            ]
+        }
+    # misses are not cached without a negative_ttl
+    assert fetched == [1, 2, 99, 99, 99]
+    assert cache.stats() == (4, 5, 0, 2)
+
+    clock.now = 11
+    graphql_sync(schema, nodes_query, variable_values={"ids": global_ids[:1]})
+    assert fetched[-1:] == [1]
+
+
+def test_node_cache_negative_ttl_and_eviction(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    foo_nodes: Dict[str, Foo],
+    fetched: List[Any],
+    nodes_query: str,
+    clock: FakeClock,
+) -> None:
+    cache = NodeCache(max_entries=2, negative_ttl=5, clock=clock)
+    schema = create_schema(
+        type_defs, query_type, node_interface_type, foo_nodes, fetched, cache
+    )
+    global_ids = [to_global_id("Foo", i) for i in (99, 1, 2)]
+    graphql_sync(schema, nodes_query, variable_values={"ids": global_ids})
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.size == 2
+    graphql_sync(schema, nodes_query, variable_values={"ids": global_ids[1:]})
+    assert fetched == [99, 1, 2]
+
+    graphql_sync(schema, nodes_query, variable_values={"ids": global_ids[:1]})
+    assert fetched == [99, 1, 2, 99]
+    graphql_sync(schema, nodes_query, variable_values={"ids": global_ids[:1]})
+    assert fetched == [99, 1, 2, 99]
+    clock.now = 6
+    graphql_sync(schema, nodes_query, variable_values={"ids": global_ids[:1]})
+    assert fetched == [99, 1, 2, 99, 99]
+
+
+def test_node_cache_invalidation(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    foo_nodes: Dict[str, Foo],
+    fetched: List[Any],
+    node_query: str,
+) -> None:
+    cache = NodeCache()
+    schema = create_schema(
+        type_defs, query_type, node_interface_type, foo_nodes, fetched, cache
+    )
+    for i in (1, 2, 3):
+        graphql_sync(schema, node_query, variable_values={"id": to_global_id("Foo", i)})
+    assert cache.stats().size == 3
+
+    cache.invalidate(to_global_id("Foo", 1))
+    cache.invalidate(to_global_id("LegacyFoo", 2))
+    cache.invalidate(to_global_id("Foo", "invalid"))
+    assert cache.stats().size == 1
+    cache.invalidate_type("Foo")
+    assert cache.stats().size == 0
+
+
+@pytest.mark.asyncio
+async def test_node_cache_single_flight(
+    type_defs: str,
+    node_interface_type: InterfaceType,
+    foo_nodes: Dict[str, Foo],
+    fetched: List[Any],
+    node_query: str,
+) -> None:
+    async def resolve_foo(node_id: str, *_: Any) -> Foo:
+        fetched.append(node_id)
+        await asyncio.sleep(0.01)
+        return foo_nodes[node_id]
+
+    query_type = RelayQueryType()
+    query_type.set_field("node", resolve_node_query)
+    cache = NodeCache()
+    foo_type = NodeObjectType("Foo", instance_resolver=resolve_foo, cache=cache)
+    schema = make_executable_schema(
+        type_defs, query_type, node_interface_type, foo_type
+    )
+    global_id = to_global_id("Foo", 1)
+    results = await asyncio.gather(
+        *(
+            graphql(
+                schema,
+                node_query,
+                context_value={},
+                variable_values={"id": global_id},
+            )
+            for _ in range(5)
+        )
+    )
+    for result in results:
+        assert result.errors is None
+        assert result.data == {"node": {"__typename": "Foo", "id": global_id}}
+    assert fetched == ["1"]
+    assert cache.stats().misses == 5
+
+
+@pytest.mark.asyncio
+async def test_node_cache_invalidation_during_load() -> None:
+    cache = NodeCache()
+    fetched: List[List[Any]] = []
+    release = asyncio.Event()
+
+    async def fetch(node_ids: List[Any]) -> List[Any]:
+        fetched.append(node_ids)
+        version = len(fetched)
+        await release.wait()
+        return [f"{node_id}@{version}" for node_id in node_ids]
+
+    pending = asyncio.ensure_future(cache.load_many("Foo", ["1", "2"], fetch))
+    await asyncio.sleep(0)
+    cache.invalidate(to_global_id("Foo", "1"))
+    # a load after the invalidation does not share the pending fetch
+    reloaded = asyncio.ensure_future(cache.load_many("Foo", ["1"], fetch))
+    await asyncio.sleep(0)
+    release.set()
+    assert await pending == ["1@1", "2@1"]
+    assert await reloaded == ["1@2"]
+    assert fetched == [["1", "2"], ["1"]]
+    # the invalidated result of the pending fetch was not stored
+    assert cache.get("Foo", "1") == "1@2"
+    assert cache.get("Foo", "2") == "2@1"
+
+    release.clear()
+    pending = asyncio.ensure_future(cache.load_many("Foo", ["3"], fetch))
+    await asyncio.sleep(0)
+    cache.invalidate_type("Foo")
+    release.set()
+    assert await pending == ["3@3"]
+    assert cache.stats().size == 0
@@ -1,8 +1,46 @@
+import asyncio
+import copy
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, cast, Dict, List, Optional, Tuple
+from uuid import UUID
+
 from ariadne import make_executable_schema
-from graphql import graphql_sync
-from graphql_relay import offset_to_cursor, to_global_id
+from graphql import (
+    graphql,
+    graphql_sync,
+    GraphQLObjectType,
+    GraphQLResolveInfo,
+    GraphQLSchema,
+)
+from graphql_relay import (
+    Connection,
+    connection_from_array_slice,
+    offset_to_cursor,
+    to_global_id,
+)
+from graphql_relay.utils import base64
+import pytest
 
-from ariadne_relay import NodeObjectType, RelayQueryType
+from ariadne_relay import (
+    ConnectionArguments,
+    ConnectionData,
+    ConnectionSelection,
+    ConnectionSlice,
+    KeysetConnection,
+    KeysetConnectionArguments,
+    NodeObjectType,
+    PageSizePolicy,
+    ReferenceConnection,
+    RelayObjectType,
+    RelayQueryType,
+    set_default_page_size_policy,
+    SliceWindow,
+    SnakeCaseConnection,
+    StreamingConnection,
+    SyncStreamingConnection,
+)
+from ariadne_relay.connection import snake_case
 from .conftest import Foo
 
 
@@ -38,3 +76,1038 @@ def test_default_connection_factory(type_defs: str, foo_connection_query: str) -
             },
         },
     }
+
+
+@pytest.fixture
+def keyset_query_type(foo_nodes: Dict[str, Foo]) -> RelayQueryType:
+    rows = sorted(foo_nodes.values(), key=lambda foo: foo.id)
+
+    def resolve_foos(
+        obj: Any, info: GraphQLResolveInfo, args: KeysetConnectionArguments
+    ) -> List[Foo]:
+        info.context["args"] = args
+        selected = [
+            foo
+            for foo in rows
+            if (args.after_key is None or (foo.id,) > args.after_key)
+            and (args.before_key is None or (foo.id,) < args.before_key)
+        ]
+        if args.direction == "backward":
+            selected.reverse()
+        return selected[: args.limit]
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", resolve_foos, factory=KeysetConnection("id"))
+    return query_type
+
+
+@pytest.fixture
+def keyset_schema(
+    type_defs: str, keyset_query_type: RelayQueryType, foo_type: NodeObjectType
+) -> GraphQLSchema:
+    return make_executable_schema(type_defs, keyset_query_type, foo_type)
+
+
+def keyset_cursor(foo_id: int) -> str:
+    return base64(f"keyset:[{foo_id}]")
+
+
+CONNECTION_QUERY = """
+    query($after: String, $before: String, $first: Int, $last: Int) {
+        foos(after: $after, before: $before, first: $first, last: $last) {
+            edges { cursor, node { id } }
+            pageInfo { hasNextPage, hasPreviousPage, startCursor, endCursor }
+        }
+    }
+"""
+
+
+def test_keyset_connection_forward(keyset_schema: GraphQLSchema) -> None:
+    context: Dict[str, Any] = {}
+    result = graphql_sync(
+        keyset_schema,
+        CONNECTION_QUERY,
+        variable_values={"first": 3, "after": keyset_cursor(2)},
+        context_value=context,
+    )
+    assert result.errors is None
+    assert context["args"].after_key == (2,)
+    assert context["args"].direction == "forward"
+    assert context["args"].limit == 4
+    assert result.data == {
+        "foos": {
+            "edges": [
+                {"cursor": keyset_cursor(i), "node": {"id": to_global_id("Foo", i)}}
+                for i in (3, 4, 5)
+            ],
+            "pageInfo": {
+                "hasNextPage": True,
+                "hasPreviousPage": False,
+                "startCursor": keyset_cursor(3),
+                "endCursor": keyset_cursor(5),
+            },
+        },
+    }
+
+
+def test_keyset_connection_forward_last_page(keyset_schema: GraphQLSchema) -> None:
+    result = graphql_sync(
+        keyset_schema,
+        CONNECTION_QUERY,
+        variable_values={"first": 3, "after": keyset_cursor(6)},
+        context_value={},
+    )
+    assert result.errors is None
+    assert result.data
+    assert [edge["cursor"] for edge in result.data["foos"]["edges"]] == [
+        keyset_cursor(i) for i in (7, 8, 9)
+    ]
+    assert result.data["foos"]["pageInfo"]["hasNextPage"] is False
+
+
+def test_keyset_connection_backward(keyset_schema: GraphQLSchema) -> None:
+    context: Dict[str, Any] = {}
+    result = graphql_sync(
+        keyset_schema,
+        CONNECTION_QUERY,
+        variable_values={"last": 2, "before": keyset_cursor(5)},
+        context_value=context,
+    )
+    assert result.errors is None
+    assert context["args"].before_key == (5,)
+    assert context["args"].direction == "backward"
+    assert context["args"].limit == 3
+    assert result.data
+    assert [edge["cursor"] for edge in result.data["foos"]["edges"]] == [
+        keyset_cursor(i) for i in (3, 4)
+    ]
+    assert result.data["foos"]["pageInfo"] == {
+        "hasNextPage": False,
+        "hasPreviousPage": True,
+        "startCursor": keyset_cursor(3),
+        "endCursor": keyset_cursor(4),
+    }
+
+
+def test_keyset_connection_backward_first_page(keyset_schema: GraphQLSchema) -> None:
+    result = graphql_sync(
+        keyset_schema,
+        CONNECTION_QUERY,
+        variable_values={"last": 5, "before": keyset_cursor(3)},
+        context_value={},
+    )
+    assert result.errors is None
+    assert result.data
+    assert [edge["cursor"] for edge in result.data["foos"]["edges"]] == [
+        keyset_cursor(i) for i in (0, 1, 2)
+    ]
+    assert result.data["foos"]["pageInfo"]["hasPreviousPage"] is False
+
+
+def test_keyset_connection_invalid_cursor(keyset_schema: GraphQLSchema) -> None:
+    result = graphql_sync(
+        keyset_schema,
+        CONNECTION_QUERY,
+        variable_values={"first": 3, "after": offset_to_cursor(2)},
+        context_value={},
+    )
+    assert result.errors
+    assert result.errors[0].message.startswith("Invalid keyset cursor")
+
+
+def test_keyset_connection_compound_key() -> None:
+    factory = KeysetConnection(lambda row: (row["score"], row["id"]))
+    rows = [{"score": 1.5, "id": "a"}, {"score": 1.5, "id": "b"}]
+    connection = cast(Connection, factory(rows, ConnectionArguments(first=1)))
+    assert connection.pageInfo.hasNextPage is True
+    assert [edge.node for edge in connection.edges] == rows[:1]
+    assert factory.decode_cursor(connection.edges[0].cursor) == (1.5, "a")
+
+
+def test_keyset_connection_typed_key() -> None:
+    factory = KeysetConnection(lambda row: (row["created_at"], row["id"]))
+    created_at = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    rows = [
+        {"created_at": created_at, "id": UUID(int=1)},
+        {"created_at": created_at, "id": UUID(int=2)},
+    ]
+    connection = cast(Connection, factory(rows, ConnectionArguments(first=1)))
+    key = factory.decode_cursor(connection.edges[0].cursor)
+    assert key == (created_at, UUID(int=1))
+    assert [type(value) for value in key] == [datetime, UUID]
+    # the decoded key compares with the keys of the rows
+    assert key < factory.get_key(rows[1])
+    other_key = (date(2024, 5, 1), time(12, 30), Decimal("1.10"), None, 2)
+    assert factory.decode_cursor(factory.encode_cursor(other_key)) == other_key
+    # decimals keep their exponent
+    [amount] = factory.decode_cursor(factory.encode_cursor((Decimal("1.10"),)))
+    assert str(amount) == "1.10"
+    with pytest.raises(ValueError):
+        factory.decode_cursor(base64('keyset:[{"uuid":"invalid"}]'))
+
+
+class UncountedList(list):  # type: ignore[type-arg]
+    counted = False
+
+    def __len__(self) -> int:
+        UncountedList.counted = True
+        return super().__len__()
+
+
+@pytest.mark.parametrize(
+    "connection_args",
+    [
+        ConnectionArguments(first=3),
+        ConnectionArguments(first=3, after=offset_to_cursor(4)),
+        ConnectionArguments(first=3, after=offset_to_cursor(7)),
+        ConnectionArguments(first=5, last=2, after=offset_to_cursor(1)),
+        ConnectionArguments(last=3, before=offset_to_cursor(5)),
+        ConnectionArguments(last=3, before=offset_to_cursor(2)),
+        ConnectionArguments(after=offset_to_cursor(2), before=offset_to_cursor(6)),
+    ],
+)
+def test_count_free_connection(connection_args: ConnectionArguments) -> None:
+    data = UncountedList(range(10))
+    UncountedList.counted = False
+    factory = ReferenceConnection(count_free=True)
+    connection = factory(data, connection_args)
+    assert not UncountedList.counted
+    assert connection == connection_from_array_slice(
+        list(range(10)), connection_args._asdict()
+    )
+
+
+def test_count_free_connection_counts_last_without_before() -> None:
+    counts: List[int] = []
+    factory = ReferenceConnection(count_free=True, on_count=counts.append)
+    connection = cast(Connection, factory(list(range(10)), ConnectionArguments(last=3)))
+    assert counts == [10]
+    assert [edge.node for edge in connection.edges] == [7, 8, 9]
+    assert connection.pageInfo.hasPreviousPage is True
+
+
+@pytest.mark.parametrize(
+    "connection_args, window",
+    [
+        (ConnectionArguments(), SliceWindow(offset=0, limit=None)),
+        (ConnectionArguments(first=5), SliceWindow(offset=0, limit=6)),
+        (
+            ConnectionArguments(first=5, after=offset_to_cursor(3)),
+            SliceWindow(offset=4, limit=6),
+        ),
+        (
+            ConnectionArguments(first=5, before=offset_to_cursor(3)),
+            SliceWindow(offset=0, limit=3),
+        ),
+        (
+            ConnectionArguments(last=2, before=offset_to_cursor(6)),
+            SliceWindow(offset=0, limit=2, needs_total=True, before=6),
+        ),
+        (
+            ConnectionArguments(last=2),
+            SliceWindow(offset=0, limit=2, needs_total=True),
+        ),
+    ],
+)
+def test_slice_window(
+    connection_args: ConnectionArguments, window: SliceWindow
+) -> None:
+    assert connection_args.window == window
+
+
+def test_slice_window_with_total() -> None:
+    window = ConnectionArguments(last=3, after=offset_to_cursor(0)).window
+    assert window.with_total(10) == SliceWindow(offset=7, limit=3)
+    assert window.with_total(2) == SliceWindow(offset=1, limit=1)
+    window = ConnectionArguments(last=2, before=offset_to_cursor(8)).window
+    assert window.with_total(7) == SliceWindow(offset=5, limit=2)
+    assert window.with_total(10) == SliceWindow(offset=6, limit=2)
+
+
+BOUNDARY_ARGUMENTS = [
+    ConnectionArguments(first=0),
+    ConnectionArguments(last=0),
+    ConnectionArguments(first=3, after=offset_to_cursor(6)),
+    ConnectionArguments(first=3, after=offset_to_cursor(-1)),
+    ConnectionArguments(first=0, before=offset_to_cursor(-1)),
+    ConnectionArguments(first=3, before=offset_to_cursor(-1)),
+    ConnectionArguments(first=3, before=offset_to_cursor(0)),
+    ConnectionArguments(first=3, before=offset_to_cursor(7)),
+    ConnectionArguments(first=10, before=offset_to_cursor(8)),
+    ConnectionArguments(first=3, before="invalid"),
+    ConnectionArguments(last=2, before=offset_to_cursor(8)),
+    ConnectionArguments(last=2, before=offset_to_cursor(-1)),
+    ConnectionArguments(last=2, before=offset_to_cursor(1)),
+    ConnectionArguments(last=10, after=offset_to_cursor(-3)),
+    ConnectionArguments(last=3, after=offset_to_cursor(2)),
+    ConnectionArguments(after=offset_to_cursor(5), before=offset_to_cursor(3)),
+    ConnectionArguments(first=2, last=1, before=offset_to_cursor(9)),
+]
+
+
+def resolve_window(
+    data: List[int], connection_args: ConnectionArguments, counted: bool
+) -> ConnectionSlice:
+    window = connection_args.window
+    total = len(data) if counted or window.needs_total else None
+    if window.needs_total:
+        window = window.with_total(cast(int, total))
+    offset, limit = window[:2]
+    items = data[offset:] if limit is None else data[offset:][:limit]
+    return ConnectionSlice(items, offset, total)
+
+
+@pytest.mark.parametrize("connection_args", BOUNDARY_ARGUMENTS)
+def test_slice_window_boundaries(connection_args: ConnectionArguments) -> None:
+    data = list(range(7))
+    connection_slice = resolve_window(data, connection_args, counted=True)
+    connection = ReferenceConnection()(connection_slice, connection_args)
+    assert connection == connection_from_array_slice(data, connection_args._asdict())
+
+
+STALE_ARGUMENTS = [
+    ConnectionArguments(first=3, after=offset_to_cursor(9)),
+    ConnectionArguments(last=2, after=offset_to_cursor(9)),
+    ConnectionArguments(after=offset_to_cursor(9), before=offset_to_cursor(10)),
+]
+
+
+@pytest.mark.parametrize("connection_args", BOUNDARY_ARGUMENTS + STALE_ARGUMENTS)
+def test_count_free_connection_boundaries(
+    connection_args: ConnectionArguments,
+) -> None:
+    data = list(range(7))
+    counted = ReferenceConnection()(data, connection_args)
+    assert counted == connection_from_array_slice(data, connection_args._asdict())
+    assert ReferenceConnection(count_free=True)(data, connection_args) == counted
+    page_info = ConnectionSelection(
+        fields=frozenset(["pageInfo"]), page_info_fields=frozenset(["hasNextPage"])
+    )
+    connection = ReferenceConnection(count_free=True)(
+        data, connection_args, selection=page_info
+    )
+    assert connection.pageInfo.hasNextPage == counted.pageInfo.hasNextPage
+
+
+@pytest.mark.parametrize("connection_args", BOUNDARY_ARGUMENTS)
+def test_count_free_slice_window_boundaries(
+    connection_args: ConnectionArguments,
+) -> None:
+    data = list(range(7))
+    factory = ReferenceConnection()
+    connection_slice = resolve_window(data, connection_args, counted=False)
+    assert factory(connection_slice, connection_args) == factory(
+        resolve_window(data, connection_args, counted=True), connection_args
+    )
+
+
+@pytest.mark.parametrize("connection_args", BOUNDARY_ARGUMENTS)
+def test_streaming_connection_boundaries(
+    connection_args: ConnectionArguments,
+) -> None:
+    data = list(range(7))
+    connection = SyncStreamingConnection()(iter(data), connection_args)
+    assert connection == connection_from_array_slice(data, connection_args._asdict())
+
+
+def test_slice_window_after_end() -> None:
+    # the rows before a stale cursor are not fetched, so the page is empty
+    connection_args = ConnectionArguments(first=3, after=offset_to_cursor(9))
+    data = list(range(7))
+    connection_slice = resolve_window(data, connection_args, counted=True)
+    connection = cast(
+        Connection, ReferenceConnection()(connection_slice, connection_args)
+    )
+    assert connection.edges == []
+    assert connection.pageInfo.hasNextPage is False
+    assert connection.pageInfo.hasPreviousPage is False
+
+
+@pytest.mark.parametrize(
+    "variables",
+    [
+        {"first": 3},
+        {"first": 3, "after": offset_to_cursor(7)},
+        {"last": 3},
+        {"last": 3, "before": offset_to_cursor(4)},
+        {"after": offset_to_cursor(2), "before": offset_to_cursor(5)},
+    ],
+)
+def test_connection_slice(
+    type_defs: str, foo_type: NodeObjectType, variables: Dict[str, Any]
+) -> None:
+    test_nodes = [Foo(id=i) for i in range(10)]
+    fetched: List[int] = []
+
+    def resolve_foos(
+        obj: Any, info: GraphQLResolveInfo, connection_args: ConnectionArguments
+    ) -> ConnectionSlice:
+        window = connection_args.window
+        total = None
+        if window.needs_total:
+            total = len(test_nodes)
+            window = window.with_total(total)
+        offset, limit = window.offset, window.limit
+        items = test_nodes[offset:] if limit is None else test_nodes[offset:][:limit]
+        fetched.extend(foo.id for foo in items)
+        return ConnectionSlice(items, offset, total)
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", resolve_foos)
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    result = graphql_sync(schema, CONNECTION_QUERY, variable_values=variables)
+    assert result.errors is None
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", lambda *_: test_nodes)
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    assert result == graphql_sync(schema, CONNECTION_QUERY, variable_values=variables)
+    assert result.data
+    assert len(fetched) <= len(result.data["foos"]["edges"]) + 1
+
+
+@pytest.mark.asyncio
+async def test_streaming_connection(type_defs: str, foo_type: NodeObjectType) -> None:
+    pulled: List[int] = []
+    closed: List[bool] = []
+
+    async def resolve_foos(*_: Any) -> AsyncIterator[Foo]:
+        try:
+            for i in range(1000):
+                pulled.append(i)
+                yield Foo(id=i)
+        finally:
+            closed.append(True)
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", resolve_foos, factory=StreamingConnection)
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    result = await graphql(
+        schema,
+        CONNECTION_QUERY,
+        variable_values={"first": 3, "after": offset_to_cursor(4)},
+    )
+    assert result.errors is None
+    assert result.data
+    assert [edge["cursor"] for edge in result.data["foos"]["edges"]] == [
+        offset_to_cursor(i) for i in (5, 6, 7)
+    ]
+    assert result.data["foos"]["pageInfo"]["hasNextPage"] is True
+    assert pulled == list(range(9))
+    assert closed == [True]
+
+
+@pytest.mark.parametrize(
+    "connection_args",
+    [
+        ConnectionArguments(first=3, after=offset_to_cursor(7)),
+        ConnectionArguments(first=5, last=2),
+        ConnectionArguments(last=3),
+        ConnectionArguments(last=3, before=offset_to_cursor(4)),
+        ConnectionArguments(after=offset_to_cursor(2), before=offset_to_cursor(5)),
+    ],
+)
+def test_sync_streaming_connection(connection_args: ConnectionArguments) -> None:
+    factory = SyncStreamingConnection()
+    connection = factory((i for i in range(10)), connection_args)
+    assert connection == connection_from_array_slice(
+        list(range(10)), connection_args._asdict()
+    )
+
+
+def test_snake_case_connection(type_defs: str, foo_type: NodeObjectType) -> None:
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos", lambda *_: list(range(10)), factory=SnakeCaseConnection
+    )
+    schema = make_executable_schema(
+        type_defs, query_type, foo_type, convert_names_case=True
+    )
+    query = (
+        "{ foos(first: 2) { pageInfo { hasNextPage, endCursor }, edges { cursor } } }"
+    )
+    result = graphql_sync(schema, query)
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "pageInfo": {"hasNextPage": True, "endCursor": offset_to_cursor(1)},
+            "edges": [{"cursor": offset_to_cursor(i)} for i in range(2)],
+        }
+    }
+
+
+def test_snake_case_connection_types() -> None:
+    connection = SnakeCaseConnection()(list(range(10)), ConnectionArguments(first=2))
+    assert isinstance(connection, snake_case.Connection)
+    assert isinstance(connection.page_info, snake_case.PageInfo)
+    assert isinstance(connection.edges[0], snake_case.Edge)
+    assert connection.page_info.has_next_page is True
+    assert connection.edges[1].node == 1
+    assert copy.deepcopy(connection) == connection
+    assert not hasattr(connection.page_info, "__dict__")
+
+
+class RecordingList(list):  # type: ignore[type-arg]
+    def __init__(self, *args: Any) -> None:
+        super().__init__(*args)
+        self.slices: List[slice] = []
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, slice):
+            self.slices.append(key)
+        return super().__getitem__(key)
+
+
+@pytest.fixture
+def selection_query_type() -> RelayQueryType:
+    def resolve_foos(
+        obj: Any, info: GraphQLResolveInfo, connection_args: ConnectionArguments
+    ) -> RecordingList:
+        data = info.context["data"] = RecordingList(Foo(id=i) for i in range(10))
+        return data
+
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos",
+        resolve_foos,
+        factory=ReferenceConnection(count_free=True),
+        skip_resolver=True,
+    )
+    return query_type
+
+
+@pytest.fixture
+def selection_schema(
+    type_defs: str, selection_query_type: RelayQueryType, foo_type: NodeObjectType
+) -> GraphQLSchema:
+    return make_executable_schema(type_defs, selection_query_type, foo_type)
+
+
+def test_connection_selection(selection_schema: GraphQLSchema) -> None:
+    selections: List[ConnectionSelection] = []
+
+    def resolve_foos(parent: Any, info: GraphQLResolveInfo, **kwargs: Any) -> Any:
+        selections.append(ConnectionSelection.from_info(info))
+        return {"edges": [], "pageInfo": {"hasNextPage": False}}
+
+    query_type = cast(GraphQLObjectType, selection_schema.query_type)
+    query_type.fields["foos"].resolve = resolve_foos
+    query = """
+        {
+            foos {
+                ... on FoosConnection { pageInfo { hasNextPage } }
+                ...FooPageInfo
+            }
+        }
+        fragment FooPageInfo on FoosConnection {
+            pageInfo { ... on PageInfo { endCursor } }
+        }
+    """
+    result = graphql_sync(selection_schema, query)
+    assert result.errors is None
+    assert selections == [
+        ConnectionSelection(
+            fields=frozenset(["pageInfo"]),
+            page_info_fields=frozenset(["hasNextPage", "endCursor"]),
+        )
+    ]
+    assert not selections[0].needs_edges
+    assert selections[0].needs_cursors
+
+
+def test_connection_resolver_skipped_by_selection(
+    selection_schema: GraphQLSchema,
+) -> None:
+    context: Dict[str, Any] = {}
+    result = graphql_sync(
+        selection_schema,
+        "{ foos(last: 2) { pageInfo { hasNextPage } } }",
+        context_value=context,
+    )
+    assert result.errors is None
+    assert result.data == {"foos": {"pageInfo": {"hasNextPage": False}}}
+    assert "data" not in context
+
+
+def test_connection_resolver_called_by_default(
+    type_defs: str, foo_type: NodeObjectType
+) -> None:
+    calls: List[ConnectionArguments] = []
+
+    def resolve_foos(
+        obj: Any, info: GraphQLResolveInfo, connection_args: ConnectionArguments
+    ) -> List[Foo]:
+        calls.append(connection_args)
+        return [Foo(id=i) for i in range(10)]
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", resolve_foos)
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    result = graphql_sync(schema, "{ foos(last: 2) { pageInfo { hasNextPage } } }")
+    assert result.errors is None
+    assert result.data == {"foos": {"pageInfo": {"hasNextPage": False}}}
+    # the resolver may check permissions, so it is not skipped unless requested
+    assert len(calls) == 1
+
+
+def test_connection_page_info_probe(selection_schema: GraphQLSchema) -> None:
+    context: Dict[str, Any] = {}
+    result = graphql_sync(
+        selection_schema,
+        """{
+            foos(first: 3, after: "%s") { pageInfo { hasNextPage, hasPreviousPage } }
+        }""" % offset_to_cursor(6),
+        context_value=context,
+    )
+    assert result.errors is None
+    assert result.data == {
+        "foos": {"pageInfo": {"hasNextPage": False, "hasPreviousPage": False}}
+    }
+    assert context["data"].slices == [slice(10, 11)]
+
+
+def test_connection_edges_not_selected(selection_schema: GraphQLSchema) -> None:
+    result = graphql_sync(
+        selection_schema,
+        "{ foos(first: 3) { pageInfo { hasNextPage, startCursor, endCursor } } }",
+        context_value={},
+    )
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "pageInfo": {
+                "hasNextPage": True,
+                "startCursor": offset_to_cursor(0),
+                "endCursor": offset_to_cursor(2),
+            }
+        }
+    }
+
+
+def create_page_size_schema(
+    type_defs: str,
+    foo_type: NodeObjectType,
+    received: List[ConnectionArguments],
+    page_size: Optional[PageSizePolicy] = None,
+) -> GraphQLSchema:
+    test_nodes = [Foo(id=i) for i in range(100)]
+
+    def resolve_foos(
+        obj: Any, info: GraphQLResolveInfo, connection_args: ConnectionArguments
+    ) -> List[Foo]:
+        received.append(connection_args)
+        return test_nodes
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", resolve_foos, page_size=page_size)
+    return make_executable_schema(type_defs, query_type, foo_type)
+
+
+def test_page_size_policy_clamp(type_defs: str, foo_type: NodeObjectType) -> None:
+    received: List[ConnectionArguments] = []
+    policy = PageSizePolicy(default_first=5, max_first=20, max_last=10)
+    schema = create_page_size_schema(type_defs, foo_type, received, policy)
+    query = """
+        query($first: Int, $last: Int) {
+            foos(first: $first, last: $last) { edges { cursor } }
+        }
+    """
+    cases: List[Tuple[Dict[str, Any], int]] = [
+        ({}, 5),
+        ({"first": 50}, 20),
+        ({"last": 50}, 10),
+        ({"first": 3}, 3),
+    ]
+    for variables, expected_length in cases:
+        result = graphql_sync(schema, query, variable_values=variables)
+        assert result.errors is None
+        assert result.data
+        assert len(result.data["foos"]["edges"]) == expected_length
+    assert [(args.first, args.last) for args in received] == [
+        (5, None),
+        (20, None),
+        (None, 10),
+        (3, None),
+    ]
+
+
+def test_page_size_policy_reject(type_defs: str, foo_type: NodeObjectType) -> None:
+    received: List[ConnectionArguments] = []
+    policy = PageSizePolicy(max_first=20, mode="reject")
+    schema = create_page_size_schema(type_defs, foo_type, received, policy)
+    result = graphql_sync(schema, "{ foos(first: 21) { edges { cursor } } }")
+    assert result.errors
+    assert result.errors[0].message == "Argument 'first' must not exceed 20."
+    assert received == []
+    result = graphql_sync(schema, "{ foos { edges { cursor } } }")
+    assert result.errors is None
+    assert received == [ConnectionArguments(first=20)]
+
+
+def test_default_page_size_policy(type_defs: str, foo_type: NodeObjectType) -> None:
+    received: List[ConnectionArguments] = []
+    set_default_page_size_policy(PageSizePolicy(default_first=10))
+    try:
+        schema = create_page_size_schema(type_defs, foo_type, received)
+    finally:
+        set_default_page_size_policy(None)
+    result = graphql_sync(schema, "{ foos { edges { cursor } } }")
+    assert result.errors is None
+    assert received == [ConnectionArguments(first=10)]
+
+
+def test_page_size_policy_validation() -> None:
+    with pytest.raises(ValueError):
+        PageSizePolicy(mode="truncate")
+    with pytest.raises(ValueError):
+        PageSizePolicy(max_first=-1)
+    with pytest.raises(ValueError):
+        PageSizePolicy(default_first=50, max_first=20)
+
+
+BATCH_TYPE_DEFS = """
+    type Query {
+        groups: [Group!]!
+    }
+
+    type Group {
+        id: ID!
+        items(
+            after: String
+            before: String
+            first: Int
+            last: Int
+            minimum: Int
+        ): ItemsConnection!
+    }
+
+    type PageInfo {
+        hasNextPage: Boolean!
+        hasPreviousPage: Boolean!
+        startCursor: String
+        endCursor: String
+    }
+
+    type ItemEdge {
+        cursor: String!
+        node: Int
+    }
+
+    type ItemsConnection {
+        pageInfo: PageInfo!
+        edges: [ItemEdge]!
+    }
+"""
+
+BATCH_QUERY = """
+    {
+        groups {
+            id
+            items(first: 2) { edges { node } }
+            large: items(first: 1, minimum: 5) { edges { node } }
+        }
+    }
+"""
+
+BATCH_RESULT = {
+    "groups": [
+        {
+            "id": str(group_id),
+            "items": {"edges": [{"node": group_id * 10 + i} for i in range(2)]},
+            "large": {"edges": [{"node": group_id * 10 + 5}]},
+        }
+        for group_id in range(3)
+    ]
+}
+
+
+def create_batch_schema(
+    batches: List[Any], batch_resolver: Any = None
+) -> GraphQLSchema:
+    def resolve_items(
+        parents: List[Dict[str, int]],
+        info: GraphQLResolveInfo,
+        connection_args: List[ConnectionArguments],
+        minimum: int = 0,
+    ) -> List[List[int]]:
+        batches.append(([parent["id"] for parent in parents], connection_args))
+        return [
+            list(range(parent["id"] * 10 + minimum, parent["id"] * 10 + 10))
+            for parent in parents
+        ]
+
+    query_type = RelayQueryType()
+    query_type.set_field("groups", lambda *_: [{"id": i} for i in range(3)])
+    group_type = RelayObjectType("Group")
+    group_type.batch_connection("items")(batch_resolver or resolve_items)
+    return make_executable_schema(BATCH_TYPE_DEFS, query_type, group_type)
+
+
+@pytest.mark.asyncio
+async def test_batch_connection() -> None:
+    batches: List[Any] = []
+    schema = create_batch_schema(batches)
+    result = await graphql(schema, BATCH_QUERY)
+    assert result.errors is None
+    assert result.data == BATCH_RESULT
+    # sibling parents are batched, separately for each set of field arguments
+    assert batches == [
+        ([0, 1, 2], [ConnectionArguments(first=2)] * 3),
+        ([0, 1, 2], [ConnectionArguments(first=1)] * 3),
+    ]
+
+
+def test_batch_connection_sync() -> None:
+    batches: List[Any] = []
+    schema = create_batch_schema(batches)
+    result = graphql_sync(schema, BATCH_QUERY)
+    assert result.errors is None
+    assert result.data == BATCH_RESULT
+    assert len(batches) == 6
+
+
+@pytest.mark.asyncio
+async def test_batch_connection_sync_in_loop() -> None:
+    batches: List[Any] = []
+    schema = create_batch_schema(batches)
+    # graphql_sync() does not await the results, even with a running loop
+    result = graphql_sync(schema, BATCH_QUERY)
+    assert result.errors is None
+    assert result.data == BATCH_RESULT
+    assert len(batches) == 6
+
+
+def test_batch_connection_sync_async_resolver() -> None:
+    async def resolve_items(parents: List[Any], *_: Any, **__: Any) -> List[Any]:
+        return [[] for _ in parents]
+
+    schema = create_batch_schema([], resolve_items)
+    result = graphql_sync(schema, "{ groups { items { edges { node } } } }")
+    assert result.errors
+    assert {error.message for error in result.errors} == {
+        "Async batch connection resolvers can only be used by an async executor"
+    }
+
+
+class Context:
+    pass
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("create_context", [dict, Context])
+async def test_batch_connection_contexts(create_context: Callable[[], Any]) -> None:
+    batches: List[Any] = []
+    schema = create_batch_schema(batches)
+    results = await asyncio.gather(
+        graphql(schema, BATCH_QUERY, context_value=create_context()),
+        graphql(schema, BATCH_QUERY, context_value=create_context()),
+    )
+    for result in results:
+        assert result.errors is None
+        assert result.data == BATCH_RESULT
+    # each context gets its own batches
+    assert len(batches) == 4
+    assert all(parents == [0, 1, 2] for parents, _ in batches)
+
+
+@pytest.mark.asyncio
+async def test_batch_connection_result_mismatch() -> None:
+    schema = create_batch_schema([], lambda parents, *_, **__: [[]])
+    result = await graphql(schema, "{ groups { items { edges { node } } } }")
+    assert result.errors
+    assert {error.message for error in result.errors} == {
+        "Batch connection resolver returned 1 results for 3 parents"
+    }
+
+
+@pytest.mark.asyncio
+async def test_connection_data(type_defs: str, foo_type: NodeObjectType) -> None:
+    events: List[str] = []
+    counts: List[int] = []
+    test_nodes = [Foo(id=i) for i in range(10)]
+
+    async def fetch_items() -> List[Foo]:
+        events.append("items started")
+        await asyncio.sleep(0)
+        events.append("items done")
+        return test_nodes
+
+    async def fetch_total() -> int:
+        events.append("total started")
+        await asyncio.sleep(0)
+        events.append("total done")
+        return len(test_nodes)
+
+    def resolve_foos(*_: Any) -> ConnectionData:
+        return ConnectionData(fetch_items(), fetch_total())
+
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos", resolve_foos, factory=ReferenceConnection(on_count=counts.append)
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    result = await graphql(schema, CONNECTION_QUERY, variable_values={"last": 2})
+    assert result.errors is None
+    assert result.data
+    assert [edge["cursor"] for edge in result.data["foos"]["edges"]] == [
+        offset_to_cursor(8),
+        offset_to_cursor(9),
+    ]
+    assert events[:2] == ["items started", "total started"]
+    # the total is passed to the factory, so the data is not counted
+    assert counts == []
+
+
+@pytest.mark.asyncio
+async def test_connection_data_cancellation(
+    type_defs: str, foo_type: NodeObjectType
+) -> None:
+    cancelled: List[bool] = []
+
+    async def fetch_items() -> List[Foo]:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return []
+
+    async def fetch_total() -> int:
+        await asyncio.sleep(0)
+        raise ValueError("count failed")
+
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos", lambda *_: ConnectionData(fetch_items(), fetch_total())
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    result = await graphql(schema, CONNECTION_QUERY)
+    assert result.errors
+    assert result.errors[0].message == "count failed"
+    assert cancelled == [True]
+
+
+def test_connection_data_sync(type_defs: str, foo_type: NodeObjectType) -> None:
+    counts: List[int] = []
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos",
+        lambda *_: ConnectionData([Foo(id=i) for i in range(10)], 10),
+        factory=ReferenceConnection(on_count=counts.append),
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    result = graphql_sync(schema, CONNECTION_QUERY, variable_values={"first": 2})
+    assert result.errors is None
+    assert counts == []
+
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos",
+        lambda *_: ConnectionData(
+            ConnectionSlice([Foo(id=i) for i in range(4, 6)], 4), 10
+        ),
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    variables = {"last": 2, "before": offset_to_cursor(6)}
+    result = graphql_sync(schema, CONNECTION_QUERY, variable_values=variables)
+    assert result.errors is None
+    assert result.data
+    assert result.data["foos"]["pageInfo"] == {
+        "hasNextPage": False,
+        "hasPreviousPage": True,
+        "startCursor": offset_to_cursor(4),
+        "endCursor": offset_to_cursor(5),
+    }
+
+
+class AsyncReferenceConnection(ReferenceConnection):
+    async def __call__(self, *args: Any, **kwargs: Any) -> Any:  # type: ignore
+        return super().__call__(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("async_resolver", [False, True])
+@pytest.mark.parametrize("async_factory", [False, True])
+async def test_connection_resolver_variants(
+    type_defs: str, foo_type: NodeObjectType, async_resolver: bool, async_factory: bool
+) -> None:
+    test_nodes = [Foo(id=i) for i in range(5)]
+
+    def resolve_foos(*_: Any) -> List[Foo]:
+        return test_nodes
+
+    async def resolve_foos_async(*_: Any) -> List[Foo]:
+        return test_nodes
+
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos",
+        resolve_foos_async if async_resolver else resolve_foos,
+        factory=AsyncReferenceConnection() if async_factory else ReferenceConnection(),
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    result = await graphql(schema, CONNECTION_QUERY, variable_values={"first": 2})
+    assert result.errors is None
+    assert result.data
+    assert result.data["foos"]["edges"] == [
+        {"cursor": offset_to_cursor(i), "node": {"id": to_global_id("Foo", str(i))}}
+        for i in (0, 1)
+    ]
+    assert result.data["foos"]["pageInfo"]["hasNextPage"] is True
+
+
+def test_connection_without_pagination_arguments(foo_type: NodeObjectType) -> None:
+    type_defs = """
+        type Query {
+            foos: FoosConnection!
+        }
+
+        interface Node {
+            id: ID!
+        }
+
+        type PageInfo {
+            hasNextPage: Boolean!
+            hasPreviousPage: Boolean!
+            startCursor: String
+            endCursor: String
+        }
+
+        type Foo implements Node {
+            id: ID!
+        }
+
+        type FooEdge {
+            cursor: String!
+            node: Foo
+        }
+
+        type FoosConnection {
+            pageInfo: PageInfo!
+            edges: [FooEdge]!
+        }
+    """
+    received: List[ConnectionArguments] = []
+
+    def resolve_foos(obj: Any, info: Any, connection_args: Any) -> List[Foo]:
+        received.append(connection_args)
+        return [Foo(id=i) for i in range(5)]
+
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos", resolve_foos, page_size=PageSizePolicy(default_first=3)
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    query = "{ foos { edges { cursor }, pageInfo { hasNextPage } } }"
+    for _ in range(2):
+        result = graphql_sync(schema, query)
+        assert result.errors is None
+        assert result.data == {
+            "foos": {
+                "edges": [{"cursor": offset_to_cursor(i)} for i in range(3)],
+                "pageInfo": {"hasNextPage": True},
+            }
+        }
+    # the arguments are built once for the field, with the policy applied
+    assert received == [ConnectionArguments(first=3)] * 2
+    assert received[0] is received[1]
@@ -0,0 +1,185 @@
+import time
+from typing import Any, Dict
+
+from ariadne import graphql as ariadne_graphql, make_executable_schema
+from graphql import GraphQLSchema, parse, validate
+from graphql_relay import to_global_id
+import pytest
+
+from ariadne_relay import (
+    NodeObjectType,
+    PageSizePolicy,
+    QueryCostAnalysis,
+    QueryCostExtension,
+    RelayQueryType,
+)
+from .conftest import Foo
+
+NESTED_TYPE_DEFS = """
+    extend type Foo {
+        children(
+            after: String
+            before: String
+            first: Int
+            last: Int
+        ): FoosConnection!
+        bar: Bar
+    }
+"""
+
+NESTED_QUERY = """
+    query($first: Int) {
+        foos(first: $first) {
+            pageInfo { hasNextPage }
+            edges {
+                node {
+                    id
+                    children(first: $first) { edges { node { id } } }
+                }
+            }
+        }
+    }
+"""
+
+
+@pytest.fixture
+def cost_schema(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: Any,
+) -> GraphQLSchema:
+    foo_type = NodeObjectType("Foo")
+    foo_type.set_instance_resolver(lambda id, *_: Foo(id=int(id)))  # noqa: A006
+    foo_type.set_connection(
+        "children",
+        lambda *_: [Foo(id=i) for i in range(100)],
+        page_size=PageSizePolicy(default_first=5, max_first=20),
+    )
+    return make_executable_schema(
+        [type_defs, NESTED_TYPE_DEFS], query_type, foo_type, node_interface_type
+    )
+
+
+def measure(
+    schema: GraphQLSchema,
+    query: str,
+    variables: Dict[str, Any] = {},
+    **options: Any,
+) -> int:
+    return QueryCostAnalysis(**options).measure(schema, parse(query), variables)
+
+
+def test_nested_connection_cost(cost_schema: GraphQLSchema) -> None:
+    # foos, pageInfo, edges, then 10 nodes with a children connection and
+    # its edges, then 10 * 10 child nodes
+    assert measure(cost_schema, NESTED_QUERY, {"first": 10}) == 3 + 10 * 3 + 10 * 10
+    # children pages are capped at max_first
+    assert measure(cost_schema, NESTED_QUERY, {"first": 100}) == (
+        3 + 100 * 3 + 100 * 20
+    )
+    # without page sizes, foos falls back to default_page_size and children
+    # to its default_first
+    assert measure(cost_schema, NESTED_QUERY, default_page_size=50) == (
+        3 + 50 * 3 + 50 * 5
+    )
+    assert measure(
+        cost_schema,
+        NESTED_QUERY,
+        {"first": 10},
+        field_weights={"Foo.children": 4, "Foo.id": 1},
+    ) == 3 + 10 * (1 + 1 + 4 + 1) + 10 * 10 * (1 + 1)
+
+
+def test_node_cost(cost_schema: GraphQLSchema) -> None:
+    query = """
+        query($ids: [ID!]!) {
+            nodes(ids: $ids) {
+                ... on Foo { children(first: 10) { edges { node { id } } } }
+                ... on Qux { id }
+            }
+        }
+    """
+    ids = [to_global_id("Foo", "1"), to_global_id("Foo", "2"), to_global_id("Qux", "1")]
+    assert measure(cost_schema, query, {"ids": ids}) == 2 * (1 + 1 + 1 + 10) + 1
+    assert (
+        measure(
+            cost_schema, query, {"ids": ids}, node_type_weights={"Foo": 5, "Qux": 2}
+        )
+        == 2 * (5 + 1 + 1 + 10) + 2
+    )
+
+    node_query = "query($id: ID!) { node(id: $id) { ...fooFields } } " + (
+        "fragment fooFields on Foo { children { edges { node { id } } } }"
+    )
+    assert measure(cost_schema, node_query, {"id": ids[0]}) == 1 + 1 + 1 + 5
+    assert measure(cost_schema, node_query, {"id": ids[2]}) == 1
+
+
+def test_cost_validation_rule(cost_schema: GraphQLSchema) -> None:
+    analysis = QueryCostAnalysis(maximum_cost=200)
+    document = parse(NESTED_QUERY)
+    rule = analysis.create_validation_rule({"first": 10})
+    assert validate(cost_schema, document, [rule]) == []
+    rule = analysis.create_validation_rule({"first": 20})
+    [error] = validate(cost_schema, document, [rule])
+    assert error.message == (
+        "The query exceeds the maximum cost of 200. Actual cost is at least 463"
+    )
+    assert error.extensions == {
+        "cost": {"requestedQueryCost": 463, "maximumAvailable": 200}
+    }
+
+
+def test_cost_nested_fragments(cost_schema: GraphQLSchema) -> None:
+    depth = 22
+    fragments = "".join(
+        f"fragment f{i} on Foo {{ ...f{i + 1} ...f{i + 1} }}" for i in range(depth)
+    )
+    query = (
+        '{ node(id: "") { ...f0 } }'
+        + fragments
+        + (f"fragment f{depth} on Foo {{ id }}")
+    )
+    start = time.perf_counter()
+    # each fragment is only measured once
+    assert measure(cost_schema, query, field_weights={"Foo.id": 1}) == 1 + 2**depth
+    analysis = QueryCostAnalysis(maximum_cost=1000, field_weights={"Foo.id": 1})
+    rule = analysis.create_validation_rule()
+    [error] = validate(cost_schema, parse(query), [rule])
+    assert time.perf_counter() - start < 1
+    # the walk stops once the maximum cost is exceeded
+    assert error.message == (
+        "The query exceeds the maximum cost of 1000. Actual cost is at least 1025"
+    )
+
+
+@pytest.mark.asyncio
+async def test_cost_extension(cost_schema: GraphQLSchema) -> None:
+    analysis = QueryCostAnalysis(maximum_cost=200)
+    success, result = await ariadne_graphql(
+        cost_schema,
+        {"query": NESTED_QUERY, "variables": {"first": 2}},
+        validation_rules=analysis.validation_rules,
+        extensions=[QueryCostExtension],
+    )
+    assert success
+    assert "errors" not in result
+    assert result["extensions"] == {
+        "queryCost": {"requestedQueryCost": 13, "maximumAvailable": 200}
+    }
+
+    success, result = await ariadne_graphql(
+        cost_schema,
+        {"query": NESTED_QUERY, "variables": {"first": 20}},
+        validation_rules=analysis.validation_rules,
+        extensions=[QueryCostExtension],
+    )
+    assert not success
+    assert "data" not in result
+    assert result["errors"][0]["extensions"]["cost"]["requestedQueryCost"] == 463
+    assert result["extensions"]["queryCost"]["requestedQueryCost"] == 463
+
+
+def test_invalid_cost_analysis() -> None:
+    with pytest.raises(ValueError):
+        QueryCostAnalysis(maximum_cost=-1)
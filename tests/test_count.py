@@ -0,0 +1,252 @@
+from typing import Any, cast, List, Optional
+
+from ariadne import make_executable_schema
+from graphql import graphql, graphql_sync, GraphQLSchema
+import pytest
+
+from ariadne_relay import (
+    CappedCount,
+    ConnectionArguments,
+    ConnectionSelection,
+    ConnectionSlice,
+    CountCache,
+    CountedConnection,
+    CountStrategy,
+    EstimatedCount,
+    ExactCount,
+    ReferenceConnection,
+    RelayObjectType,
+    RelayQueryType,
+    SnakeCaseConnection,
+)
+from .conftest import FakeClock
+
+COUNT_TYPE_DEFS = """
+    type Query {
+        items(
+            after: String
+            before: String
+            first: Int
+            last: Int
+            minimum: Int
+        ): ItemsConnection!
+        groups: [Group!]!
+    }
+
+    type Group {
+        id: ID!
+        items(
+            after: String
+            before: String
+            first: Int
+            last: Int
+        ): ItemsConnection!
+    }
+
+    type PageInfo {
+        hasNextPage: Boolean!
+        hasPreviousPage: Boolean!
+        startCursor: String
+        endCursor: String
+    }
+
+    type ItemEdge {
+        cursor: String!
+        node: Int
+    }
+
+    type ItemsConnection {
+        pageInfo: PageInfo!
+        edges: [ItemEdge]!
+        totalCount: String
+    }
+"""
+
+
+def create_count_schema(
+    total_count: CountStrategy,
+    counts: Optional[List[int]] = None,
+    *,
+    count_free: bool = False,
+) -> GraphQLSchema:
+    def resolve_items(
+        obj: Any, info: Any, connection_args: Any, minimum: int = 0
+    ) -> List[int]:
+        return list(range(minimum, 10))
+
+    factory = ReferenceConnection(
+        total_count=total_count,
+        on_count=None if counts is None else counts.append,
+        count_free=count_free,
+    )
+    query_type = RelayQueryType()
+    query_type.set_connection("items", resolve_items, factory=factory)
+    query_type.set_field("groups", lambda *_: [{"id": 1}, {"id": 2}])
+    group_type = RelayObjectType("Group")
+    group_type.set_connection(
+        "items", lambda obj, *_: list(range(obj["id"] * 3)), factory=factory
+    )
+    return make_executable_schema(COUNT_TYPE_DEFS, query_type, group_type)
+
+
+def test_exact_count() -> None:
+    counts: List[int] = []
+    schema = create_count_schema(ExactCount(), counts)
+    result = graphql_sync(schema, "{ items(first: 2) { totalCount, edges { node } } }")
+    assert result.errors is None
+    assert result.data == {
+        "items": {"totalCount": "10", "edges": [{"node": 0}, {"node": 1}]}
+    }
+    # the length taken to paginate is reused for the count
+    assert counts == [10]
+
+
+def test_count_strategy_is_abstract() -> None:
+    class IncompleteCount(CountStrategy):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteCount()  # type: ignore[abstract]
+
+
+def test_count_not_selected() -> None:
+    estimates: List[Any] = []
+
+    def estimate(data: Any) -> int:
+        estimates.append(data)
+        return 100
+
+    schema = create_count_schema(EstimatedCount(estimate))
+    result = graphql_sync(schema, "{ items(first: 2) { edges { node } } }")
+    assert result.errors is None
+    assert estimates == []
+    result = graphql_sync(schema, "{ items(first: 2) { totalCount } }")
+    assert result.errors is None
+    assert result.data == {"items": {"totalCount": "100"}}
+    assert len(estimates) == 1
+
+
+def test_capped_count() -> None:
+    schema = create_count_schema(CappedCount(5))
+    query = "query($minimum: Int) { items(minimum: $minimum) { totalCount } }"
+    result = graphql_sync(schema, query)
+    assert result.errors is None
+    assert result.data == {"items": {"totalCount": "5+"}}
+    result = graphql_sync(schema, query, variable_values={"minimum": 5})
+    assert result.errors is None
+    assert result.data == {"items": {"totalCount": "5"}}
+
+
+def test_capped_count_slices_data() -> None:
+    sliced: List[Any] = []
+
+    class Data(List[int]):
+        def __getitem__(self, key: Any) -> Any:
+            sliced.append(key)
+            return super().__getitem__(key)
+
+    factory = ReferenceConnection(total_count=CappedCount(3), count_free=True)
+    connection = cast(
+        CountedConnection, factory(Data(range(100)), ConnectionArguments(first=1))
+    )
+    assert connection.totalCount == "3+"
+    assert slice(None, 4) in sliced
+
+
+@pytest.mark.asyncio
+async def test_cached_async_count(clock: FakeClock) -> None:
+    estimates: List[int] = []
+
+    async def estimate(data: Any) -> int:
+        estimates.append(len(data))
+        return len(data)
+
+    cache = CountCache(ttl=10, clock=clock)
+    schema = create_count_schema(EstimatedCount(estimate, cache=cache))
+    query = "query($minimum: Int) { items(minimum: $minimum) { totalCount } }"
+    for _ in range(2):
+        result = await graphql(schema, query)
+        assert result.errors is None
+        assert result.data == {"items": {"totalCount": "10"}}
+    assert estimates == [10]
+
+    # filter arguments are part of the cache key
+    result = await graphql(schema, query, variable_values={"minimum": 4})
+    assert result.errors is None
+    assert result.data == {"items": {"totalCount": "6"}}
+    assert estimates == [10, 6]
+
+    clock.now = 10
+    result = await graphql(schema, query)
+    assert result.errors is None
+    assert estimates == [10, 6, 10]
+
+
+def test_count_cached_per_parent() -> None:
+    counts: List[int] = []
+    schema = create_count_schema(ExactCount(cache=CountCache()), counts)
+    query = "{ groups { items { totalCount } } }"
+    expected = {
+        "groups": [{"items": {"totalCount": "3"}}, {"items": {"totalCount": "6"}}]
+    }
+    for _ in range(2):
+        result = graphql_sync(schema, query)
+        assert result.errors is None
+        assert result.data == expected
+    # the pagination still takes the length, but the count is shared
+    assert counts == [3, 6, 3, 6]
+
+
+def test_count_cached_count_free() -> None:
+    counts: List[int] = []
+    schema = create_count_schema(
+        ExactCount(cache=CountCache()), counts, count_free=True
+    )
+    query = "{ groups { items(first: 2) { totalCount, edges { node } } } }"
+    for _ in range(2):
+        result = graphql_sync(schema, query)
+        assert result.errors is None
+        assert result.data
+        assert [group["items"]["totalCount"] for group in result.data["groups"]] == [
+            "3",
+            "6",
+        ]
+    # without the pagination, the length is only taken for the cache misses
+    assert counts == [3, 6]
+
+
+def test_count_cache_eviction() -> None:
+    cache = CountCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.get("b") is None
+    with pytest.raises(ValueError):
+        CountCache(max_entries=0)
+
+
+def test_count_from_connection_slice() -> None:
+    factory = ReferenceConnection(total_count=ExactCount())
+    selection = ConnectionSelection(
+        fields=frozenset(["totalCount"]), page_info_fields=frozenset()
+    )
+    connection = cast(
+        CountedConnection,
+        factory(
+            ConnectionSlice([3, 4], offset=3, total=50),
+            ConnectionArguments(first=2),
+            selection=selection,
+        ),
+    )
+    assert connection.totalCount == 50
+
+
+def test_snake_case_total_count() -> None:
+    factory = SnakeCaseConnection(total_count=ExactCount())
+    connection = factory(list(range(4)), ConnectionArguments(first=1))
+    assert cast(Any, connection).total_count == 4
+    connection = SnakeCaseConnection()(list(range(4)), ConnectionArguments(first=1))
+    assert cast(Any, connection).total_count is None
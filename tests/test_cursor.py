@@ -0,0 +1,212 @@
+from typing import Any, cast, Dict, Iterator
+
+from ariadne import make_executable_schema
+from graphql import graphql_sync
+from graphql_relay import Connection, cursor_to_offset, offset_to_cursor
+import pytest
+
+from ariadne_relay import (
+    CompactCursorCodec,
+    ConnectionArguments,
+    ConnectionSelection,
+    ConnectionSlice,
+    CursorCodec,
+    NodeObjectType,
+    ReferenceConnection,
+    RelayQueryType,
+    set_default_cursor_codec,
+)
+from ariadne_relay.connection.cursor import DefaultCursorCodec
+
+
+@pytest.fixture
+def reset_codec() -> Iterator[None]:
+    codec = DefaultCursorCodec
+    yield
+    set_default_cursor_codec(codec)
+
+
+def test_default_codec_matches_reference() -> None:
+    codec = CursorCodec()
+    offsets = [0, 1, 9, 10, 99, 12345, 10**12]
+    for offset in offsets:
+        assert codec.encode(offset) == offset_to_cursor(offset)
+        assert codec.decode(offset_to_cursor(offset)) == offset
+    assert codec.encode_range(95, 105) == [offset_to_cursor(i) for i in range(95, 105)]
+    assert codec.decode("invalid") == cursor_to_offset("invalid")
+
+
+def test_compact_codec() -> None:
+    codec = CompactCursorCodec()
+    offsets = [0, 1, 61, 62, 3843, 3844, 3845, 238327, 238328, 10**12]
+    for offset in offsets:
+        cursor = codec.encode(offset)
+        assert cursor.startswith("~")
+        assert len(cursor) < len(offset_to_cursor(offset))
+        assert codec.decode(cursor) == offset
+    assert codec.encode_range(3800, 3900) == [
+        codec.encode(offset) for offset in range(3800, 3900)
+    ]
+    assert codec.encode_range(5, 5) == []
+
+
+def test_compact_codec_decodes_legacy_cursors() -> None:
+    codec = CompactCursorCodec()
+    assert codec.decode(offset_to_cursor(42)) == 42
+    assert codec.decode("~") is None
+    assert codec.decode("~a-b") is None
+    assert codec.decode("invalid") is None
+
+
+def test_compact_codec_rejects_negative_offsets() -> None:
+    with pytest.raises(ValueError):
+        CompactCursorCodec().encode(-1)
+
+
+def test_connection_cursor_codec(type_defs: str, foo_type: NodeObjectType) -> None:
+    codec = CompactCursorCodec()
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos",
+        lambda *_: list(range(10)),
+        factory=ReferenceConnection(cursor_codec=codec),
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    query = """
+        query($after: String) {
+            foos(first: 2, after: $after) {
+                edges { cursor }
+                pageInfo { startCursor, endCursor }
+            }
+        }
+    """
+    result = graphql_sync(schema, query, variable_values={"after": codec.encode(3)})
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "edges": [{"cursor": codec.encode(4)}, {"cursor": codec.encode(5)}],
+            "pageInfo": {"startCursor": codec.encode(4), "endCursor": codec.encode(5)},
+        }
+    }
+    legacy_result = graphql_sync(
+        schema, query, variable_values={"after": offset_to_cursor(3)}
+    )
+    assert legacy_result == result
+
+
+def test_connection_cursor_codec_window(
+    type_defs: str, foo_type: NodeObjectType
+) -> None:
+    codec = CompactCursorCodec()
+    data = list(range(6))
+
+    def resolve_foos(
+        obj: Any, info: Any, connection_args: ConnectionArguments
+    ) -> ConnectionSlice:
+        # the codec does not change the fields of the arguments
+        after, before, first, last = connection_args
+        assert connection_args == ConnectionArguments(after=after, first=first)
+        assert connection_args._asdict() == {
+            "after": after,
+            "before": None,
+            "first": first,
+            "last": None,
+        }
+        assert connection_args._replace(first=2).cursor_codec is codec
+        offset, limit = connection_args.window[:2]
+        items = data[offset:][: cast(int, limit)]
+        return ConnectionSlice(items, offset, len(data))
+
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos", resolve_foos, factory=ReferenceConnection(cursor_codec=codec)
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    query = """
+        query($after: String) {
+            foos(first: 3, after: $after) {
+                edges { cursor }
+                pageInfo { hasNextPage }
+            }
+        }
+    """
+    result = graphql_sync(schema, query, variable_values={"after": "~2"})
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "edges": [{"cursor": codec.encode(i)} for i in range(3, 6)],
+            "pageInfo": {"hasNextPage": False},
+        }
+    }
+
+
+@pytest.mark.usefixtures("reset_codec")
+def test_set_default_cursor_codec() -> None:
+    codec = CompactCursorCodec()
+    set_default_cursor_codec(codec)
+    connection = cast(
+        Connection, ReferenceConnection()(list(range(10)), ConnectionArguments(first=2))
+    )
+    assert [edge.cursor for edge in connection.edges] == ["~0", "~1"]
+    assert ConnectionArguments(first=2, after="~4").window.offset == 5
+
+
+def test_cursors_not_selected() -> None:
+    encoded = []
+
+    class RecordingCursorCodec(CursorCodec):
+        def encode(self, offset: int) -> str:
+            encoded.append(offset)
+            return super().encode(offset)
+
+        def encode_range(self, start: int, stop: int) -> Any:
+            encoded.extend(range(start, stop))
+            return super().encode_range(start, stop)
+
+    factory = ReferenceConnection(cursor_codec=RecordingCursorCodec())
+    selection = ConnectionSelection(
+        fields=frozenset(["edges", "pageInfo"]),
+        page_info_fields=frozenset(["hasNextPage"]),
+        edge_fields=frozenset(["node"]),
+    )
+    connection = cast(
+        Connection,
+        factory(list(range(10)), ConnectionArguments(first=3), selection=selection),
+    )
+    assert [edge.node for edge in connection.edges] == [0, 1, 2]
+    assert connection.pageInfo.hasNextPage is True
+    assert encoded == []
+
+    selection = selection._replace(page_info_fields=frozenset(["endCursor"]))
+    connection = cast(
+        Connection,
+        factory(list(range(10)), ConnectionArguments(first=3), selection=selection),
+    )
+    assert connection.pageInfo.endCursor == offset_to_cursor(2)
+    assert encoded == [0, 2]
+
+
+def test_connection_selection_edge_fields(
+    type_defs: str, foo_type: NodeObjectType
+) -> None:
+    selections: Dict[str, ConnectionSelection] = {}
+
+    def resolve_foos(*_: Any) -> Any:
+        return list(range(10))
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", resolve_foos)
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    foos_field = schema.query_type.fields["foos"]  # type: ignore[union-attr]
+    resolve = foos_field.resolve
+    assert resolve is not None
+
+    def resolve_and_record(obj: Any, info: Any, **kwargs: Any) -> Any:
+        selections["foos"] = ConnectionSelection.from_info(info)
+        return resolve(obj, info, **kwargs)
+
+    foos_field.resolve = resolve_and_record
+    result = graphql_sync(schema, "{ foos { edges { ...on FooEdge { cursor } } } }")
+    assert result.errors is None
+    assert selections["foos"].edge_fields == frozenset(["cursor"])
+    assert selections["foos"].needs_edge_cursors
@@ -0,0 +1,206 @@
+import time
+from typing import Any, cast, Dict, Iterator, List, Tuple, Union
+from uuid import UUID
+
+from ariadne import InterfaceType, make_executable_schema
+from graphql import graphql_sync, GraphQLError
+from graphql_relay import from_global_id, to_global_id
+import pytest
+
+from ariadne_relay import (
+    CompactGlobalIdCodec,
+    GlobalIdCodec,
+    NodeObjectType,
+    RelayQueryType,
+    set_default_global_id_codec,
+)
+from ariadne_relay.global_id import DefaultGlobalIdCodec
+from .conftest import Foo
+
+
+@pytest.fixture
+def reset_codec() -> Iterator[None]:
+    codec = DefaultGlobalIdCodec
+    yield
+    set_default_global_id_codec(codec)
+
+
+@pytest.fixture
+def compact_codec() -> CompactGlobalIdCodec:
+    return CompactGlobalIdCodec({"Foo": 1, "Qux": 2})
+
+
+def test_default_codec_matches_reference() -> None:
+    codec = GlobalIdCodec()
+    ids: List[Tuple[str, Union[str, int]]] = [
+        ("Foo", "1"),
+        ("Foo", 2),
+        ("Bar", "a:b"),
+        ("Baz", ""),
+    ]
+    for type_name, node_id in ids:
+        global_id = codec.encode(type_name, node_id)
+        assert global_id == to_global_id(type_name, node_id)
+        assert codec.decode(global_id) == from_global_id(global_id)
+    for global_id in ["invalid", "", to_global_id("", "bar")]:
+        assert codec.decode(global_id) == from_global_id(global_id)
+
+
+def test_codec_memoizes() -> None:
+    codec = GlobalIdCodec(cache_size=2)
+    for _ in range(3):
+        codec.encode("Foo", "1")
+        codec.decode(to_global_id("Foo", "1"))
+    assert getattr(codec.encode, "cache_info")().hits == 2
+    assert getattr(codec.decode, "cache_info")().hits == 2
+    codec.clear_cache()
+    assert getattr(codec.decode, "cache_info")().currsize == 0
+
+
+def test_codec_cache_is_typed() -> None:
+    codec = GlobalIdCodec()
+    assert codec.encode("Foo", 1) == to_global_id("Foo", 1)
+    # True is not served the cached ID of 1
+    with pytest.raises(GraphQLError):
+        codec.encode("Foo", True)
+    codec.encode("Foo", cast(int, 1.0))
+    assert getattr(codec.encode, "cache_info")().hits == 0
+
+
+@pytest.mark.parametrize(
+    "node_id,decoded_id",
+    [
+        (0, "0"),
+        ("42", "42"),
+        (2**70, str(2**70)),
+        ("007", "007"),
+        ("-1", "-1"),
+        ("héllo", "héllo"),
+        (
+            UUID("12345678-1234-5678-1234-567812345678"),
+            "12345678-1234-5678-1234-567812345678",
+        ),
+    ],
+)
+def test_compact_codec_round_trip(
+    compact_codec: CompactGlobalIdCodec, node_id: Any, decoded_id: str
+) -> None:
+    global_id = compact_codec.encode("Qux", node_id)
+    assert global_id.isalnum()
+    assert compact_codec.decode(global_id) == ("Qux", decoded_id)
+
+
+def test_compact_codec_is_shorter(compact_codec: CompactGlobalIdCodec) -> None:
+    for node_id in [1, 12345, 2**40]:
+        assert len(compact_codec.encode("Foo", node_id)) < len(
+            to_global_id("Foo", node_id)
+        )
+
+
+def test_compact_codec_invalid(compact_codec: CompactGlobalIdCodec) -> None:
+    with pytest.raises(ValueError):
+        compact_codec.encode("Bar", 1)
+    with pytest.raises(ValueError):
+        CompactGlobalIdCodec({"Foo": 1, "Bar": 1})
+    for global_id in ["", "not-base62", to_global_id("Foo", "1"), "1"]:
+        assert compact_codec.decode(global_id) == ("", "")
+
+
+def test_compact_codec_length_limit() -> None:
+    codec = CompactGlobalIdCodec({"Foo": 1}, max_node_id_size=8)
+    longest_id = codec.encode("Foo", "\U0010ffff" * 2)
+    assert codec.decode(longest_id) == ("Foo", "\U0010ffff" * 2)
+    with pytest.raises(ValueError):
+        codec.encode("Foo", "abcdefghi")
+    assert codec.decode(longest_id + "0") == ("", "")
+    with pytest.raises(ValueError):
+        CompactGlobalIdCodec({"Foo": 1}, max_node_id_size=-1)
+
+    # long IDs are rejected before they are decoded
+    codec = CompactGlobalIdCodec({"Foo": 1})
+    start = time.perf_counter()
+    assert codec.decode("z" * 100_000) == ("", "")
+    assert time.perf_counter() - start < 0.01
+
+
+def test_compact_codec_node_query(
+    type_defs: str,
+    foo_type: NodeObjectType,
+    query_type: RelayQueryType,
+    node_query: str,
+    node_interface_type: InterfaceType,
+    compact_codec: CompactGlobalIdCodec,
+    reset_codec: None,
+) -> None:
+    set_default_global_id_codec(compact_codec)
+    schema = make_executable_schema(
+        type_defs, foo_type, query_type, node_interface_type
+    )
+    global_id = compact_codec.encode("Foo", 3)
+    result = graphql_sync(schema, node_query, variable_values={"id": global_id})
+    assert result.errors is None
+    assert result.data == {"node": {"__typename": "Foo", "id": global_id}}
+
+
+def test_typed_node_ids(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_query: str,
+    nodes_query: str,
+    node_interface_type: InterfaceType,
+) -> None:
+    foos = {i: Foo(id=i) for i in range(3)}
+    received: List[Any] = []
+
+    def resolve_foo(node_id: int, *_: Any) -> Foo:
+        received.append(node_id)
+        return foos[node_id]
+
+    foo_type = NodeObjectType("Foo", id_type=int, instance_resolver=resolve_foo)
+    schema = make_executable_schema(
+        type_defs, foo_type, query_type, node_interface_type
+    )
+    global_id = to_global_id("Foo", 1)
+    result = graphql_sync(schema, node_query, variable_values={"id": global_id})
+    assert result.errors is None
+    assert result.data == {"node": {"__typename": "Foo", "id": global_id}}
+
+    invalid_global_id = to_global_id("Foo", "one")
+    result = graphql_sync(schema, node_query, variable_values={"id": invalid_global_id})
+    assert result.errors is None
+    assert result.data == {"node": None}
+
+    global_ids = [to_global_id("Foo", 2), invalid_global_id]
+    result = graphql_sync(schema, nodes_query, variable_values={"ids": global_ids})
+    assert result.errors is None
+    assert result.data == {"nodes": [{"__typename": "Foo", "id": global_ids[0]}, None]}
+    assert received == [1, 2]
+
+
+def test_typed_node_ids_batch(
+    type_defs: str,
+    query_type: RelayQueryType,
+    nodes_query: str,
+    node_interface_type: InterfaceType,
+) -> None:
+    received: List[List[Any]] = []
+
+    def resolve_foos(node_ids: List[UUID], *_: Any) -> Dict[UUID, Foo]:
+        received.append(node_ids)
+        return {node_id: Foo(id=node_id.int) for node_id in node_ids}
+
+    foo_type = NodeObjectType("Foo", id_type=UUID, batch_instance_resolver=resolve_foos)
+    schema = make_executable_schema(
+        type_defs, foo_type, query_type, node_interface_type
+    )
+    uuid = UUID(int=1)
+    result = graphql_sync(
+        schema,
+        nodes_query,
+        variable_values={"ids": [to_global_id("Foo", str(uuid))]},
+    )
+    assert result.errors is None
+    assert result.data == {
+        "nodes": [{"__typename": "Foo", "id": to_global_id("Foo", "1")}]
+    }
+    assert received == [[uuid]]
@@ -0,0 +1,230 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+from ariadne import InterfaceType, make_executable_schema
+from graphql import execute_sync, graphql, graphql_sync, GraphQLSchema, parse
+from graphql_relay import to_global_id
+import pytest
+
+from ariadne_relay import (
+    NodeObjectType,
+    RelayQueryType,
+    resolve_node_query,
+    resolve_nodes_query,
+    set_node_loader_context_key,
+)
+from ariadne_relay.loader import DEFAULT_NODE_LOADER_CONTEXT_KEY
+from .conftest import Foo
+
+
+@pytest.fixture
+def aliased_node_query() -> str:
+    return """
+        query($a: ID!, $b: ID!, $ids: [ID!]!) {
+            first: node(id: $a) { id }
+            second: node(id: $a) { id }
+            third: node(id: $b) { id }
+            nodes(ids: $ids) { id }
+        }
+    """
+
+
+@pytest.fixture
+def loaded_ids() -> List[str]:
+    return []
+
+
+@pytest.fixture
+def counting_foo_type(
+    foo_nodes: Dict[str, Foo], loaded_ids: List[str]
+) -> NodeObjectType:
+    def resolve_foo(id: str, *_: Any) -> Optional[Foo]:  # noqa: A002
+        loaded_ids.append(id)
+        return foo_nodes.get(id)
+
+    return NodeObjectType("Foo", instance_resolver=resolve_foo)
+
+
+@pytest.fixture
+def reset_context_key() -> Iterator[None]:
+    yield
+    set_node_loader_context_key(DEFAULT_NODE_LOADER_CONTEXT_KEY)
+
+
+def test_loader_deduplicates_sync(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    counting_foo_type: NodeObjectType,
+    aliased_node_query: str,
+    loaded_ids: List[str],
+) -> None:
+    schema = make_executable_schema(
+        type_defs, query_type, node_interface_type, counting_foo_type
+    )
+    a, b = to_global_id("Foo", "1"), to_global_id("Foo", "2")
+    context: Dict[str, Any] = {}
+    result = graphql_sync(
+        schema,
+        aliased_node_query,
+        context_value=context,
+        variable_values={"a": a, "b": b, "ids": [b, a, to_global_id("Foo", "3")]},
+    )
+    assert result.errors is None
+    assert result.data == {
+        "first": {"id": a},
+        "second": {"id": a},
+        "third": {"id": b},
+        "nodes": [{"id": b}, {"id": a}, {"id": to_global_id("Foo", "3")}],
+    }
+    assert loaded_ids == ["1", "2", "3"]
+    assert DEFAULT_NODE_LOADER_CONTEXT_KEY in context
+
+
+@pytest.fixture
+def batches() -> List[List[str]]:
+    return []
+
+
+@pytest.fixture
+def async_schema(
+    type_defs: str,
+    node_interface_type: InterfaceType,
+    foo_nodes: Dict[str, Foo],
+    batches: List[List[str]],
+) -> GraphQLSchema:
+    query_type = RelayQueryType()
+    query_type.set_field("node", resolve_node_query)
+    query_type.set_field("nodes", resolve_nodes_query)
+    foo_type = NodeObjectType("Foo")
+
+    @foo_type.batch_instance_resolver
+    async def resolve_foos(ids: List[str], *_: Any) -> List[Optional[Foo]]:
+        batches.append(ids)
+        return [foo_nodes.get(node_id) for node_id in ids]
+
+    return make_executable_schema(type_defs, query_type, node_interface_type, foo_type)
+
+
+def test_loader_scoped_to_execution(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    counting_foo_type: NodeObjectType,
+    aliased_node_query: str,
+    loaded_ids: List[str],
+) -> None:
+    schema = make_executable_schema(
+        type_defs, query_type, node_interface_type, counting_foo_type
+    )
+    a, b = to_global_id("Foo", "1"), to_global_id("Foo", "2")
+    document = parse(aliased_node_query)
+    # a context that outlives requests must not share loads between them
+    shared_context: Dict[str, Any] = {}
+    for _ in range(2):
+        result = execute_sync(
+            schema,
+            document,
+            context_value=shared_context,
+            variable_values={"a": a, "b": b, "ids": [a]},
+        )
+        assert result.errors is None
+    assert loaded_ids == ["1", "2", "1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_loader_batches_async(
+    async_schema: GraphQLSchema,
+    aliased_node_query: str,
+    batches: List[List[str]],
+) -> None:
+    a, b = to_global_id("Foo", "1"), to_global_id("Foo", "2")
+    result = await graphql(
+        async_schema,
+        aliased_node_query,
+        context_value={},
+        variable_values={"a": a, "b": b, "ids": [b, a]},
+    )
+    assert result.errors is None
+    assert result.data == {
+        "first": {"id": a},
+        "second": {"id": a},
+        "third": {"id": b},
+        "nodes": [{"id": b}, {"id": a}],
+    }
+    assert batches == [["1", "2"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("batch", [False, True])
+async def test_loader_sync_queries_async_resolvers(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    foo_nodes: Dict[str, Foo],
+    aliased_node_query: str,
+    loaded_ids: List[str],
+    batch: bool,
+) -> None:
+    async def resolve_foo(id: str, *_: Any) -> Optional[Foo]:  # noqa: A002
+        loaded_ids.append(id)
+        return foo_nodes.get(id)
+
+    async def resolve_foos(ids: List[str], *_: Any) -> List[Optional[Foo]]:
+        loaded_ids.extend(ids)
+        return [foo_nodes.get(node_id) for node_id in ids]
+
+    foo_type = (
+        NodeObjectType("Foo", batch_instance_resolver=resolve_foos)
+        if batch
+        else NodeObjectType("Foo", instance_resolver=resolve_foo)
+    )
+    # the query type resolves nodes with the sync query resolvers
+    schema = make_executable_schema(
+        type_defs, query_type, node_interface_type, foo_type
+    )
+    a, b = to_global_id("Foo", "1"), to_global_id("Foo", "2")
+    result = await graphql(
+        schema,
+        aliased_node_query,
+        context_value={},
+        variable_values={"a": a, "b": b, "ids": [b, a, b]},
+    )
+    assert result.errors is None
+    assert result.data == {
+        "first": {"id": a},
+        "second": {"id": a},
+        "third": {"id": b},
+        "nodes": [{"id": b}, {"id": a}, {"id": b}],
+    }
+    assert sorted(loaded_ids) == ["1", "2"]
+
+
+@pytest.mark.asyncio
+async def test_loader_context_key(
+    async_schema: GraphQLSchema,
+    aliased_node_query: str,
+    batches: List[List[str]],
+    reset_context_key: None,
+) -> None:
+    a, b = to_global_id("Foo", "1"), to_global_id("Foo", "2")
+    context: Dict[str, Any] = {}
+    set_node_loader_context_key("custom_loader")
+    result = await graphql(
+        async_schema,
+        aliased_node_query,
+        context_value=context,
+        variable_values={"a": a, "b": b, "ids": []},
+    )
+    assert result.errors is None
+    assert list(context) == ["custom_loader"]
+    assert batches == [["1", "2"]]
+
+    set_node_loader_context_key(None)
+    result = await graphql(
+        async_schema,
+        aliased_node_query,
+        context_value={},
+        variable_values={"a": a, "b": b, "ids": []},
+    )
+    assert result.errors is None
+    assert len(batches) == 4
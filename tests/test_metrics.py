@@ -0,0 +1,203 @@
+import asyncio
+from typing import Any, Dict, List
+
+from ariadne import graphql as ariadne_graphql, make_executable_schema
+from graphql import graphql_sync, GraphQLObjectType
+from graphql_relay import to_global_id
+import pytest
+
+from ariadne_relay import (
+    ConnectionFieldStats,
+    NodeObjectType,
+    NodeResolverStats,
+    ReferenceConnection,
+    RelayMetrics,
+    RelayMetricsExtension,
+    RelayQueryType,
+    resolve_nodes_query,
+    set_default_connection_hook,
+    ThreadOffloader,
+)
+from ariadne_relay.metrics import Histogram
+from .conftest import Foo
+
+FOOS_QUERY = "{ foos(first: 2) { edges { node { id } } } }"
+
+
+def test_connection_metrics(
+    type_defs: str, foo_type: NodeObjectType, node_interface_type: Any
+) -> None:
+    observed: List[ConnectionFieldStats] = []
+    metrics = RelayMetrics()
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", lambda *_: [Foo(id=i) for i in range(10)])
+
+    def observe(stats: ConnectionFieldStats) -> None:
+        observed.append(stats)
+        metrics.observe_connection(stats)
+
+    query_type.set_connection_hook(observe)
+    schema = make_executable_schema(
+        type_defs, query_type, foo_type, node_interface_type
+    )
+    result = graphql_sync(schema, FOOS_QUERY)
+    assert result.errors is None
+    assert len(observed) == 1
+    stats = observed[0]
+    assert stats.field == "Query.foos"
+    assert stats.path == ["foos"]
+    assert stats.items_fetched == 2
+    assert stats.edges_returned == 2
+    assert stats.count_calls == 1
+    assert stats.resolver_time >= 0
+    assert stats.factory_time > 0
+
+    foos = metrics.as_dict()["connections"]["Query.foos"]
+    assert foos["count_calls"] == 1
+    assert foos["overfetch_ratio"] == 1.0
+    assert foos["edges_returned"]["count"] == 1
+    assert foos["edges_returned"]["buckets"]["1.0"] == 0
+    assert foos["edges_returned"]["buckets"]["5.0"] == 1
+    assert foos["edges_returned"]["buckets"]["+Inf"] == 1
+
+
+def test_count_free_connection_metrics(
+    type_defs: str, foo_type: NodeObjectType, node_interface_type: Any
+) -> None:
+    metrics = RelayMetrics()
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos",
+        lambda *_: [Foo(id=i) for i in range(10)],
+        factory=ReferenceConnection(count_free=True),
+    )
+    query_type.set_connection_hook(metrics.observe_connection)
+    schema = make_executable_schema(
+        type_defs, query_type, foo_type, node_interface_type
+    )
+    for _ in range(2):
+        result = graphql_sync(schema, FOOS_QUERY)
+        assert result.errors is None
+    foos = metrics.as_dict()["connections"]["Query.foos"]
+    assert foos["count_calls"] == 0
+    # the item that follows the page is fetched to determine hasNextPage
+    assert foos["items_fetched"]["sum"] == 6
+    assert foos["overfetch_ratio"] == 1.5
+
+    text = metrics.to_prometheus()
+    assert "# TYPE ariadne_relay_connection_items_fetched histogram" in text
+    assert (
+        'ariadne_relay_connection_items_fetched_bucket{field="Query.foos",le="5.0"} 2'
+        in text
+    )
+    assert 'ariadne_relay_connection_items_fetched_sum{field="Query.foos"} 6' in text
+    assert 'ariadne_relay_connection_count_calls_total{field="Query.foos"} 0' in text
+
+    metrics.reset()
+    assert metrics.as_dict() == {
+        "connections": {},
+        "nodes": {},
+        "offload_queue_wait_seconds": Histogram(metrics.latency_buckets).as_dict(),
+    }
+
+
+@pytest.mark.asyncio
+async def test_metrics_extension(type_defs: str, node_interface_type: Any) -> None:
+    observed: List[NodeResolverStats] = []
+
+    async def resolve_foos(*_: Any) -> List[Foo]:
+        await asyncio.sleep(0)
+        return [Foo(id=i) for i in range(5)]
+
+    def resolve_foo_instances(node_ids: List[str], info: Any) -> Dict[str, Foo]:
+        return {node_id: Foo(id=int(node_id)) for node_id in node_ids}
+
+    query_type = RelayQueryType()
+    query_type.set_field("nodes", resolve_nodes_query)
+    query_type.set_connection("foos", resolve_foos)
+    query_type.set_connection_hook(lambda stats: None)
+    foo_type = NodeObjectType(
+        "Foo",
+        batch_instance_resolver=resolve_foo_instances,
+        node_hook=observed.append,
+    )
+    schema = make_executable_schema(
+        type_defs, query_type, foo_type, node_interface_type
+    )
+    ids = [to_global_id("Foo", str(i)) for i in range(3)]
+    success, result = await ariadne_graphql(
+        schema,
+        {
+            "query": "query($ids: [ID!]!) { nodes(ids: $ids) { id } %s }"
+            % FOOS_QUERY[1:-1],
+            "variables": {"ids": ids},
+        },
+        extensions=[RelayMetricsExtension],
+    )
+    assert success
+    assert "errors" not in result
+    relay_metrics = result["extensions"]["relayMetrics"]
+    [connection] = relay_metrics["connections"]
+    assert connection["field"] == "Query.foos"
+    assert connection["itemsFetched"] == 2
+    assert connection["edgesReturned"] == 2
+    assert connection["resolverTime"] > 0
+    [node] = relay_metrics["nodes"]
+    assert node["nodeType"] == "Foo"
+    assert node["ids"] == 3
+    assert node["batch"] is True
+    assert [stats.ids for stats in observed] == [3]
+
+
+def test_default_connection_hook(
+    type_defs: str, foo_type: NodeObjectType, node_interface_type: Any
+) -> None:
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", lambda *_: [Foo(id=i) for i in range(10)])
+    schema = make_executable_schema(
+        type_defs, query_type, foo_type, node_interface_type
+    )
+    query = schema.get_type("Query")
+    assert isinstance(query, GraphQLObjectType)
+    unobserved_resolver = query.fields["foos"].resolve
+
+    observed: List[ConnectionFieldStats] = []
+    set_default_connection_hook(observed.append)
+    try:
+        schema = make_executable_schema(
+            type_defs, query_type, foo_type, node_interface_type
+        )
+    finally:
+        set_default_connection_hook(None)
+    result = graphql_sync(schema, FOOS_QUERY)
+    assert result.errors is None
+    assert [stats.field for stats in observed] == ["Query.foos"]
+    assert unobserved_resolver is not None
+    assert unobserved_resolver.__name__ == "resolve_connection"
+
+
+def test_offload_queue_wait_metrics() -> None:
+    metrics = RelayMetrics()
+    offloader = ThreadOffloader(max_workers=1, on_queue_wait=metrics.observe_queue_wait)
+
+    async def run() -> None:
+        await asyncio.gather(*(offloader.run(lambda: None) for _ in range(3)))
+
+    try:
+        asyncio.run(run())
+    finally:
+        offloader.shutdown()
+    assert metrics.as_dict()["offload_queue_wait_seconds"]["count"] == 3
+    assert "ariadne_relay_offload_queue_wait_seconds_count 3" in metrics.to_prometheus()
+
+
+def test_histogram() -> None:
+    histogram = Histogram([1, 10])
+    for value in (0, 1, 2, 10, 11):
+        histogram.observe(value)
+    assert histogram.cumulative_counts() == [(1, 2), (10, 4), (float("inf"), 5)]
+    assert histogram.as_dict() == {
+        "buckets": {"1.0": 2, "10.0": 4, "+Inf": 5},
+        "count": 5,
+        "sum": 24.0,
+    }
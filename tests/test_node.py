@@ -1,11 +1,19 @@
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
 from ariadne import InterfaceType, make_executable_schema, QueryType
-from graphql import graphql_sync
+from graphql import graphql, graphql_sync
 from graphql_relay import to_global_id
 from graphql_relay.utils import base64
+import pytest
 
-from ariadne_relay import NodeInterfaceType, RelayObjectType, RelayQueryType
+from ariadne_relay import (
+    NodeInterfaceType,
+    NodeObjectType,
+    RelayObjectType,
+    RelayQueryType,
+    resolve_node_query_sync,
+    resolve_nodes_query,
+)
 from .conftest import Foo, Qux
 
 
@@ -176,3 +184,242 @@ def test_empty_global_id(
     result = graphql_sync(schema, node_query, variable_values={"id": global_id})
     assert result.errors is None
     assert result.data == {"node": None}
+
+
+def test_nodes_query_instance_resolver(
+    type_defs: str,
+    foo_nodes: Dict[str, Foo],
+    foo_type: RelayObjectType,
+    query_type: RelayQueryType,
+    nodes_query: str,
+    node_interface_type: InterfaceType,
+) -> None:
+    schema = make_executable_schema(
+        type_defs,
+        foo_type,
+        query_type,
+        node_interface_type,
+    )
+    global_ids = [
+        to_global_id("Foo", "3"),
+        to_global_id("Bar", "bar"),
+        to_global_id("Foo", "1"),
+        "invalid",
+    ]
+    result = graphql_sync(schema, nodes_query, variable_values={"ids": global_ids})
+    assert result.errors is None
+    assert result.data == {
+        "nodes": [
+            {"__typename": "Foo", "id": global_ids[0]},
+            None,
+            {"__typename": "Foo", "id": global_ids[2]},
+            None,
+        ]
+    }
+
+
+def test_nodes_query_batch_instance_resolver(
+    type_defs: str,
+    foo_nodes: Dict[str, Foo],
+    query_type: RelayQueryType,
+    nodes_query: str,
+    node_interface_type: InterfaceType,
+) -> None:
+    batches: List[List[str]] = []
+
+    def resolve_foos(ids: List[str], *_: Any) -> List[Optional[Foo]]:
+        batches.append(ids)
+        return [foo_nodes.get(node_id) for node_id in ids]
+
+    foo_type = NodeObjectType("Foo", batch_instance_resolver=resolve_foos)
+    schema = make_executable_schema(
+        type_defs,
+        foo_type,
+        query_type,
+        node_interface_type,
+    )
+    global_ids = [to_global_id("Foo", i) for i in ("2", "1", "2", "missing")]
+    result = graphql_sync(schema, nodes_query, variable_values={"ids": global_ids})
+    assert result.errors is None
+    assert result.data == {
+        "nodes": [
+            {"__typename": "Foo", "id": global_ids[0]},
+            {"__typename": "Foo", "id": global_ids[1]},
+            {"__typename": "Foo", "id": global_ids[2]},
+            None,
+        ]
+    }
+    assert batches == [["2", "1", "missing"]]
+
+
+def test_node_query_batch_instance_resolver(
+    type_defs: str,
+    foo_nodes: Dict[str, Foo],
+    query_type: RelayQueryType,
+    node_query: str,
+    node_interface_type: InterfaceType,
+) -> None:
+    foo_type = NodeObjectType("Foo")
+
+    @foo_type.batch_instance_resolver
+    def resolve_foos(ids: List[str], *_: Any) -> Dict[str, Foo]:
+        return {node_id: foo_nodes[node_id] for node_id in ids if node_id in foo_nodes}
+
+    schema = make_executable_schema(
+        type_defs,
+        foo_type,
+        query_type,
+        node_interface_type,
+    )
+    global_id = to_global_id("Foo", "4")
+    result = graphql_sync(schema, node_query, variable_values={"id": global_id})
+    assert result.errors is None
+    assert result.data == {"node": {"__typename": "Foo", "id": global_id}}
+
+
+@pytest.mark.asyncio
+async def test_nodes_query_async(
+    type_defs: str,
+    foo_nodes: Dict[str, Foo],
+    qux_nodes: Dict[str, Qux],
+    baz_interface_type: NodeInterfaceType,
+    qux_type: RelayObjectType,
+    nodes_query: str,
+    node_interface_type: InterfaceType,
+) -> None:
+    async def resolve_foos(ids: List[str], *_: Any) -> List[Optional[Foo]]:
+        return [foo_nodes.get(node_id) for node_id in ids]
+
+    query_type = RelayQueryType()
+    query_type.set_field("nodes", resolve_nodes_query)
+    foo_type = NodeObjectType("Foo", batch_instance_resolver=resolve_foos)
+    schema = make_executable_schema(
+        type_defs,
+        foo_type,
+        query_type,
+        baz_interface_type,
+        qux_type,
+        node_interface_type,
+    )
+    global_ids = [
+        to_global_id("Baz", "1"),
+        to_global_id("Foo", "1"),
+        to_global_id("Foo", "missing"),
+        to_global_id("Baz", "2"),
+    ]
+    result = await graphql(schema, nodes_query, variable_values={"ids": global_ids})
+    assert result.errors is None
+    assert result.data == {
+        "nodes": [
+            {"__typename": "Qux", "id": global_ids[0]},
+            {"__typename": "Foo", "id": global_ids[1]},
+            None,
+            {"__typename": "Qux", "id": global_ids[3]},
+        ]
+    }
+
+
+@pytest.mark.asyncio
+async def test_sync_queries_async_batch_instance_resolver(
+    type_defs: str,
+    foo_nodes: Dict[str, Foo],
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+) -> None:
+    batches: List[List[str]] = []
+
+    async def resolve_foos(ids: List[str], *_: Any) -> Dict[str, Foo]:
+        batches.append(ids)
+        return {node_id: foo_nodes[node_id] for node_id in ids if node_id in foo_nodes}
+
+    foo_type = NodeObjectType("Foo", batch_instance_resolver=resolve_foos)
+    schema = make_executable_schema(
+        type_defs,
+        foo_type,
+        query_type,
+        node_interface_type,
+    )
+    a, b = to_global_id("Foo", "1"), to_global_id("Foo", "missing")
+    result = await graphql(
+        schema,
+        "query($a: ID!, $ids: [ID!]!) { node(id: $a) { id } nodes(ids: $ids) { id } }",
+        variable_values={"a": a, "ids": [b, a]},
+    )
+    assert result.errors is None
+    assert result.data == {"node": {"id": a}, "nodes": [None, {"id": a}]}
+    assert sorted(batches) == [["1"], ["missing", "1"]]
+
+
+def test_node_typename_resolver_binding_order(
+    type_defs: str,
+    baz_interface_type: NodeInterfaceType,
+    qux_nodes: Dict[str, Qux],
+    qux_type: RelayObjectType,
+    query_type: RelayQueryType,
+    qux_connection_query: str,
+) -> None:
+    schema = make_executable_schema(type_defs, qux_type, baz_interface_type, query_type)
+    result = graphql_sync(schema, qux_connection_query)
+    assert result.errors is None
+    assert result.data == {
+        "quxes": {
+            "edges": [
+                {
+                    "node": {
+                        "__typename": obj.__class__.__name__,
+                        "id": to_global_id("Baz", str(obj.id)),
+                    },
+                }
+                for obj in qux_nodes.values()
+            ],
+        },
+    }
+
+
+def test_node_id_field_mapping(
+    type_defs: str,
+    node_query: str,
+    node_interface_type: InterfaceType,
+) -> None:
+    query_type = RelayQueryType()
+    query_type.set_field("node", resolve_node_query_sync)
+    foo_type = NodeObjectType("Foo")
+    foo_type.set_instance_resolver(lambda node_id, *_: {"id": node_id})
+    node_interface_type.set_type_resolver(lambda *_: "Foo")
+    schema = make_executable_schema(
+        type_defs, query_type, foo_type, node_interface_type
+    )
+    global_id = to_global_id("Foo", "7")
+    result = graphql_sync(schema, node_query, variable_values={"id": global_id})
+    assert result.errors is None
+    assert result.data == {"node": {"__typename": "Foo", "id": global_id}}
+
+
+@pytest.mark.asyncio
+async def test_node_id_resolvers_async(
+    type_defs: str,
+    foo_nodes: Dict[str, Foo],
+    foo_connection_query: str,
+) -> None:
+    async def resolve_typename(*_: Any) -> str:
+        return "Qux"
+
+    async def resolve_id(obj: Foo, *_: Any) -> str:
+        return f"foo-{obj.id}"
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", lambda *_: list(foo_nodes.values()))
+    foo_type = NodeObjectType(
+        "Foo", id_resolver=resolve_id, typename_resolver=resolve_typename
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    result = await graphql(schema, "{ foos(first: 2) { edges { node { id } } } }")
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "edges": [
+                {"node": {"id": to_global_id("Qux", "foo-0")}},
+                {"node": {"id": to_global_id("Qux", "foo-1")}},
+            ]
+        }
+    }
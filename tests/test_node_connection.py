@@ -0,0 +1,208 @@
+from typing import Any, Dict, List, Optional, Union
+
+from ariadne import make_executable_schema
+from graphql import graphql, graphql_sync, GraphQLSchema
+from graphql_relay import Edge, offset_to_cursor, to_global_id
+import pytest
+
+from ariadne_relay import (
+    ConnectionArguments,
+    NodeConnection,
+    NodeObjectType,
+    RelayQueryType,
+    SyncNodeConnection,
+)
+from ariadne_relay.node_connection import NodeIdPage
+from .conftest import Foo
+
+NODE_CONNECTION_QUERY = """
+    query($first: Int, $after: String) {
+        foos(first: $first, after: $after) {
+            edges { cursor, node { id } }
+            pageInfo { hasNextPage, endCursor }
+        }
+    }
+"""
+
+
+def create_node_connection_schema(
+    type_defs: str,
+    factory: Union[NodeConnection, SyncNodeConnection],
+    ids: List[Any],
+    loaded: List[List[str]],
+    async_nodes: bool = False,
+) -> GraphQLSchema:
+    def resolve_foos(obj: Any, info: Any, connection_args: Any) -> List[Any]:
+        return ids
+
+    def resolve_foo_instances(node_ids: List[str], info: Any) -> Dict[str, Foo]:
+        loaded.append(node_ids)
+        return {node_id: Foo(id=int(node_id)) for node_id in node_ids if node_id < "5"}
+
+    async def resolve_foo_instances_async(
+        node_ids: List[str], info: Any
+    ) -> Dict[str, Foo]:
+        return resolve_foo_instances(node_ids, info)
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", resolve_foos, factory=factory)
+    foo_type = NodeObjectType("Foo")
+    foo_type.set_batch_instance_resolver(
+        resolve_foo_instances_async if async_nodes else resolve_foo_instances
+    )
+    return make_executable_schema(type_defs, query_type, foo_type)
+
+
+def test_sync_node_connection(type_defs: str) -> None:
+    loaded: List[List[str]] = []
+    schema = create_node_connection_schema(
+        type_defs, SyncNodeConnection("Foo"), list(range(100)), loaded
+    )
+    result = graphql_sync(
+        schema,
+        NODE_CONNECTION_QUERY,
+        variable_values={"first": 2, "after": offset_to_cursor(1)},
+    )
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "edges": [
+                {"cursor": offset_to_cursor(i), "node": {"id": to_global_id("Foo", i)}}
+                for i in (2, 3)
+            ],
+            "pageInfo": {"hasNextPage": True, "endCursor": offset_to_cursor(3)},
+        }
+    }
+    # only the nodes of the page are loaded, in a single batch
+    assert loaded == [["2", "3"]]
+
+
+@pytest.mark.asyncio
+async def test_node_connection_missing_null(type_defs: str) -> None:
+    loaded: List[List[str]] = []
+    ids = [to_global_id("Foo", i) for i in range(3, 8)]
+    schema = create_node_connection_schema(type_defs, NodeConnection(), ids, loaded)
+    result = await graphql(schema, "{ foos(first: 3) { edges { node { id } } } }")
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "edges": [
+                {"node": {"id": to_global_id("Foo", 3)}},
+                {"node": {"id": to_global_id("Foo", 4)}},
+                {"node": None},
+            ]
+        }
+    }
+    assert loaded == [["3", "4", "5"]]
+
+
+@pytest.mark.asyncio
+async def test_node_connection_missing_drop(type_defs: str) -> None:
+    loaded: List[List[str]] = []
+    ids = [to_global_id("Foo", i) for i in range(3, 8)]
+    schema = create_node_connection_schema(
+        type_defs, NodeConnection(missing="drop"), ids, loaded
+    )
+    result = await graphql(schema, NODE_CONNECTION_QUERY, variable_values={"first": 3})
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "edges": [
+                {
+                    "cursor": offset_to_cursor(i),
+                    "node": {"id": to_global_id("Foo", 3 + i)},
+                }
+                for i in (0, 1)
+            ],
+            # the page still ends at the dropped node
+            "pageInfo": {"hasNextPage": True, "endCursor": offset_to_cursor(2)},
+        }
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("context", [{}, None])
+async def test_sync_node_connection_async_nodes(
+    type_defs: str, context: Optional[Dict[str, Any]]
+) -> None:
+    loaded: List[List[str]] = []
+    ids = [to_global_id("Foo", i) for i in range(3, 8)]
+    schema = create_node_connection_schema(
+        type_defs, SyncNodeConnection(missing="drop"), ids, loaded, async_nodes=True
+    )
+    result = await graphql(
+        schema, "{ foos(first: 3) { edges { node { id } } } }", context_value=context
+    )
+    assert result.errors is None
+    assert result.data == {
+        "foos": {
+            "edges": [
+                {"node": {"id": to_global_id("Foo", 3)}},
+                {"node": {"id": to_global_id("Foo", 4)}},
+            ]
+        }
+    }
+    assert loaded == [["3", "4", "5"]]
+
+
+@pytest.mark.parametrize("context", [{}, None])
+def test_sync_node_connection_async_nodes_sync_executor(
+    type_defs: str, context: Optional[Dict[str, Any]]
+) -> None:
+    ids = [to_global_id("Foo", i) for i in range(3)]
+    schema = create_node_connection_schema(
+        type_defs, SyncNodeConnection(), ids, [], async_nodes=True
+    )
+    result = graphql_sync(
+        schema, "{ foos(first: 3) { edges { node { id } } } }", context_value=context
+    )
+    assert result.errors
+    assert result.errors[0].message == (
+        "Nodes with async resolvers can only be loaded by an async executor"
+    )
+
+
+def test_node_connection_edges_not_selected(type_defs: str) -> None:
+    loaded: List[List[str]] = []
+    schema = create_node_connection_schema(
+        type_defs, SyncNodeConnection("Foo"), list(range(10)), loaded
+    )
+    result = graphql_sync(schema, "{ foos(first: 3) { pageInfo { hasNextPage } } }")
+    assert result.errors is None
+    assert result.data == {"foos": {"pageInfo": {"hasNextPage": True}}}
+    assert loaded == []
+
+
+def test_node_id_pagination() -> None:
+    connection = SyncNodeConnection("Foo", count_free=True)
+    pagination = connection.pagination
+    assert pagination.count_free
+    assert pagination.cursor_codec is connection.cursor_codec
+    assert pagination.total_count is connection.total_count is None
+    page = pagination.create_empty_connection(ConnectionArguments(first=1))
+    assert page == NodeIdPage(None, 0, 0, False, False, None, None)
+    # the base attributes are set, so that the inherited methods work
+    assert pagination.build_edge(1, "cursor") == Edge(node=1, cursor="cursor")
+
+
+def test_node_connection_invalid_missing() -> None:
+    with pytest.raises(ValueError):
+        SyncNodeConnection(missing="skip")
+
+
+@pytest.mark.parametrize("count_free", [False, True])
+def test_node_connection_counts(type_defs: str, count_free: bool) -> None:
+    counts: List[int] = []
+    loaded: List[List[str]] = []
+    factory = SyncNodeConnection("Foo", count_free=count_free, on_count=counts.append)
+    schema = create_node_connection_schema(type_defs, factory, list(range(10)), loaded)
+    result = graphql_sync(schema, NODE_CONNECTION_QUERY, variable_values={"first": 2})
+    assert result.errors is None
+    assert result.data
+    assert result.data["foos"]["pageInfo"] == {
+        "hasNextPage": True,
+        "endCursor": offset_to_cursor(1),
+    }
+    # the ids are paginated with the settings of the node connection
+    assert counts == ([] if count_free else [10])
+    assert loaded == [["0", "1"]]
@@ -0,0 +1,167 @@
+import asyncio
+import contextvars
+import threading
+from typing import Any, Dict, Iterator, List
+
+from ariadne import InterfaceType, make_executable_schema
+from graphql import graphql
+from graphql_relay import to_global_id
+import pytest
+
+from ariadne_relay import (
+    NodeObjectType,
+    RelayQueryType,
+    resolve_node_query,
+    set_default_offload,
+    ThreadOffloader,
+)
+from .conftest import Foo
+
+request_id: contextvars.ContextVar[str] = contextvars.ContextVar("request_id")
+
+
+@pytest.fixture
+def offloader() -> Iterator[ThreadOffloader]:
+    offloader = ThreadOffloader(max_workers=2)
+    yield offloader
+    offloader.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_thread_offloader(offloader: ThreadOffloader) -> None:
+    waits: List[float] = []
+    offloader.on_queue_wait = waits.append
+
+    def blocking_call(value: int) -> Any:
+        return threading.current_thread().name, request_id.get(), value
+
+    request_id.set("request-1")
+    thread_name, context_value, value = await offloader.run(blocking_call, 42)
+    assert thread_name.startswith("ariadne-relay")
+    assert context_value == "request-1"
+    assert value == 42
+    stats = offloader.stats()
+    assert stats.submitted == stats.completed == 1
+    assert stats.pending == stats.rejected == 0
+    assert len(waits) == 1
+    assert stats.queue_wait_max == stats.queue_wait_total == waits[0]
+
+
+@pytest.mark.asyncio
+async def test_thread_offloader_queue_limit() -> None:
+    offloader = ThreadOffloader(max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = [asyncio.ensure_future(offloader.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(RuntimeError):
+            await offloader.run(release.wait)
+        release.set()
+        await asyncio.gather(*running)
+    finally:
+        release.set()
+        offloader.shutdown()
+    stats = offloader.stats()
+    assert (stats.submitted, stats.completed, stats.rejected) == (2, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_thread_offloader_failed_and_cancelled() -> None:
+    offloader = ThreadOffloader(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+
+    def block() -> None:
+        started.set()
+        release.wait()
+
+    def fail() -> None:
+        raise ValueError("failed")
+
+    try:
+        with pytest.raises(ValueError):
+            await offloader.run(fail)
+        running = asyncio.ensure_future(offloader.run(block))
+        queued = asyncio.ensure_future(offloader.run(block))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        # the running call still occupies its worker
+        stats = offloader.stats()
+        assert (stats.completed, stats.failed, stats.cancelled) == (0, 1, 1)
+        assert stats.pending == 1
+        release.set()
+    finally:
+        release.set()
+        offloader.shutdown()
+    stats = offloader.stats()
+    assert (stats.submitted, stats.completed, stats.failed) == (3, 1, 1)
+    assert (stats.cancelled, stats.pending) == (1, 0)
+
+
+def test_thread_offloader_invalid_options() -> None:
+    with pytest.raises(ValueError):
+        ThreadOffloader(max_workers=0)
+    with pytest.raises(ValueError):
+        ThreadOffloader(max_queue=-1)
+    with pytest.raises(ValueError):
+        set_default_offload("process")
+
+
+@pytest.fixture
+def reset_offload() -> Iterator[None]:
+    yield
+    set_default_offload(None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("reset_offload")
+@pytest.mark.parametrize("default", [False, True])
+async def test_offloaded_resolvers(
+    type_defs: str,
+    foo_nodes: Dict[str, Foo],
+    node_interface_type: InterfaceType,
+    offloader: ThreadOffloader,
+    default: bool,
+) -> None:
+    threads: List[str] = []
+
+    def resolve_foos(*_: Any) -> List[Foo]:
+        threads.append(threading.current_thread().name)
+        return list(foo_nodes.values())
+
+    def resolve_foo_instance(node_id: str, *_: Any) -> Foo:
+        threads.append(threading.current_thread().name)
+        return foo_nodes[node_id]
+
+    query_type = RelayQueryType()
+    query_type.set_field("node", resolve_node_query)
+    # the default offload applies to the types declared before it is set
+    offload = None if default else offloader
+    query_type.set_connection("foos", resolve_foos, offload=offload)
+    foo_type = NodeObjectType(
+        "Foo", instance_resolver=resolve_foo_instance, offload=offload
+    )
+    if default:
+        set_default_offload(offloader)
+    schema = make_executable_schema(
+        type_defs, query_type, node_interface_type, foo_type
+    )
+    result = await graphql(
+        schema,
+        """
+            query($id: ID!) {
+                foos(first: 1) { edges { node { id } } }
+                node(id: $id) { id }
+            }
+        """,
+        variable_values={"id": to_global_id("Foo", "3")},
+    )
+    assert result.errors is None
+    assert result.data == {
+        "foos": {"edges": [{"node": {"id": to_global_id("Foo", "0")}}]},
+        "node": {"id": to_global_id("Foo", "3")},
+    }
+    assert len(threads) == 2
+    assert all(name.startswith("ariadne-relay") for name in threads)
+    assert offloader.stats().completed == 2
@@ -0,0 +1,84 @@
+from typing import Dict
+
+from ariadne import InterfaceType, make_executable_schema
+from graphql import graphql_sync, GraphQLSchema
+from graphql_relay import to_global_id
+import pytest
+
+from ariadne_relay import (
+    build_node_registry,
+    NodeInterfaceType,
+    NodeObjectType,
+    RelayQueryType,
+)
+from ariadne_relay.registry import get_node_registry
+from .conftest import Foo
+
+
+def test_registry_from_schema(schema: GraphQLSchema) -> None:
+    registry = build_node_registry(schema)
+    assert sorted(registry) == ["Baz", "Foo"]
+    assert registry["Foo"].typename == "Foo"
+    assert not registry["Foo"].is_async
+    assert get_node_registry(schema) is registry
+    with pytest.raises(TypeError):
+        registry["Qux"] = registry["Foo"]  # type: ignore[index]
+
+
+def test_registry_built_lazily(schema: GraphQLSchema, node_query: str) -> None:
+    global_id = to_global_id("Foo", "1")
+    result = graphql_sync(schema, node_query, variable_values={"id": global_id})
+    assert result.errors is None
+    assert "Foo" in get_node_registry(schema)
+
+
+def test_registry_aliases(
+    type_defs: str,
+    foo_nodes: Dict[str, Foo],
+    query_type: RelayQueryType,
+    node_query: str,
+    nodes_query: str,
+    node_interface_type: InterfaceType,
+) -> None:
+    foo_type = NodeObjectType("Foo", aliases=["LegacyFoo"])
+    foo_type.set_instance_resolver(lambda node_id, *_: foo_nodes[node_id])
+    schema = make_executable_schema(
+        type_defs, foo_type, query_type, node_interface_type
+    )
+    registry = build_node_registry(schema)
+    assert registry["LegacyFoo"] is registry["Foo"]
+
+    legacy_global_id = to_global_id("LegacyFoo", "2")
+    result = graphql_sync(schema, node_query, variable_values={"id": legacy_global_id})
+    assert result.errors is None
+    assert result.data == {
+        "node": {"__typename": "Foo", "id": to_global_id("Foo", "2")}
+    }
+
+    global_ids = [legacy_global_id, to_global_id("Foo", "3")]
+    result = graphql_sync(schema, nodes_query, variable_values={"ids": global_ids})
+    assert result.errors is None
+    assert result.data == {
+        "nodes": [
+            {"__typename": "Foo", "id": to_global_id("Foo", "2")},
+            {"__typename": "Foo", "id": to_global_id("Foo", "3")},
+        ]
+    }
+
+
+def test_registry_alias_conflicts(
+    type_defs: str,
+    foo_type: NodeObjectType,
+    query_type: RelayQueryType,
+) -> None:
+    baz_interface_type = NodeInterfaceType("Baz", aliases=["Foo"])
+    baz_interface_type.set_instance_resolver(lambda *_: None)
+    schema = make_executable_schema(type_defs, foo_type, query_type, baz_interface_type)
+    with pytest.raises(ValueError):
+        build_node_registry(schema)
+
+    baz_interface_type.set_aliases(["Legacy"])
+    foo_type.set_aliases(["Legacy"])
+    schema = make_executable_schema(type_defs, foo_type, query_type, baz_interface_type)
+    with pytest.raises(ValueError):
+        build_node_registry(schema)
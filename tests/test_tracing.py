@@ -0,0 +1,213 @@
+import asyncio
+from typing import Any, Dict, Iterator, List
+
+from ariadne import InterfaceType, make_executable_schema
+from graphql import graphql, graphql_sync
+from graphql_relay import offset_to_cursor, to_global_id
+import pytest
+
+from ariadne_relay import (
+    ConnectionData,
+    FinishedSpan,
+    InMemoryTracer,
+    NodeCache,
+    NodeObjectType,
+    PageSizePolicy,
+    RelayQueryType,
+    resolve_node_query_sync,
+    set_default_tracer,
+)
+from ariadne_relay.tracing import (
+    CACHE_HIT,
+    CACHE_MISSES,
+    EDGES,
+    FIELD,
+    ID_COUNT,
+    TYPENAME,
+    WINDOW_LIMIT,
+    WINDOW_OFFSET,
+)
+from .conftest import Foo
+
+NODE_QUERY = "query($id: ID!) { node(id: $id) { id } }"
+
+
+@pytest.fixture
+def tracer() -> Iterator[InMemoryTracer]:
+    tracer = InMemoryTracer()
+    set_default_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        set_default_tracer(None)
+
+
+def get_span(spans: List[FinishedSpan], name: str) -> FinishedSpan:
+    [span] = [span for span in spans if span.name == name]
+    return span
+
+
+def test_node_query_spans(
+    tracer: InMemoryTracer,
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    foo_type: NodeObjectType,
+) -> None:
+    schema = make_executable_schema(
+        type_defs, query_type, node_interface_type, foo_type
+    )
+    result = graphql_sync(
+        schema, NODE_QUERY, variable_values={"id": to_global_id("Foo", "1")}
+    )
+    assert result.errors is None
+    spans = list(tracer.get_finished_spans())
+    query = get_span(spans, "ariadne_relay.node.query")
+    decode = get_span(spans, "ariadne_relay.node.decode_id")
+    resolver = get_span(spans, "ariadne_relay.node.instance_resolver")
+    node_id = get_span(spans, "ariadne_relay.node.id")
+    assert query.parent_id is None
+    assert query.attributes == {ID_COUNT: 1}
+    assert decode.parent_id == query.span_id
+    assert decode.attributes == {ID_COUNT: 1, TYPENAME: "Foo"}
+    assert resolver.parent_id == query.span_id
+    assert resolver.attributes[TYPENAME] == "Foo"
+    assert resolver.attributes[ID_COUNT] == 1
+    assert node_id.parent_id is None
+    assert node_id.attributes == {TYPENAME: "Foo"}
+    assert query.start_time <= resolver.start_time <= resolver.end_time
+    assert resolver.end_time <= query.end_time
+
+
+def test_node_cache_spans(
+    tracer: InMemoryTracer,
+    type_defs: str,
+    node_interface_type: InterfaceType,
+    foo_nodes: Dict[str, Foo],
+) -> None:
+    query_type = RelayQueryType()
+    query_type.set_field("node", resolve_node_query_sync)
+    foo_type = NodeObjectType(
+        "Foo",
+        batch_instance_resolver=lambda ids, *_: [foo_nodes[i] for i in ids],
+        cache=NodeCache(),
+    )
+    schema = make_executable_schema(
+        type_defs, query_type, node_interface_type, foo_type
+    )
+    for _ in range(2):
+        result = graphql_sync(
+            schema, NODE_QUERY, variable_values={"id": to_global_id("Foo", "1")}
+        )
+        assert result.errors is None
+    cache_spans = [
+        span
+        for span in tracer.get_finished_spans()
+        if span.name == "ariadne_relay.node.cache"
+    ]
+    assert [span.attributes[CACHE_HIT] for span in cache_spans] == [False, True]
+    assert [span.attributes[CACHE_MISSES] for span in cache_spans] == [1, 0]
+    resolver_spans = [
+        span
+        for span in tracer.get_finished_spans()
+        if span.name == "ariadne_relay.node.instance_resolver"
+    ]
+    assert len(resolver_spans) == 1
+    assert resolver_spans[0].parent_id == cache_spans[0].span_id
+
+
+@pytest.mark.asyncio
+async def test_connection_spans(
+    tracer: InMemoryTracer, type_defs: str, foo_type: NodeObjectType
+) -> None:
+    async def resolve_foos(*_: Any) -> List[Foo]:
+        return [Foo(id=i) for i in range(10)]
+
+    query_type = RelayQueryType()
+    query_type.set_connection("foos", resolve_foos)
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    tracer.clear()
+    result = await graphql(
+        schema,
+        "query($after: String) { foos(first: 3, after: $after) { edges { cursor } } }",
+        variable_values={"after": offset_to_cursor(1)},
+    )
+    assert result.errors is None
+    spans = list(tracer.get_finished_spans())
+    connection = get_span(spans, "ariadne_relay.connection")
+    resolver = get_span(spans, "ariadne_relay.connection.resolver")
+    factory = get_span(spans, "ariadne_relay.connection.factory")
+    assert connection.attributes == {
+        FIELD: "Query.foos",
+        WINDOW_OFFSET: 2,
+        # the window includes the item that determines hasNextPage
+        WINDOW_LIMIT: 4,
+        EDGES: 3,
+    }
+    assert resolver.parent_id == connection.span_id
+    assert factory.parent_id == connection.span_id
+    assert factory.attributes == {FIELD: "Query.foos"}
+
+
+@pytest.mark.asyncio
+async def test_connection_span_awaited(
+    tracer: InMemoryTracer, type_defs: str, foo_type: NodeObjectType
+) -> None:
+    async def fetch_foos() -> List[Foo]:
+        await asyncio.sleep(0)
+        return [Foo(id=i) for i in range(10)]
+
+    query_type = RelayQueryType()
+    query_type.set_connection(
+        "foos",
+        lambda *_: ConnectionData(fetch_foos()),
+        page_size=PageSizePolicy(max_first=2),
+    )
+    schema = make_executable_schema(type_defs, query_type, foo_type)
+    tracer.clear()
+    result = await graphql(schema, "{ foos(first: 5) { edges { cursor } } }")
+    assert result.errors is None
+    spans = list(tracer.get_finished_spans())
+    # the sync resolver returns an awaitable, which is awaited in the same span
+    connection = get_span(spans, "ariadne_relay.connection")
+    factory = get_span(spans, "ariadne_relay.connection.factory")
+    assert connection.attributes == {
+        FIELD: "Query.foos",
+        WINDOW_OFFSET: 0,
+        # the window of the page size that the policy allows
+        WINDOW_LIMIT: 3,
+        EDGES: 2,
+    }
+    assert factory.parent_id == connection.span_id
+    assert connection.end_time >= factory.end_time
+
+
+def test_span_error(tracer: InMemoryTracer) -> None:
+    with pytest.raises(ValueError):
+        with tracer.start_as_current_span("failing"):
+            raise ValueError("failed")
+    [span] = tracer.get_finished_spans()
+    assert span.error == "ValueError('failed')"
+    assert span.duration >= 0
+
+
+def test_opentelemetry_tracer(
+    type_defs: str,
+    query_type: RelayQueryType,
+    node_interface_type: InterfaceType,
+    foo_type: NodeObjectType,
+) -> None:
+    trace = pytest.importorskip("opentelemetry.trace")
+    set_default_tracer(trace.get_tracer(__name__))
+    try:
+        schema = make_executable_schema(
+            type_defs, query_type, node_interface_type, foo_type
+        )
+        result = graphql_sync(schema, "{ foos(first: 1) { edges { cursor } } }")
+        assert result.errors is None
+        result = graphql_sync(
+            schema, NODE_QUERY, variable_values={"id": to_global_id("Foo", "1")}
+        )
+        assert result.errors is None
+    finally:
+        set_default_tracer(None)